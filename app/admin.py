@@ -1,5 +1,12 @@
+import time
+from typing import Any, ClassVar, Dict, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
 from sqladmin import Admin, ModelView
-from sqlalchemy.engine import Engine
+from sqlalchemy import Integer, and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from app.database.database import SessionLocal
 from app.models import (
     RoleModel,
     UserModel,
@@ -7,11 +14,94 @@ from app.models import (
     AuthorsModel,
     GengresModel,
     BookCommentsModel,
-    ShelfModel
+    ShelfModel,
+    GenreStatsModel,
+    AuthorStatsModel,
+    DailyActivityModel
 )
+from app.services.book_comments import BookCommentService
+from app.services.shelf import ShelfService
 
 
-class RoleAdmin(ModelView, model=RoleModel):
+# model name -> (время вычисления, количество строк)
+_count_cache: Dict[str, Tuple[float, int]] = {}
+
+
+class IndexedModelView(ModelView):
+    """
+    Базовый admin view, который не сканирует таблицы.
+
+    Поиск идет только по индексированным колонкам: строки ищутся по префиксу
+    диапазоном по индексу, целые числа - на точное совпадение. Количество строк
+    для списка без поиска - COUNT(*) (у моделей с мягким удалением - только
+    действующие строки, см. SoftDeleteModelView), пересчитывается раз
+    в count_cache_ttl секунд; у больших таблиц период больше.
+    """
+    count_cache_ttl: ClassVar[float] = 30.0
+
+    def search_query(self, stmt, term: str):
+        expressions = []
+        for field in self._search_fields:
+            column = getattr(self.model, field)
+            if isinstance(column.type, Integer):
+                if term.isdigit():
+                    expressions.append(column == int(term))
+            else:
+                expressions.append(and_(column >= term, column < term + "\uffff"))
+        if not expressions:
+            return stmt.filter(false())
+        return stmt.filter(or_(*expressions))
+
+    async def count(self, request: Request, stmt=None) -> int:
+        if request.query_params.get("search"):
+            return await super().count(request, stmt)
+
+        key = self.model.__name__
+        cached = _count_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.count_cache_ttl:
+            return cached[1]
+
+        value = await super().count(request)
+        _count_cache[key] = (now, value)
+        return value
+
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        if is_created:
+            _count_cache.pop(self.model.__name__, None)
+
+    async def after_model_delete(self, model, request) -> None:
+        _count_cache.pop(self.model.__name__, None)
+
+
+class SoftDeleteModelView(IndexedModelView):
+    """
+    Удаление из админки - то же, что через API: сервис помечает строку
+    deleted_at (в архив ее позже перенесет фоновая задача) и обновляет
+    счетчики и рейтинги. Сервисы синхронные, поэтому выполняются в пуле потоков.
+    """
+
+    def count_query(self, request: Request):
+        # sqladmin считает по колонке таблицы (Core-запрос), фильтр SoftDeleteMixin к нему не применяется
+        return super().count_query(request).where(self.model.deleted_at.is_(None))
+
+    async def delete_model(self, request: Request, pk: Any) -> None:
+        db_obj = await run_in_threadpool(self._soft_delete, int(pk))
+        if db_obj is not None:
+            await self.after_model_delete(db_obj, request)
+
+    def _soft_delete(self, id: int) -> Optional[Any]:
+        db = SessionLocal()
+        try:
+            return self.soft_delete(db, id)
+        finally:
+            db.close()
+
+    def soft_delete(self, db: Session, id: int) -> Optional[Any]:
+        raise NotImplementedError
+
+
+class RoleAdmin(IndexedModelView, model=RoleModel):
     """Admin view для ролей пользователей"""
     column_list = [RoleModel.id, RoleModel.name]
     column_details_exclude_list = [RoleModel.users]
@@ -22,7 +112,7 @@ class RoleAdmin(ModelView, model=RoleModel):
     icon = "fa-solid fa-shield"
 
 
-class UserAdmin(ModelView, model=UserModel):
+class UserAdmin(IndexedModelView, model=UserModel):
     """Admin view для пользователей"""
     column_list = [
         UserModel.id,
@@ -35,15 +125,15 @@ class UserAdmin(ModelView, model=UserModel):
         UserModel.book_comments,
         UserModel.shelf
     ]
-    column_searchable_list = [UserModel.email, UserModel.name]
-    column_sortable_list = [UserModel.id, UserModel.name]
+    column_searchable_list = [UserModel.email]
+    column_sortable_list = [UserModel.id, UserModel.email]
     page_size = 10
     name = "Пользователь"
     name_plural = "Пользователи"
     icon = "fa-solid fa-users"
 
 
-class AuthorsAdmin(ModelView, model=AuthorsModel):
+class AuthorsAdmin(IndexedModelView, model=AuthorsModel):
     """Admin view для авторов"""
     column_list = [
         AuthorsModel.id,
@@ -57,7 +147,7 @@ class AuthorsAdmin(ModelView, model=AuthorsModel):
     icon = "fa-solid fa-pen-nib"
 
 
-class GengresAdmin(ModelView, model=GengresModel):
+class GengresAdmin(IndexedModelView, model=GengresModel):
     """Admin view для жанров"""
     column_list = [
         GengresModel.id,
@@ -71,7 +161,7 @@ class GengresAdmin(ModelView, model=GengresModel):
     icon = "fa-solid fa-bookmark"
 
 
-class BooksAdmin(ModelView, model=BooksModel):
+class BooksAdmin(IndexedModelView, model=BooksModel):
     """Admin view для книг"""
     column_list = [
         BooksModel.id,
@@ -86,15 +176,20 @@ class BooksAdmin(ModelView, model=BooksModel):
         BooksModel.shelf_entries
     ]
     column_searchable_list = [BooksModel.title]
-    column_sortable_list = [BooksModel.id, BooksModel.title, BooksModel.year]
+    column_sortable_list = [BooksModel.id, BooksModel.title]
     page_size = 15
     name = "Книга"
     name_plural = "Книги"
     icon = "fa-solid fa-book"
 
 
-class BookCommentsAdmin(ModelView, model=BookCommentsModel):
-    """Admin view для комментариев к книгам"""
+class BookCommentsAdmin(SoftDeleteModelView, model=BookCommentsModel):
+    """
+    Admin view для комментариев к книгам. Комментарии создаются только через API,
+    а правится только текст: иначе books.comments_count разойдется с комментариями.
+    """
+    can_create = False
+    form_columns = [BookCommentsModel.comment_text]
     column_list = [
         BookCommentsModel.id,
         BookCommentsModel.user_id,
@@ -102,15 +197,19 @@ class BookCommentsAdmin(ModelView, model=BookCommentsModel):
         BookCommentsModel.comment_text,
         BookCommentsModel.created_at
     ]
-    column_searchable_list = [BookCommentsModel.comment_text]
+    column_searchable_list = [BookCommentsModel.book_id, BookCommentsModel.user_id]
     column_sortable_list = [BookCommentsModel.id, BookCommentsModel.created_at]
+    count_cache_ttl = 300.0
     page_size = 10
     name = "Комментарий"
     name_plural = "Комментарии"
     icon = "fa-solid fa-comments"
 
+    def soft_delete(self, db: Session, id: int) -> Optional[BookCommentsModel]:
+        return BookCommentService(db).delete_comment(id)
+
 
-class ShelfAdmin(ModelView, model=ShelfModel):
+class ShelfAdmin(SoftDeleteModelView, model=ShelfModel):
     """Admin view для полок пользователей"""
     column_list = [
         ShelfModel.id,
@@ -118,20 +217,75 @@ class ShelfAdmin(ModelView, model=ShelfModel):
         ShelfModel.book_id,
         ShelfModel.status_read
     ]
-    column_searchable_list = []
-    column_sortable_list = [ShelfModel.id, ShelfModel.status_read]
+    column_searchable_list = [ShelfModel.user_id, ShelfModel.book_id]
+    column_sortable_list = [ShelfModel.id]
+    count_cache_ttl = 300.0
     page_size = 10
     name = "Полка"
     name_plural = "Полки"
     icon = "fa-solid fa-library"
 
+    def soft_delete(self, db: Session, id: int) -> Optional[ShelfModel]:
+        return ShelfService(db).remove_from_shelf(id)
+
+
+class ReadOnlyModelView(ModelView):
+    """
+    Просмотр витрин аналитики: таблицы небольшие и заполняются фоновой задачей.
+    """
+    can_create = False
+    can_edit = False
+    can_delete = False
+    category = "Аналитика"
+
+
+class GenreStatsAdmin(ReadOnlyModelView, model=GenreStatsModel):
+    column_list = [
+        GenreStatsModel.genre_name,
+        GenreStatsModel.books_count,
+        GenreStatsModel.shelved_count,
+        GenreStatsModel.read_count
+    ]
+    column_sortable_list = [GenreStatsModel.books_count, GenreStatsModel.shelved_count, GenreStatsModel.read_count]
+    column_default_sort = [(GenreStatsModel.books_count, True)]
+    name = "Жанры"
+    name_plural = "Жанры: книги и прочтения"
+    icon = "fa-solid fa-chart-pie"
+
+
+class AuthorStatsAdmin(ReadOnlyModelView, model=AuthorStatsModel):
+    column_list = [
+        AuthorStatsModel.author_name,
+        AuthorStatsModel.books_count,
+        AuthorStatsModel.shelved_count
+    ]
+    column_sortable_list = [AuthorStatsModel.books_count, AuthorStatsModel.shelved_count]
+    column_default_sort = [(AuthorStatsModel.books_count, True)]
+    name = "Авторы"
+    name_plural = "Авторы: книги и полки"
+    icon = "fa-solid fa-chart-bar"
+
+
+class DailyActivityAdmin(ReadOnlyModelView, model=DailyActivityModel):
+    column_list = [
+        DailyActivityModel.day,
+        DailyActivityModel.comments_count,
+        DailyActivityModel.shelf_adds_count,
+        DailyActivityModel.active_users
+    ]
+    column_sortable_list = [DailyActivityModel.day]
+    column_default_sort = [(DailyActivityModel.day, True)]
+    name = "Активность"
+    name_plural = "Активность по дням"
+    icon = "fa-solid fa-chart-line"
+
 
-def setup_admin(app, engine: Engine):
+def setup_admin(app, engine: AsyncEngine):
     """Инициализация админ-панели с регистрацией всех моделей
     
     Args:
         app: FastAPI приложение
-        engine: SQLAlchemy Engine (sync) для работы с БД
+        engine: SQLAlchemy AsyncEngine для работы с БД
     """
     admin = Admin(
         app=app,
@@ -150,5 +304,8 @@ def setup_admin(app, engine: Engine):
     admin.add_view(BooksAdmin)
     admin.add_view(BookCommentsAdmin)
     admin.add_view(ShelfAdmin)
+    admin.add_view(GenreStatsAdmin)
+    admin.add_view(AuthorStatsAdmin)
+    admin.add_view(DailyActivityAdmin)
     
     return admin
@@ -5,6 +5,8 @@ from .gengres import router as genres_router
 from .authors import router as authors_router
 from .book_comments import router as book_comments_router
 from .shelf import router as shelf_router
+from .batch import router as batch_router
+from .analytics import router as analytics_router
 
 __all__ = [
     "roles_router",
@@ -14,4 +16,6 @@ __all__ = [
     "authors_router",
     "book_comments_router",
     "shelf_router",
+    "batch_router",
+    "analytics_router",
 ]
\ No newline at end of file
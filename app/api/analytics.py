@@ -0,0 +1,40 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database.database import get_db
+from app.schemes.analytics import AnalyticsOverview, AuthorStats, DailyActivity, GenreStats
+from app.services.analytics import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/", response_model=AnalyticsOverview)
+def read_overview(db: Session = Depends(get_db)):
+    """
+    Время последнего пересчета витрин и отметки учтенных строк.
+    """
+    return AnalyticsService(db).get_overview()
+
+
+@router.get("/genres", response_model=List[GenreStats])
+def read_genre_stats(db: Session = Depends(get_db)):
+    """
+    Книги по жанрам и конверсия полки в прочтение (из витрины).
+    """
+    return AnalyticsService(db).get_genre_stats()
+
+
+@router.get("/authors", response_model=List[AuthorStats])
+def read_author_stats(limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    """
+    Книги и добавления на полку по авторам (из витрины).
+    """
+    return AnalyticsService(db).get_author_stats(limit)
+
+
+@router.get("/daily", response_model=List[DailyActivity])
+def read_daily_activity(days: int = Query(30, ge=1, le=365), db: Session = Depends(get_db)):
+    """
+    Комментарии, добавления на полку и активные пользователи по дням (из витрины).
+    """
+    return AnalyticsService(db).get_daily_activity(days)
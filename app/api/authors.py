@@ -1,13 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.schemes.authors import Author, AuthorCreate, AuthorUpdate
 from app.services.authors import AuthorService
 from app.exceptions.authors import (
     AuthorNotFoundException,
-    AuthorAlreadyExistsException,
-    AuthorHasBooksException
+    AuthorAlreadyExistsException
 )
 
 router = APIRouter(prefix="/authors", tags=["authors"])
@@ -56,15 +55,9 @@ def update_author(author_id: int, author: AuthorUpdate, db: Session = Depends(ge
 
 
 @router.delete("/{author_id}", response_model=Author)
-def delete_author(author_id: int, db: Session = Depends(get_db)):
-    service = AuthorService(db)
-    db_author = service.get_author(author_id)
-    if db_author is None:
-        raise AuthorNotFoundException(author_id=author_id)
-    
-    # Проверяем, есть ли у автора книги
-    if db_author.books:
-        raise AuthorHasBooksException(author_name=db_author.name)
-    
-    deleted_author = service.delete_author(author_id)
-    return deleted_author
\ No newline at end of file
+def delete_author(
+    author_id: int,
+    cascade: bool = Query(False, description="Удалить вместе со всеми книгами автора"),
+    db: Session = Depends(get_db)
+):
+    return AuthorService(db).delete_author(author_id, cascade=cascade)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import logging
+from typing import List
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Request
+from app.schemes.batch import BatchRequest, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Ограничение времени одного подзапроса, секунды
+SUB_REQUEST_TIMEOUT = 10.0
+# Заголовки исходного запроса, которые передаются в подзапросы
+FORWARDED_HEADERS = {b"authorization", b"cookie", b"accept-language", b"user-agent"}
+# Заголовки ответа подзапроса, которые возвращаются клиенту
+RETURNED_HEADERS = {"etag", "cache-control", "retry-after", "x-total-count"}
+
+
+async def _dispatch(request: Request, sub_request: BatchSubRequest) -> BatchSubResponse:
+    """
+    Выполнить GET-подзапрос через ASGI-приложение в том же процессе, без HTTP.
+    """
+    url = urlsplit(sub_request.path)
+    if not url.path.startswith("/") or url.path.startswith("/batch") or url.path.endswith("/stream"):
+        return BatchSubResponse(path=sub_request.path, status=400, body={"detail": "Path is not allowed in batch"})
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        "headers": [
+            (name, value) for name, value in request.scope["headers"] if name in FORWARDED_HEADERS
+        ],
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": request.scope.get("state", {}),
+    }
+    status = 500
+    headers = {}
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {name.decode().lower(): value.decode() for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(request.app(scope, receive, send), SUB_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        return BatchSubResponse(path=sub_request.path, status=504, body={"detail": "Sub-request timed out"})
+    except Exception:
+        # ServerErrorMiddleware отправляет 500 и пробрасывает исключение дальше: без перехвата
+        # gather отменил бы остальные подзапросы посреди работы с БД
+        logger.exception("Batch sub-request %s failed", sub_request.path)
+        return BatchSubResponse(path=sub_request.path, status=500, body={"detail": "Internal Server Error"})
+
+    raw_body = b"".join(chunks)
+    if headers.get("content-type", "").startswith("application/json"):
+        body = json.loads(raw_body) if raw_body else None
+    else:
+        body = raw_body.decode(errors="replace")
+    return BatchSubResponse(
+        path=sub_request.path,
+        status=status,
+        body=body,
+        headers={name: value for name, value in headers.items() if name in RETURNED_HEADERS}
+    )
+
+
+@router.post("/", response_model=List[BatchSubResponse])
+async def execute_batch(batch: BatchRequest, request: Request):
+    """
+    Выполнить несколько GET-запросов к API за один HTTP-запрос.
+    Подзапросы выполняются параллельно; ответы возвращаются в порядке запросов.
+    """
+    return await asyncio.gather(*(_dispatch(request, sub_request) for sub_request in batch.requests))
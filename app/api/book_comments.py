@@ -1,18 +1,36 @@
-from typing import List
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.database.database import get_db
-from app.schemes.book_comments import BookComment, BookCommentCreate, BookCommentUpdate
-from app.services.book_comments import BookCommentService
+from app.schemes.book_comments import (
+    BookComment,
+    BookCommentCreate,
+    BookCommentUpdate,
+    BookCommentPage,
+    BookCommentQueued
+)
+from app.services.book_comments import BookCommentService, comments_topic
+from app.services.comment_queue import COMMENT_INGEST_MODE, CommentQueueFullError, comment_queue
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.pubsub import events
 from app.exceptions.book_comments import (
     CommentNotFoundException,
     CommentTooLongException,
     CommentEditNotAllowedException,
-    CommentDeleteNotAllowedException
+    CommentDeleteNotAllowedException,
+    InvalidCommentCursorException,
+    CommentQueueFullException,
+    QueuedCommentNotFoundException
 )
 
 router = APIRouter(prefix="/book-comments", tags=["book-comments"])
 
+# Интервал keep-alive комментариев в SSE-потоке, секунды
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/", response_model=List[BookComment])
 def read_comments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -30,27 +48,126 @@ def read_comment(comment_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/by-book/{book_id}", response_model=List[BookComment])
-def read_comments_by_book(book_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_comments_by_book(
+    book_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
     service = BookCommentService(db)
     return service.get_comments_by_book(book_id, skip, limit)
 
 
+@router.get("/by-book/{book_id}/page", response_model=BookCommentPage)
+def read_comments_page_by_book(
+    book_id: int,
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    order: Literal["newest", "oldest"] = Query("newest"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Получить страницу комментариев книги с keyset-курсором по (created_at, id).
+    Общее количество берется из счетчика книги.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise InvalidCommentCursorException(cursor=cursor)
+
+    service = BookCommentService(db)
+    comments, total = service.get_comments_page(book_id, limit, order == "newest", after)
+
+    next_cursor = None
+    if len(comments) == limit:
+        last = comments[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {"items": comments, "total": total, "next_cursor": next_cursor}
+
+
+@router.get("/by-book/{book_id}/stream")
+async def stream_comments_by_book(book_id: int, request: Request):
+    """
+    Server-sent events с новыми, измененными и удаленными комментариями книги.
+    Медленный подписчик отключается событием evicted; EventSource переподключится сам.
+    """
+    subscription = events.subscribe(comments_topic(book_id))
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield "event: evicted\ndata: {}\n\n"
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event['comment'], ensure_ascii=False)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/by-user/{user_id}", response_model=List[BookComment])
-def read_comments_by_user(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_comments_by_user(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
     service = BookCommentService(db)
     return service.get_comments_by_user(user_id, skip, limit)
 
 
-@router.post("/", response_model=BookComment)
+@router.post(
+    "/",
+    response_model=BookComment,
+    responses={status.HTTP_202_ACCEPTED: {"model": BookCommentQueued}}
+)
 def create_comment(comment: BookCommentCreate, db: Session = Depends(get_db)):
     # Проверяем длину комментария
     if len(comment.comment_text) > 200:
         raise CommentTooLongException(max_length=200)
     
+    if COMMENT_INGEST_MODE == "write_behind":
+        # Комментарий будет записан пакетом в фоне, клиент получает временный id
+        try:
+            provisional_id = comment_queue.submit(comment)
+        except CommentQueueFullError:
+            raise CommentQueueFullException()
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"provisional_id": provisional_id, "status": "pending", "comment_id": None}
+        )
+    
     service = BookCommentService(db)
     return service.create_comment(comment)
 
 
+@router.get("/queued/{provisional_id}", response_model=BookCommentQueued)
+def read_queued_comment_status(provisional_id: str):
+    """
+    Статус комментария, принятого в режиме отложенной записи. Статусы хранятся
+    в памяти воркера, принявшего комментарий: режим рассчитан на один воркер.
+    """
+    queued = comment_queue.status(provisional_id)
+    if queued is None:
+        raise QueuedCommentNotFoundException(provisional_id=provisional_id)
+    queued_status, comment_id = queued
+    return {"provisional_id": provisional_id, "status": queued_status, "comment_id": comment_id}
+
+
 @router.put("/{comment_id}", response_model=BookComment)
 def update_comment(comment_id: int, comment: BookCommentUpdate, db: Session = Depends(get_db)):
     service = BookCommentService(db)
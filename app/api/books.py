@@ -1,15 +1,24 @@
-from typing import List
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database.database import get_db
-from app.schemes.books import Book, BookCreate, BookUpdate, BookDetail
-from app.services.books import BookService
-from app.exceptions.books import (
-    BookNotFoundException,
-    BookAlreadyExistsException,
-    BookHasCommentsException,
-    BookInShelfException
+from app.schemes.books import (
+    Book,
+    BookCreate,
+    BookUpdate,
+    BookDetail,
+    BookSearchResult,
+    BookCreated,
+    AutocompleteItem,
+    RankedBook,
+    SimilarBook,
+    TrendingWindow
 )
+from app.services.books import BookService
+from app.services.rankings import RankingService
+from app.services.recommendations import RecommendationService
+from app.services.search import book_search_index
+from app.exceptions.books import BookNotFoundException
 
 router = APIRouter(prefix="/books", tags=["books"])
 
@@ -56,6 +65,44 @@ def read_books(
     return result
 
 
+@router.get("/autocomplete", response_model=List[AutocompleteItem])
+def autocomplete_books(
+    q: str = Query(..., min_length=1, max_length=100, description="Начало названия книги или имени автора"),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Подсказки при вводе поиска: id и подписи книг и авторов из индекса в памяти.
+    """
+    return [
+        {"kind": kind, "id": item_id, "label": label}
+        for kind, item_id, label in book_search_index.autocomplete(db, q, limit)
+    ]
+
+
+@router.get("/popular", response_model=List[RankedBook])
+def read_popular_books(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Самые популярные книги за все время по таблице лидеров в памяти.
+    """
+    return RankingService(db).get_popular(limit)
+
+
+@router.get("/trending", response_model=List[RankedBook])
+def read_trending_books(
+    window: TrendingWindow = Query(TrendingWindow.WEEK),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Книги с наибольшей активностью за окно (1d, 7d, 30d).
+    """
+    return RankingService(db).get_trending(window.value, limit)
+
+
 @router.get("/{book_id}", response_model=BookDetail)
 def read_book(book_id: int, db: Session = Depends(get_db)):
     """
@@ -99,24 +146,33 @@ def read_book(book_id: int, db: Session = Depends(get_db)):
     return response
 
 
-@router.post("/", response_model=Book)
-def create_book(book: BookCreate, db: Session = Depends(get_db)):
+@router.get("/{book_id}/similar", response_model=List[SimilarBook])
+def read_similar_books(
+    book_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Книги, которые чаще всего стоят на полках вместе с этой (читатели также добавили).
+    """
+    return RecommendationService(db).get_similar_books(book_id, limit)
+
+
+@router.post("/", response_model=BookCreated)
+def create_book(
+    book: BookCreate,
+    check_similar: bool = Query(False, description="Вернуть книги с почти таким же названием"),
+    db: Session = Depends(get_db)
+):
     """
     Создать новую книгу.
     """
     service = BookService(db)
+    near_duplicates = service.find_near_duplicates(book.title) if check_similar else []
     
-    # Проверяем, существует ли уже книга с таким названием и автором
-    existing_books = service.search_books(book.title)
-    for existing in existing_books:
-        if existing.author_id == book.author_id:
-            raise BookAlreadyExistsException(title=book.title, author_id=book.author_id)
-    
-    # Создаем книгу
-    new_book = service.create_book(book)
-    
-    # Загружаем снова с отношениями для ответа
-    book_with_relations = service.get_book(new_book.id)
+    # Один INSERT ... RETURNING с именами автора и жанра; книгу с таким же
+    # названием у автора отклоняет уникальный индекс (BookAlreadyExistsException)
+    new_book, author_name, genre_name = service.create_book(book)
     
     return {
         "id": new_book.id,
@@ -125,9 +181,18 @@ def create_book(book: BookCreate, db: Session = Depends(get_db)):
         "author_id": new_book.author_id,
         "genre_id": new_book.genre_id,
         "year": new_book.year,
-        "author_name": book_with_relations.author.name if book_with_relations and book_with_relations.author else None,
-        "genre_name": book_with_relations.genre.name if book_with_relations and book_with_relations.genre else None,
-        "comments": []
+        "author_name": author_name,
+        "genre_name": genre_name,
+        "comments": [],
+        "near_duplicates": [
+            {
+                "id": duplicate.id,
+                "title": duplicate.title,
+                "author_id": duplicate.author_id,
+                "author_name": duplicate.author.name if duplicate.author else None
+            }
+            for duplicate in near_duplicates
+        ]
     }
 
 
@@ -138,18 +203,12 @@ def update_book(book_id: int, book: BookUpdate, db: Session = Depends(get_db)):
     """
     service = BookService(db)
     
-    # Проверяем существование книги
-    existing_book = service.get_book(book_id)
-    if existing_book is None:
-        raise BookNotFoundException(book_id=book_id)
-    
-    # Обновляем книгу
-    updated_book = service.update_book(book_id, book)
-    if updated_book is None:
+    # Условный UPDATE ... RETURNING: отсутствие книги - 0 обновленных строк,
+    # совпадение названия с другой книгой автора отклоняет уникальный индекс
+    updated = service.update_book(book_id, book)
+    if updated is None:
         raise BookNotFoundException(book_id=book_id)
-    
-    # Загружаем снова с отношениями
-    book_with_relations = service.get_book(book_id)
+    updated_book, author_name, genre_name = updated
     
     return {
         "id": updated_book.id,
@@ -158,36 +217,22 @@ def update_book(book_id: int, book: BookUpdate, db: Session = Depends(get_db)):
         "author_id": updated_book.author_id,
         "genre_id": updated_book.genre_id,
         "year": updated_book.year,
-        "author_name": book_with_relations.author.name if book_with_relations and book_with_relations.author else None,
-        "genre_name": book_with_relations.genre.name if book_with_relations and book_with_relations.genre else None,
+        "author_name": author_name,
+        "genre_name": genre_name,
         "comments": []
     }
 
 
 @router.delete("/{book_id}", response_model=Book)
-def delete_book(book_id: int, db: Session = Depends(get_db)):
+def delete_book(
+    book_id: int,
+    cascade: bool = Query(False, description="Удалить вместе с комментариями и записями на полках"),
+    db: Session = Depends(get_db)
+):
     """
-    Удалить книгу.
+    Удалить книгу. Проверки и удаление - один условный DELETE.
     """
-    service = BookService(db)
-    
-    # Проверяем существование книги
-    book = service.get_book(book_id)
-    if book is None:
-        raise BookNotFoundException(book_id=book_id)
-    
-    # Проверяем, есть ли комментарии к книге
-    if book.book_comments and len(book.book_comments) > 0:
-        raise BookHasCommentsException(book_id=book_id)
-    
-    # Проверяем, есть ли книга на полках у пользователей
-    from app.models.shelf import ShelfModel
-    shelf_entries = db.query(ShelfModel).filter(ShelfModel.book_id == book_id).first()
-    if shelf_entries:
-        raise BookInShelfException(book_id=book_id)
-    
-    # Удаляем книгу
-    deleted_book = service.delete_book(book_id)
+    deleted_book, author_name, genre_name = BookService(db).delete_book(book_id, cascade=cascade)
     
     return {
         "id": deleted_book.id,
@@ -196,24 +241,29 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
         "author_id": deleted_book.author_id,
         "genre_id": deleted_book.genre_id,
         "year": deleted_book.year,
-        "author_name": book.author.name if book.author else None,
-        "genre_name": book.genre.name if book.genre else None,
+        "author_name": author_name,
+        "genre_name": genre_name,
         "comments": []
     }
 
 
-@router.get("/search/", response_model=List[Book])
+@router.get("/search/", response_model=Union[BookSearchResult, List[Book]])
 def search_books(
     title: str = Query("", description="Название книги для поиска"),
+    genre_id: Optional[int] = Query(None, ge=1, description="Уточнение по жанру"),
+    author_id: Optional[int] = Query(None, ge=1, description="Уточнение по автору"),
+    decade: Optional[int] = Query(None, ge=1000, le=2100, description="Уточнение по десятилетию, например 1860"),
+    facets: bool = Query(False, description="Вернуть {items, total, facets} с количествами по жанру, автору и десятилетию"),
+    facet_limit: int = Query(20, ge=1, le=100, description="Сколько значений возвращать в каждом фасете"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
     """
-    Поиск книг по названию.
+    Поиск книг по названию с уточнением по жанру, автору и десятилетию.
     """
     service = BookService(db)
-    books = service.search_books(title, skip, limit)
+    books = service.search_books(title, skip, limit, genre_id, author_id, decade)
     
     result = []
     for book in books:
@@ -240,6 +290,10 @@ def search_books(
         
         result.append(book_data)
     
+    if facets:
+        # Фасеты считаются одним сгруппированным запросом по всему найденному множеству
+        summary = service.get_search_facets(title, genre_id, author_id, decade, facet_limit)
+        return {"items": result, **summary}
     return result
 
 
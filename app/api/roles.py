@@ -1,8 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.exceptions.roles import RoleInUseException
+from app.database.db_manager import DBManager
+from app.dependencies import get_uow
 from app.schemes.roles import Role, RoleCreate, RoleUpdate
 from app.services.roles import RoleService
 from app.exceptions.roles import (
@@ -14,48 +13,52 @@ router = APIRouter(prefix="/roles", tags=["roles"])
 
 
 @router.get("/", response_model=List[Role])
-def read_roles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    service = RoleService(db)
-    return service.get_roles(skip, limit)
+async def read_roles(skip: int = 0, limit: int = 100, uow: DBManager = Depends(get_uow)):
+    service = RoleService(uow.sync_session)
+    return await uow.run(service.get_roles, skip, limit)
 
 
 @router.get("/{role_id}", response_model=Role)
-def read_role(role_id: int, db: Session = Depends(get_db)):
-    service = RoleService(db)
-    role = service.get_role(role_id)
+async def read_role(role_id: int, uow: DBManager = Depends(get_uow)):
+    service = RoleService(uow.sync_session)
+    role = await uow.run(service.get_role, role_id)
     if role is None:
         raise RoleNotFoundException(role_id=role_id)
     return role
 
 
 @router.post("/", response_model=Role)
-def create_role(role: RoleCreate, db: Session = Depends(get_db)):
-    service = RoleService(db)
-    existing_role = service.get_role_by_name(role.name)
+async def create_role(role: RoleCreate, uow: DBManager = Depends(get_uow)):
+    service = RoleService(uow.sync_session)
+    existing_role = await uow.run(service.get_role_by_name, role.name)
     if existing_role:
         raise RoleAlreadyExistsException(role_name=role.name)
-    return service.create_role(role)
+    db_role = await uow.run(service.create_role, role)
+    await uow.commit()
+    return db_role
 
 
 @router.put("/{role_id}", response_model=Role)
-def update_role(role_id: int, role: RoleUpdate, db: Session = Depends(get_db)):
-    service = RoleService(db)
-    db_role = service.update_role(role_id, role)
+async def update_role(role_id: int, role: RoleUpdate, uow: DBManager = Depends(get_uow)):
+    service = RoleService(uow.sync_session)
+    db_role = await uow.run(service.update_role, role_id, role)
     if db_role is None:
         raise RoleNotFoundException(role_id=role_id)
+    await uow.commit()
     return db_role
 
 
 @router.delete("/{role_id}", response_model=Role)
-def delete_role(role_id: int, db: Session = Depends(get_db)):
-    service = RoleService(db)
-    db_role = service.get_role(role_id)
+async def delete_role(role_id: int, uow: DBManager = Depends(get_uow)):
+    service = RoleService(uow.sync_session)
+    db_role = await uow.run(service.get_role, role_id)
     if db_role is None:
         raise RoleNotFoundException(role_id=role_id)
     
-    # Проверяем, используется ли роль
-    if db_role.users:
+    # Проверяем, используется ли роль (EXISTS, без загрузки пользователей)
+    if await uow.run(service.is_role_in_use, role_id):
         raise RoleInUseException(role_name=db_role.name)
     
-    deleted_role = service.delete_role(role_id)
-    return deleted_role
\ No newline at end of file
+    deleted_role = await uow.run(service.delete_role, role_id)
+    await uow.commit()
+    return deleted_role
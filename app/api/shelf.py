@@ -1,9 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.database.database import get_db
-from app.schemes.shelf import Shelf, ShelfCreate, ShelfUpdate
-from app.services.shelf import ShelfService
+from app.schemes.shelf import (
+    Shelf,
+    ShelfCreate,
+    ShelfUpdate,
+    ShelfBatchRequest,
+    ShelfBatchResult,
+    ShelfHistoryEntry
+)
+from app.services.shelf import ShelfService, MAX_SHELF_BOOKS
 from app.exceptions.shelf import (
     ShelfEntryNotFoundException,
     BookAlreadyInShelfException,
@@ -50,6 +57,21 @@ def read_user_book_entry(user_id: int, book_id: int, db: Session = Depends(get_d
     return shelf_entry
 
 
+@router.get("/user/{user_id}/history", response_model=List[ShelfHistoryEntry])
+def read_shelf_history(
+    user_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_archived: bool = Query(False, description="Также читать архив истории полок"),
+    db: Session = Depends(get_db)
+):
+    """
+    Книги, убранные с полки пользователя, от последних к ранним.
+    """
+    service = ShelfService(db)
+    return service.get_shelf_history(user_id, skip, limit, include_archived)
+
+
 @router.get("/user/{user_id}/read", response_model=List[Shelf])
 def read_read_books(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     service = ShelfService(db)
@@ -59,18 +81,24 @@ def read_read_books(user_id: int, skip: int = 0, limit: int = 100, db: Session =
 @router.post("/", response_model=Shelf)
 def add_to_shelf(shelf: ShelfCreate, db: Session = Depends(get_db)):
     service = ShelfService(db)
-    
-    # Проверяем, не существует ли уже такой записи
-    existing_entry = service.get_user_book_entry(shelf.user_id, shelf.book_id)
-    if existing_entry:
-        raise BookAlreadyInShelfException(user_id=shelf.user_id, book_id=shelf.book_id)
-    
-    # Проверяем лимит книг на полке пользователя
-    user_books = service.get_user_shelf(shelf.user_id)
-    if len(user_books) >= 100:  # Лимит 100 книг
-        raise ShelfLimitExceededException(max_books=100)
-    
-    return service.add_to_shelf(shelf)
+    entry = service.add_to_shelf(shelf)
+    if entry is None:
+        # Вставка не произошла: выясняем причину только в этом случае
+        if service.get_user_book_entry(shelf.user_id, shelf.book_id):
+            raise BookAlreadyInShelfException(user_id=shelf.user_id, book_id=shelf.book_id)
+        raise ShelfLimitExceededException(max_books=MAX_SHELF_BOOKS)
+    return entry
+
+
+@router.post("/user/{user_id}/batch", response_model=ShelfBatchResult)
+def apply_shelf_batch(user_id: int, batch: ShelfBatchRequest, db: Session = Depends(get_db)):
+    """
+    Применить пакет операций add/mark_read/remove к полке пользователя в одной транзакции.
+    Ошибка одной операции не отменяет остальные: результат возвращается для каждой операции.
+    """
+    service = ShelfService(db)
+    results = service.apply_batch(user_id, batch.operations)
+    return {"user_id": user_id, "results": results}
 
 
 @router.put("/{shelf_id}", response_model=Shelf)
@@ -1,15 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.database.database import get_db
-from app.schemes.user import User, UserCreate, UserUpdate
+from app.schemes.books import SimilarBook
+from app.schemes.user import User, UserCreate, UserStats, UserUpdate
+from app.services.recommendations import RecommendationService
+from app.services.user_stats import UserStatsService
 from app.services.users import UserService
 from app.exceptions.users import (
     UserNotFoundException,
     UserAlreadyExistsException,
-    InvalidCredentialsException,
-    UserHasBooksException,
-    UserHasCommentsException
+    InvalidCredentialsException
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -30,6 +31,26 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 
+@router.get("/{user_id}/recommendations", response_model=List[SimilarBook])
+def read_user_recommendations(
+    user_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Рекомендации по полке пользователя: соседи его книг, которых на полке еще нет.
+    """
+    return RecommendationService(db).get_user_recommendations(user_id, limit)
+
+
+@router.get("/{user_id}/stats", response_model=UserStats)
+def read_user_stats(user_id: int, db: Session = Depends(get_db)):
+    """
+    Статистика полки пользователя: по жанрам, авторам, десятилетиям и прочитанным книгам.
+    """
+    return UserStatsService(db).get_stats(user_id)
+
+
 @router.get("/by-email/{email}", response_model=User)
 def read_user_by_email(email: str, db: Session = Depends(get_db)):
     service = UserService(db)
@@ -73,19 +94,9 @@ def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
 
 
 @router.delete("/{user_id}", response_model=User)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    service = UserService(db)
-    db_user = service.get_user(user_id)
-    if db_user is None:
-        raise UserNotFoundException(user_id=user_id)
-    
-    # Проверяем, есть ли у пользователя книги на полке
-    if db_user.shelf:
-        raise UserHasBooksException()
-    
-    # Проверяем, есть ли у пользователя комментарии
-    if db_user.book_comments:
-        raise UserHasCommentsException()
-    
-    deleted_user = service.delete_user(user_id)
-    return deleted_user
\ No newline at end of file
+def delete_user(
+    user_id: int,
+    cascade: bool = Query(False, description="Удалить вместе с полкой и комментариями"),
+    db: Session = Depends(get_db)
+):
+    return UserService(db).delete_user(user_id, cascade=cascade)
\ No newline at end of file
@@ -1,14 +1,12 @@
 # app/database/async_db.py
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator
 import os
-from dotenv import load_dotenv
+from app.database.database import SQLALCHEMY_DATABASE_URL
+from app.utils.load_shedding import TimedAsyncQueuePool
 
-load_dotenv()
-
-# Преобразуем DATABASE_URL для async
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./foliant.db")
+# Преобразуем DATABASE_URL для async (переменные окружения уже загружены в database.py)
+DATABASE_URL = SQLALCHEMY_DATABASE_URL
 
 # Если используется SQLite, преобразуем в aiosqlite
 if DATABASE_URL.startswith("sqlite"):
@@ -19,11 +17,21 @@ else:
 # Создаем async engine
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
     echo=False,
     future=True,
     pool_pre_ping=True,
 )
 
+
+def _dispose_after_fork():
+    # Дочерний процесс не должен использовать соединения пула родителя
+    async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
 # Создаем async session factory
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
@@ -33,8 +41,6 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
-Base = declarative_base()
-
 # Dependency для использования в маршрутах
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -5,17 +5,34 @@ from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 import os
 from dotenv import load_dotenv
+from app.utils.load_shedding import TimedQueuePool
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./foliant.db")
 
+# create_engine не подключается к БД: первое соединение открывает lifespan (main.py),
+# а модульный engine/SessionLocal нужен сервисам, фоновым задачам и alembic без приложения
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
+    # Время ожидания соединения учитывается при сбросе нагрузки (app/middleware.py)
+    poolclass=TimedQueuePool,
     connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _dispose_after_fork():
+    # Соединения пула нельзя разделять между процессами (особенно для SQLite):
+    # дочерний процесс забывает унаследованные соединения, не закрывая их
+    engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+# Объекты не истекают после commit: ответ строится из значений, полученных
+# при записи (INSERT/UPDATE ... RETURNING), без повторного SELECT на каждое поле
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
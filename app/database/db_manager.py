@@ -1,23 +1,93 @@
-from app.database.database import async_session_maker
-from app.repositories.roles import RolesRepository
-from app.repositories.users import UsersRepository
+# app/database/db_manager.py
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.database.async_db import AsyncSessionLocal
+from app.repositories.authors import AuthorRepository
+from app.repositories.book_comments import BookCommentRepository
+from app.repositories.books import BookRepository
+from app.repositories.gengres import GenreRepository
+from app.repositories.roles import RoleRepository
+from app.repositories.shelf import ShelfRepository
+from app.repositories.users import UserRepository
+
+T = TypeVar("T")
 
 
 class DBManager:
-    def __init__(self, session_factory: async_session_maker):
+    """
+    Единица работы: все репозитории на одной AsyncSession и одна транзакция,
+    которая фиксируется только явным commit().
+
+    Репозитории синхронные и работают с session.sync_session, поэтому их методы
+    вызываются через run() - он выполняет функцию внутри AsyncSession.run_sync,
+    не блокируя цикл событий:
+
+        async with DBManager() as db:
+            book = await db.run(db.books.get, book_id)
+            await db.run(db.books.update, book, data)
+            await db.commit()
+
+    Все, что не зафиксировано commit(), откатывается при выходе (и при исключении).
+
+    Сервисы (app/services) в единицу работы пока не входят: каждый метод записи
+    сам делает commit и после него сбрасывает кэши и рейтинги, поэтому вызов сервиса
+    внутри DBManager зафиксировал бы транзакцию раньше commit() единицы работы.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
         self.session_factory = session_factory
+        self.session: Optional[AsyncSession] = None
 
-    async def __aenter__(self):
+    async def __aenter__(self) -> "DBManager":
         self.session = self.session_factory()
-        # TODO Добавить сюда созданные репозитории
-        # Пример:
-        self.users = UsersRepository(self.session)
-        self.roles = RolesRepository(self.session)
+        db = self.session.sync_session
+        self.books = BookRepository(db)
+        self.authors = AuthorRepository(db)
+        self.genres = GenreRepository(db)
+        self.comments = BookCommentRepository(db)
+        self.shelf = ShelfRepository(db)
+        self.users = UserRepository(db)
+        self.roles = RoleRepository(db)
         return self
 
-    async def __aexit__(self, *args):
-        await self.session.rollback()
-        await self.session.close()
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self.session.in_transaction():
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+
+    @property
+    def sync_session(self) -> Session:
+        """
+        Синхронная сессия для запросов вне репозиториев; использовать только внутри run().
+        """
+        return self.session.sync_session
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Вызвать синхронный метод репозитория или сервиса в контексте этой сессии.
+        """
+        return await self.session.run_sync(lambda _: fn(*args, **kwargs))
+
+    async def flush(self) -> None:
+        await self.session.flush()
 
-    async def commit(self):
+    async def commit(self) -> None:
         await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator["DBManager"]:
+        """
+        SAVEPOINT внутри текущей транзакции: при исключении откатываются только
+        изменения блока, внешняя транзакция продолжается.
+        """
+        async with self.session.begin_nested():
+            yield self
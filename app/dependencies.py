@@ -0,0 +1,13 @@
+# app/dependencies.py
+from typing import AsyncGenerator
+
+from app.database.db_manager import DBManager
+
+
+async def get_uow() -> AsyncGenerator[DBManager, None]:
+    """
+    Единица работы на время запроса: одна AsyncSession и одна транзакция;
+    маршрут фиксирует изменения явным await uow.commit().
+    """
+    async with DBManager() as uow:
+        yield uow
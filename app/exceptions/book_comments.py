@@ -30,4 +30,29 @@ class CommentDeleteNotAllowedException(HTTPException):
         super().__init__(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not allowed to delete this comment"
-        )
\ No newline at end of file
+        )
+
+
+class CommentQueueFullException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Comment queue is full, try again later",
+            headers={"Retry-After": "1"}
+        )
+
+
+class QueuedCommentNotFoundException(HTTPException):
+    def __init__(self, provisional_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Queued comment '{provisional_id}' not found"
+        )
+
+
+class InvalidCommentCursorException(HTTPException):
+    def __init__(self, cursor: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid comments cursor '{cursor}'"
+        )
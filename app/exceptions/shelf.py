@@ -18,7 +18,7 @@ class ShelfEntryNotFoundException(HTTPException):
 class BookAlreadyInShelfException(HTTPException):
     def __init__(self, user_id: int, book_id: int):
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail=f"Book {book_id} is already in shelf for user {user_id}"
         )
 
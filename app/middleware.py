@@ -0,0 +1,137 @@
+# app/middleware.py
+import os
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.load_shedding import loop_lag, pool_wait
+from app.utils.rate_limit import MemoryTokenBuckets, SqliteTokenBuckets, retry_after_header
+
+# Ограничение запросов: ведро на клиента пополняется RATE_LIMIT_RATE токенами в секунду
+# и вмещает RATE_LIMIT_BURST; 0 в RATE_LIMIT_RATE отключает ограничение
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "10"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "50"))
+# memory - ведра в памяти воркера; sqlite - в файле RATE_LIMIT_SQLITE_PATH, общем для воркеров машины
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./ratelimit.db")
+
+# Сброс нагрузки: 503 с Retry-After, пока задержка цикла событий или ожидание
+# соединения из пула выше порога (миллисекунды; 0 отключает проверку)
+SHED_LOOP_LAG_MS = float(os.getenv("SHED_LOOP_LAG_MS", "250"))
+SHED_POOL_WAIT_MS = float(os.getenv("SHED_POOL_WAIT_MS", "1000"))
+SHED_RETRY_AFTER_SECONDS = int(os.getenv("SHED_RETRY_AFTER_SECONDS", "2"))
+
+# Пути, к которым ограничения не применяются
+EXEMPT_PREFIXES = ("/health", "/app/static", "/admin/statics")
+
+# Стоимость запроса в токенах (по умолчанию 1): метод, путь, стоимость
+ROUTE_COSTS: List[Tuple[str, re.Pattern, float]] = [
+    # bcrypt: проверка и хэширование пароля
+    ("POST", re.compile(r"^/users/login/?$"), 10),
+    ("POST", re.compile(r"^/users/?$"), 10),
+    ("PUT", re.compile(r"^/users/\d+/?$"), 5),
+    ("GET", re.compile(r"^/books/search/?$"), 5),
+    ("GET", re.compile(r"^/books/autocomplete/?$"), 0.5),
+]
+# Списки: за каждые LIMIT_COST_STEP строк сверх первых LIMIT_COST_STEP - еще токен
+LIMIT_COST_STEP = 100
+
+
+def route_cost(method: str, path: str, query_string: bytes) -> float:
+    cost = 1.0
+    for route_method, pattern, route_cost_value in ROUTE_COSTS:
+        if route_method == method and pattern.match(path):
+            cost = route_cost_value
+            break
+    limit = parse_qs(query_string.decode("latin-1")).get("limit")
+    if limit and limit[0].isdigit():
+        cost += max(0, int(limit[0]) - 1) // LIMIT_COST_STEP
+    return cost
+
+
+def _client_key(scope: Scope) -> str:
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+def _exempt(scope: Scope) -> bool:
+    return scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES)
+
+
+class RateLimitMiddleware:
+    """
+    Ограничение запросов ведром токенов на клиента (по адресу подключения)
+    со стоимостью маршрута: вход и регистрация (bcrypt), поиск и большие
+    limit списывают больше токенов. Подзапросы /batch/ проходят через
+    это же middleware и списываются по отдельности.
+    При нехватке токенов - 429 с Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp, buckets=None, rate: float = RATE_LIMIT_RATE, burst: float = RATE_LIMIT_BURST):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        if buckets is None:
+            buckets = SqliteTokenBuckets(RATE_LIMIT_SQLITE_PATH) if RATE_LIMIT_BACKEND == "sqlite" else MemoryTokenBuckets()
+        self.buckets = buckets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.rate <= 0 or _exempt(scope):
+            await self.app(scope, receive, send)
+            return
+        cost = route_cost(scope["method"], scope["path"], scope.get("query_string", b""))
+        retry_after = self.buckets.take(_client_key(scope), cost, self.rate, self.burst)
+        if retry_after > 0:
+            response = JSONResponse(
+                {"detail": "Слишком много запросов, повторите позже"},
+                status_code=429,
+                headers={"Retry-After": retry_after_header(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class LoadSheddingMiddleware:
+    """
+    Сброс нагрузки: пока задержка цикла событий (app.utils.load_shedding.monitor_loop_lag)
+    или ожидание соединения из пула БД выше порога, новые запросы сразу получают
+    503 с Retry-After и не занимают потоки и соединения.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        loop_lag_ms: float = SHED_LOOP_LAG_MS,
+        pool_wait_ms: float = SHED_POOL_WAIT_MS,
+        retry_after: int = SHED_RETRY_AFTER_SECONDS,
+    ):
+        self.app = app
+        self.loop_lag_ms = loop_lag_ms
+        self.pool_wait_ms = pool_wait_ms
+        self.retry_after = retry_after
+
+    def overload_reason(self) -> Optional[str]:
+        if self.loop_lag_ms > 0 and loop_lag.value * 1000 > self.loop_lag_ms:
+            return "event loop lag"
+        if self.pool_wait_ms > 0 and pool_wait.value * 1000 > self.pool_wait_ms:
+            return "database pool wait"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if _exempt(scope):
+            await self.app(scope, receive, send)
+            return
+        reason = self.overload_reason()
+        if reason is not None:
+            response = JSONResponse(
+                {"detail": f"Сервис перегружен ({reason}), повторите позже"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
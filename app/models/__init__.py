@@ -6,6 +6,15 @@ from .authors import AuthorsModel
 from .gengres import GengresModel
 from .book_comments import BookCommentsModel
 from .shelf import ShelfModel
+from .book_similarities import BookSimilarityModel
+from .analytics import (
+    AnalyticsStateModel,
+    GenreStatsModel,
+    AuthorStatsModel,
+    DailyActivityModel
+)
+from .archive import BookCommentArchiveModel, ShelfArchiveModel
+from .rankings import BookRankingEventModel, BookRankingTotalModel
 
 __all__ = [
     "RoleModel",
@@ -14,5 +23,14 @@ __all__ = [
     "AuthorsModel",
     "GengresModel",
     "BookCommentsModel",
-    "ShelfModel"
+    "ShelfModel",
+    "BookSimilarityModel",
+    "AnalyticsStateModel",
+    "GenreStatsModel",
+    "AuthorStatsModel",
+    "DailyActivityModel",
+    "BookCommentArchiveModel",
+    "ShelfArchiveModel",
+    "BookRankingEventModel",
+    "BookRankingTotalModel"
 ]
\ No newline at end of file
@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+
+# Витрины аналитики: снимки, которые пересчитывает фоновая задача (app/services/analytics.py).
+# Внешних ключей нет, чтобы снимок не мешал удалять жанры и авторов.
+
+
+class AnalyticsStateModel(Base):
+    """
+    Отметка последней учтенной строки (high-water mark) для каждого источника витрин.
+    """
+    __tablename__ = "analytics_state"
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class GenreStatsModel(Base):
+    """
+    Книги по жанру и конверсия полки в прочтение.
+    """
+    __tablename__ = "analytics_genre_stats"
+    genre_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    genre_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    books_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    shelved_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    read_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class AuthorStatsModel(Base):
+    """
+    Книги и добавления на полку по автору.
+    """
+    __tablename__ = "analytics_author_stats"
+    author_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    author_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    books_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    shelved_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyActivityModel(Base):
+    """
+    Комментарии и активные пользователи (комментировали или добавляли на полку) по дням (UTC).
+    """
+    __tablename__ = "analytics_daily_activity"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    shelf_adds_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    active_users: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
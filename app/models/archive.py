@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+
+# Архив мягко удаленных комментариев и записей полок (app/services/archive.py): переносятся
+# только строки, удаленные раньше порога хранения; действующие строки остаются в горячих таблицах.
+# Строки переносятся с исходными id; внешних ключей нет, индексы - только для чтения
+# архива (по книге, пользователю и дате создания для дневной аналитики),
+# чтобы архив оставался компактным и не мешал удалять книги и пользователей.
+
+
+class BookCommentArchiveModel(Base):
+    __tablename__ = "book_comments_archive"
+    __table_args__ = (
+        Index("ix_book_comments_archive_book_created", "book_id", "created_at", "id"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    book_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    comment_text: Mapped[str] = mapped_column(String(200))
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ShelfArchiveModel(Base):
+    __tablename__ = "shelf_archive"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    book_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    status_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
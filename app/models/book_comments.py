@@ -1,20 +1,38 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
+from app.models.soft_delete import SoftDeleteMixin
 
 if TYPE_CHECKING:
     from app.models.users import UserModel
     from app.models.books import BooksModel
 
-class BookCommentsModel(Base):
+class BookCommentsModel(SoftDeleteMixin, Base):
     __tablename__ = "book_comments"
+    __table_args__ = (
+        # Keyset-пагинация ленты комментариев книги по (created_at, id); только неудаленные
+        Index(
+            "ix_book_comments_book_created", "book_id", "created_at", "id",
+            sqlite_where=text("deleted_at IS NULL"),
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Отбор удаленных строк для архива (deleted_at < :порог): только удаленные
+        Index(
+            "ix_book_comments_deleted_at", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+            postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+        # id не переиспользуются после удаления последней строки: архив хранит
+        # перенесенные строки под теми же id (см. ArchiveRepository)
+        {"sqlite_autoincrement": True},
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False)
     book: Mapped["BooksModel"] = relationship(back_populates="book_comments")
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     user: Mapped["UserModel"] = relationship(back_populates="book_comments")
     comment_text: Mapped[str] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+
+class BookSimilarityModel(Base):
+    """
+    Top-K соседей книги по совместному нахождению на полках ("читатели также добавили").
+    Заполняется сервисом рекомендаций, читается по book_id без вычислений.
+    """
+    __tablename__ = "book_similarities"
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), primary_key=True)
+    similar_book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
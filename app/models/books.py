@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import ForeignKey, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.database.database import Base
+from app.utils.text_search import normalize, title_key
 
 if TYPE_CHECKING:
     from app.models.authors import AuthorsModel
@@ -12,11 +13,22 @@ if TYPE_CHECKING:
 
 class BooksModel(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # Одна книга с таким названием (с точностью до регистра и ё/е) у автора
+        Index("uq_books_title_key_author", "title_key", "author_id", unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    title: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    # Ключи названия, заполняются из title (см. title_columns):
+    # нечеткий для поиска похожих книг (app.utils.text_search.normalize)
+    # и точный для уникальности (app.utils.text_search.title_key)
+    normalized_title: Mapped[str] = mapped_column(Text, nullable=False)
+    title_key: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Счетчик комментариев, поддерживается сервисом комментариев
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     
     # Внешние ключи
     author_id: Mapped[int] = mapped_column(ForeignKey("authors.id"), nullable=False)
@@ -26,4 +38,22 @@ class BooksModel(Base):
     author: Mapped["AuthorsModel"] = relationship(back_populates="books")
     genre: Mapped["GengresModel"] = relationship(back_populates="books")
     shelf_entries: Mapped[list["ShelfModel"]] = relationship(back_populates="book")
-    book_comments: Mapped[list["BookCommentsModel"]] = relationship(back_populates="book")
\ No newline at end of file
+    book_comments: Mapped[list["BookCommentsModel"]] = relationship(back_populates="book")
+
+    @staticmethod
+    def title_columns(title: str) -> dict:
+        """
+        Значения ключей названия для title.
+
+        Ключи вычисляются в Python (в SQLite нет casefold для кириллицы), поэтому
+        @validates срабатывает только при изменении атрибута объекта. Core-выражения
+        insert()/update() с title обходят его и должны передавать title_columns(title)
+        сами, как BookRepository.create_with_names и update_with_names.
+        """
+        return {"normalized_title": normalize(title or ""), "title_key": title_key(title or "")}
+
+    @validates("title")
+    def _set_title_columns(self, key, title):
+        for column, value in self.title_columns(title).items():
+            setattr(self, column, value)
+        return title
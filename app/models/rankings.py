@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+
+# Рейтинги книг (app/services/rankings.py) хранятся как журнал событий, который пишут
+# сервисы полки и комментариев в своих транзакциях. Внешних ключей нет: журнал не мешает
+# удалять книги, а рейтинг пропускает отсутствующие книги при выдаче.
+
+
+class BookRankingEventModel(Base):
+    """
+    Изменение счета книги: добавление на полку, прочтение или комментарий (delta > 0)
+    либо их отмена (delta < 0). Воркеры дочитывают журнал по id.
+    """
+    __tablename__ = "book_ranking_events"
+    # id не переиспользуются после сжатия журнала: по ним воркеры отмечают прочитанное
+    __table_args__ = ({"sqlite_autoincrement": True},)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class BookRankingTotalModel(Base):
+    """
+    Итог счета книги по событиям, свернутым из журнала (старше самого длинного окна трендов).
+    """
+    __tablename__ = "book_ranking_totals"
+    book_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,18 +1,42 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, ForeignKey
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
+from app.models.soft_delete import SoftDeleteMixin
 
 if TYPE_CHECKING:
     from app.models.users import UserModel
     from app.models.books import BooksModel
 
-class ShelfModel(Base):
+class ShelfModel(SoftDeleteMixin, Base):
     __tablename__ = "shelf"
+    __table_args__ = (
+        # Одна действующая запись на пару пользователь/книга; удаленные остаются историей.
+        # Используется в ON CONFLICT при добавлении (с тем же index_where)
+        Index(
+            "uq_shelf_user_book", "user_id", "book_id",
+            unique=True,
+            sqlite_where=text("deleted_at IS NULL"),
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Отбор удаленных строк для архива (deleted_at < :порог): только удаленные
+        Index(
+            "ix_shelf_deleted_at", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+            postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+        # id не переиспользуются после удаления последней строки: архив хранит
+        # перенесенные строки под теми же id (см. ArchiveRepository)
+        {"sqlite_autoincrement": True},
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
-    book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False)
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False, index=True)
     book: Mapped["BooksModel"] = relationship(back_populates="shelf_entries")
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # Отдельный индекс по user_id: uq_shelf_user_book частичный и не покрывает историю полки
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     user: Mapped["UserModel"] = relationship(back_populates="shelf")
-    status_read: Mapped[bool] = mapped_column(Boolean, default=False)
\ No newline at end of file
+    status_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Время добавления на полку (для трендов); у записей до миграции пусто
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, nullable=True, index=True)
\ No newline at end of file
@@ -0,0 +1,30 @@
+# app/models/soft_delete.py
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, event
+from sqlalchemy.orm import Mapped, ORMExecuteState, Session, mapped_column, with_loader_criteria
+
+
+class SoftDeleteMixin:
+    """
+    Мягкое удаление: строка помечается deleted_at и остается в таблице
+    до переноса в архив (app/services/archive.py).
+
+    Все ORM-запросы через Session (SELECT, UPDATE, DELETE, ленивые загрузки
+    связей, подзапросы) автоматически получают условие deleted_at IS NULL;
+    удаленные строки видны только с execution_options(include_deleted=True).
+    Частичные индексы моделей построены с тем же условием.
+    """
+
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted(state: ORMExecuteState) -> None:
+    if state.is_column_load or state.execution_options.get("include_deleted", False):
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
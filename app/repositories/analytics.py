@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import Date, case, delete, distinct, func, insert, select, union, union_all
+from sqlalchemy.orm import Session
+from app.models.analytics import (
+    AnalyticsStateModel,
+    AuthorStatsModel,
+    DailyActivityModel,
+    GenreStatsModel,
+)
+from app.models.archive import BookCommentArchiveModel, ShelfArchiveModel
+from app.models.authors import AuthorsModel
+from app.models.book_comments import BookCommentsModel
+from app.models.books import BooksModel
+from app.models.gengres import GengresModel
+from app.models.shelf import ShelfModel
+from app.repositories.base import BaseRepository
+
+
+def _day(column):
+    return func.date(column, type_=Date)
+
+
+# Источники дневной активности: горячая таблица (вместе с мягко удаленными строками) и ее архив.
+# Удаление комментария или записи полки не меняет историю активности
+_ACTIVITY_SOURCES = {
+    "book_comments": (BookCommentsModel, BookCommentArchiveModel),
+    "shelf": (ShelfModel, ShelfArchiveModel),
+}
+
+
+class AnalyticsRepository(BaseRepository[AnalyticsStateModel]):
+    """
+    Чтение и пересчет витрин аналитики. Методы пересчета не делают commit.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(AnalyticsStateModel, db)
+
+    # ---------- Чтение витрин ----------
+
+    def get_genre_stats(self) -> List[GenreStatsModel]:
+        return self.db.query(GenreStatsModel).order_by(GenreStatsModel.books_count.desc(), GenreStatsModel.genre_name).all()
+
+    def get_author_stats(self, limit: int = 100) -> List[AuthorStatsModel]:
+        return self.db.query(AuthorStatsModel)\
+            .order_by(AuthorStatsModel.books_count.desc(), AuthorStatsModel.author_name)\
+            .limit(limit)\
+            .all()
+
+    def get_daily_activity(self, since: date) -> List[DailyActivityModel]:
+        return self.db.query(DailyActivityModel)\
+            .filter(DailyActivityModel.day >= since)\
+            .order_by(DailyActivityModel.day)\
+            .all()
+
+    def get_states(self) -> Dict[str, AnalyticsStateModel]:
+        return {state.source: state for state in self.db.query(AnalyticsStateModel)}
+
+    # ---------- Пересчет ----------
+
+    def get_catalog_stats(self) -> Tuple[List[dict], List[dict]]:
+        """
+        Строки витрин по жанрам и авторам, только чтением: полка группируется по книге
+        за один проход, суммы по жанрам и авторам складываются в Python (по строке на книгу).
+        """
+        shelf = {
+            book_id: (shelved, read) for book_id, shelved, read in self.db.execute(
+                select(
+                    ShelfModel.book_id,
+                    func.count(),
+                    func.sum(case((ShelfModel.status_read.is_(True), 1), else_=0))
+                ).group_by(ShelfModel.book_id)
+            )
+        }
+        genres = {
+            genre_id: {"genre_id": genre_id, "genre_name": name, "books_count": 0, "shelved_count": 0, "read_count": 0}
+            for genre_id, name in self.db.execute(select(GengresModel.id, GengresModel.name))
+        }
+        authors = {
+            author_id: {"author_id": author_id, "author_name": name, "books_count": 0, "shelved_count": 0}
+            for author_id, name in self.db.execute(select(AuthorsModel.id, AuthorsModel.name))
+        }
+        for book_id, genre_id, author_id in self.db.execute(select(BooksModel.id, BooksModel.genre_id, BooksModel.author_id)):
+            shelved, read = shelf.get(book_id, (0, 0))
+            if genre_id in genres:
+                genre = genres[genre_id]
+                genre["books_count"] += 1
+                genre["shelved_count"] += shelved
+                genre["read_count"] += read
+            if author_id in authors:
+                author = authors[author_id]
+                author["books_count"] += 1
+                author["shelved_count"] += shelved
+        return list(genres.values()), list(authors.values())
+
+    def replace_catalog_stats(self, genres: List[dict], authors: List[dict]) -> None:
+        """
+        Заменить витрины по жанрам и авторам готовыми строками (без commit).
+        """
+        for model, rows in ((GenreStatsModel, genres), (AuthorStatsModel, authors)):
+            self.db.execute(delete(model))
+            if rows:
+                self.db.execute(insert(model), rows)
+
+    def get_touched_days(self, marks: Dict[str, int], upto: Dict[str, int]) -> Set[date]:
+        """
+        Дни строк с id в (marks[source], upto[source]] для book_comments и shelf
+        (вместе с удаленными и уже перенесенными в архив).
+        """
+        stmt = union(*[
+            select(_day(model.created_at)).where(model.id > marks[source], model.id <= upto[source])
+            for source, models in _ACTIVITY_SOURCES.items()
+            for model in models
+        ]).execution_options(include_deleted=True)
+        return {day for day in self.db.scalars(stmt) if day is not None}
+
+    def get_daily_activity_rows(self, first_day: date, last_day: date) -> List[dict]:
+        """
+        Дневные показатели за [first_day, last_day] по индексам created_at, только чтением.
+        Учитываются и удаленные строки, и архив: показатели дня не зависят от того,
+        что потом удалили.
+        """
+        start = datetime.combine(first_day, datetime.min.time())
+        end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+
+        def created_in_range(source: str):
+            return union_all(*[
+                select(_day(model.created_at).label("day"), model.user_id.label("user_id"))
+                .where(model.created_at >= start, model.created_at < end)
+                for model in _ACTIVITY_SOURCES[source]
+            ]).subquery()
+
+        def per_day(stmt) -> dict:
+            return dict(self.db.execute(stmt.execution_options(include_deleted=True)).all())
+
+        comments_rows = created_in_range("book_comments")
+        shelf_rows = created_in_range("shelf")
+        comments = per_day(select(comments_rows.c.day, func.count()).group_by(comments_rows.c.day))
+        shelf_adds = per_day(select(shelf_rows.c.day, func.count()).group_by(shelf_rows.c.day))
+        activity = union(
+            select(comments_rows.c.day, comments_rows.c.user_id),
+            select(shelf_rows.c.day, shelf_rows.c.user_id),
+        ).subquery()
+        active_users = per_day(
+            select(activity.c.day, func.count(distinct(activity.c.user_id))).group_by(activity.c.day)
+        )
+
+        return [
+            {
+                "day": day,
+                "comments_count": comments.get(day, 0),
+                "shelf_adds_count": shelf_adds.get(day, 0),
+                "active_users": active_users.get(day, 0),
+            }
+            for day in sorted(set(comments) | set(shelf_adds))
+        ]
+
+    def replace_daily_activity(self, first_day: date, last_day: date, rows: List[dict]) -> None:
+        """
+        Заменить дневные показатели за [first_day, last_day] (без commit).
+        """
+        self.db.execute(delete(DailyActivityModel).where(
+            DailyActivityModel.day >= first_day, DailyActivityModel.day <= last_day
+        ))
+        if rows:
+            self.db.execute(insert(DailyActivityModel), rows)
+
+    def get_max_ids(self) -> Dict[str, int]:
+        return {
+            source: max(
+                self.db.scalar(select(func.max(model.id)).execution_options(include_deleted=True)) or 0
+                for model in models
+            )
+            for source, models in _ACTIVITY_SOURCES.items()
+        }
+
+    def save_state(self, source: str, last_id: int, refreshed_at: datetime) -> None:
+        # Один UPSERT без предварительного SELECT (без commit)
+        stmt = self._insert().values(source=source, last_id=last_id, refreshed_at=refreshed_at)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["source"],
+            set_={"last_id": stmt.excluded.last_id, "refreshed_at": stmt.excluded.refreshed_at}
+        ))
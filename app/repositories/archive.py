@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import delete, literal, select
+from sqlalchemy.orm import Session
+from app.models.archive import BookCommentArchiveModel, ShelfArchiveModel
+from app.models.book_comments import BookCommentsModel
+from app.models.shelf import ShelfModel
+from app.repositories.base import BaseRepository
+
+_COMMENT_COLUMNS = ["id", "book_id", "user_id", "comment_text", "created_at", "deleted_at"]
+_SHELF_COLUMNS = ["id", "user_id", "book_id", "status_read", "created_at", "deleted_at"]
+
+
+class ArchiveRepository(BaseRepository[BookCommentArchiveModel]):
+    """
+    Перенос строк из горячих таблиц в архив пачками: INSERT ... SELECT и DELETE
+    по одному списку id. Пачка отбирается по частичным индексам deleted_at
+    (самые давно удаленные первыми). Методы не делают commit.
+
+    Архивацию могут одновременно запустить несколько воркеров: строку, которую
+    другой воркер уже перенес, INSERT пропускает (ON CONFLICT (id) DO NOTHING),
+    а DELETE просто не находит. id горячих таблиц не переиспользуются
+    (AUTOINCREMENT в SQLite), поэтому конфликт означает именно эту строку.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(BookCommentArchiveModel, db)
+
+    def archive_comments(self, deleted_before: datetime, batch_size: int) -> int:
+        """
+        Перенести до batch_size комментариев, удаленных раньше deleted_before.
+        Действующие комментарии остаются в горячей таблице: их можно изменить
+        и удалить, и они учтены в comments_count книги.
+        Возвращает число перенесенных.
+        """
+        ids = list(self.db.scalars(
+            select(BookCommentsModel.id)
+            .where(BookCommentsModel.deleted_at < deleted_before)
+            .order_by(BookCommentsModel.deleted_at)
+            .limit(batch_size)
+            .execution_options(include_deleted=True)
+        ))
+        if ids:
+            self._move(BookCommentsModel, BookCommentArchiveModel, _COMMENT_COLUMNS, ids)
+        return len(ids)
+
+    def archive_shelf(self, deleted_before: datetime, batch_size: int) -> int:
+        """
+        Перенести до batch_size записей истории полок, убранных раньше deleted_before.
+        Действующие записи остаются в горячей таблице.
+        """
+        ids = list(self.db.scalars(
+            select(ShelfModel.id)
+            .where(ShelfModel.deleted_at < deleted_before)
+            .order_by(ShelfModel.deleted_at)
+            .limit(batch_size)
+            .execution_options(include_deleted=True)
+        ))
+        if ids:
+            self._move(ShelfModel, ShelfArchiveModel, _SHELF_COLUMNS, ids)
+        return len(ids)
+
+    def _move(self, source, target, columns: List[str], ids: List[int]) -> None:
+        rows = select(*[getattr(source, column) for column in columns], literal(datetime.utcnow()))\
+            .where(source.id.in_(ids))
+        self.db.execute(
+            self._insert(target)
+            .from_select(columns + ["archived_at"], rows)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        self.db.execute(
+            delete(source)
+            .where(source.id.in_(ids))
+            .execution_options(synchronize_session=False, include_deleted=True)
+        )
@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.authors import AuthorsModel
+from app.models.books import BooksModel
 from app.repositories.base import BaseRepository
 
 
@@ -9,4 +11,7 @@ class AuthorRepository(BaseRepository[AuthorsModel]):
         super().__init__(AuthorsModel, db)
 
     def get_by_name(self, name: str) -> Optional[AuthorsModel]:
-        return self.db.query(AuthorsModel).filter(AuthorsModel.name == name).first()
\ No newline at end of file
+        return self.db.query(AuthorsModel).filter(AuthorsModel.name == name).first()
+
+    def delete_blockers(self, author_id: int) -> Dict[str, object]:
+        return {"has_books": select(BooksModel.id).where(BooksModel.author_id == author_id).exists()}
\ No newline at end of file
@@ -1,39 +1,126 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from datetime import datetime
+from typing import Dict, Generic, Iterable, TypeVar, Type, Optional, List
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 from app.database.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
 class BaseRepository(Generic[ModelType]):
+    """
+    Репозитории не фиксируют транзакцию: запись отправляется в БД через flush,
+    а commit делает вызывающий код (сервис или единица работы DBManager) -
+    один раз на операцию, после всех ее изменений.
+    """
+
     def __init__(self, model: Type[ModelType], db: Session):
         self.model = model
         self.db = db
 
+    def _insert(self, model=None):
+        """
+        INSERT с поддержкой ON CONFLICT для диалекта текущего подключения
+        (в таблицу модели репозитория или model).
+        """
+        model = self.model if model is None else model
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
+
     def get(self, id: int) -> Optional[ModelType]:
         return self.db.query(self.model).filter(self.model.id == id).first()
 
+    def get_many(self, ids: Iterable[int]) -> Dict[int, ModelType]:
+        """
+        Строки по списку id: уже загруженные в сессию берутся из ее identity map,
+        остальные читаются одним SELECT ... WHERE id IN (...).
+        """
+        found = {}
+        missing = []
+        for id in ids:
+            db_obj = self.db.identity_map.get(identity_key(self.model, id))
+            if db_obj is not None:
+                found[id] = db_obj
+            else:
+                missing.append(id)
+        if missing:
+            found.update((db_obj.id, db_obj) for db_obj in self.db.scalars(select(self.model).where(self.model.id.in_(missing))))
+        return found
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return self.db.query(self.model).offset(skip).limit(limit).all()
 
     def create(self, obj_in: dict) -> ModelType:
+        """
+        Вставить строку (flush, без commit). id и серверные значения по умолчанию
+        приходят в том же INSERT ... RETURNING, повторного SELECT нет.
+        """
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self.db.flush()
         return db_obj
 
     def update(self, db_obj: ModelType, obj_in: dict) -> ModelType:
+        """
+        Обновить измененные поля одним UPDATE (flush, без commit).
+        """
         for field in obj_in:
             if hasattr(db_obj, field):
                 setattr(db_obj, field, obj_in[field])
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self.db.flush()
         return db_obj
 
     def delete(self, id: int) -> Optional[ModelType]:
+        """
+        Удалить строку (flush, без commit).
+        """
         db_obj = self.get(id)
         if db_obj:
             self.db.delete(db_obj)
-            self.db.commit()
-        return db_obj
\ No newline at end of file
+            self.db.flush()
+        return db_obj
+
+    def soft_delete(self, id: int) -> Optional[ModelType]:
+        """
+        Пометить строку модели с SoftDeleteMixin удаленной одним UPDATE ... RETURNING (без commit).
+        None - строки нет или она уже удалена.
+        """
+        stmt = update(self.model)\
+            .where(self.model.id == id)\
+            .values(deleted_at=datetime.utcnow())\
+            .returning(self.model)\
+            .execution_options(synchronize_session=False)
+        db_obj = self.db.scalars(stmt).first()
+        if db_obj is not None:
+            # После commit строка не видна запросам: отвязываем объект, чтобы он не перечитывался
+            self.db.expunge(db_obj)
+        return db_obj
+
+    def delete_unless(self, id: int, blockers: Iterable = (), **columns) -> Optional[Row]:
+        """
+        Удалить строку одним DELETE ... WHERE id = :id AND NOT EXISTS (...) RETURNING,
+        если ни одно из условий blockers (EXISTS-подзапросов) не выполняется (без commit).
+        Возвращает (объект, *columns) - columns вычисляются в том же RETURNING;
+        None - строки нет или удаление запрещено, причину покажет get_blockers.
+        """
+        stmt = delete(self.model)\
+            .where(self.model.id == id, *[~blocker for blocker in blockers])\
+            .returning(self.model, *[column.label(name) for name, column in columns.items()])\
+            .execution_options(synchronize_session=False)
+        row = self.db.execute(stmt).first()
+        if row is not None:
+            # Строки уже нет: объект отвязывается от сессии, чтобы commit его не перечитывал
+            self.db.expunge(row[0])
+        return row
+
+    def get_blockers(self, id: int, blockers: Dict[str, object]) -> Optional[Row]:
+        """
+        Строка и все условия одним SELECT: (объект, *флаги с именами из blockers)
+        или None, если строки нет.
+        """
+        stmt = select(self.model, *[blocker.label(name) for name, blocker in blockers.items()])\
+            .where(self.model.id == id)
+        return self.db.execute(stmt).first()
\ No newline at end of file
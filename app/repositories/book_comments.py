@@ -1,6 +1,10 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, Union
+from sqlalchemy import Select, delete, func, insert, select, tuple_, update
 from sqlalchemy.orm import Session
+from app.models.archive import BookCommentArchiveModel
 from app.models.book_comments import BookCommentsModel
+from app.models.books import BooksModel
 from app.repositories.base import BaseRepository
 
 
@@ -9,7 +13,109 @@ class BookCommentRepository(BaseRepository[BookCommentsModel]):
         super().__init__(BookCommentsModel, db)
 
     def get_by_book(self, book_id: int, skip: int = 0, limit: int = 100) -> List[BookCommentsModel]:
-        return self.db.query(BookCommentsModel).filter(BookCommentsModel.book_id == book_id).offset(skip).limit(limit).all()
+        return self.db.query(BookCommentsModel)\
+            .filter(BookCommentsModel.book_id == book_id)\
+            .order_by(BookCommentsModel.created_at.desc(), BookCommentsModel.id.desc())\
+            .offset(skip).limit(limit).all()
+
+    def get_page_by_book(
+        self,
+        book_id: int,
+        limit: int = 20,
+        newest_first: bool = True,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[BookCommentsModel]:
+        """
+        Страница комментариев книги в порядке (created_at, id), начиная после позиции after.
+        Использует индекс ix_book_comments_book_created вместо OFFSET.
+        """
+        position = tuple_(BookCommentsModel.created_at, BookCommentsModel.id)
+        stmt = select(BookCommentsModel).where(BookCommentsModel.book_id == book_id)
+        if newest_first:
+            if after is not None:
+                stmt = stmt.where(position < tuple_(*after))
+            stmt = stmt.order_by(BookCommentsModel.created_at.desc(), BookCommentsModel.id.desc())
+        else:
+            if after is not None:
+                stmt = stmt.where(position > tuple_(*after))
+            stmt = stmt.order_by(BookCommentsModel.created_at.asc(), BookCommentsModel.id.asc())
+        return list(self.db.scalars(stmt.limit(limit)))
 
     def get_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[BookCommentsModel]:
-        return self.db.query(BookCommentsModel).filter(BookCommentsModel.user_id == user_id).offset(skip).limit(limit).all()
\ No newline at end of file
+        return self.db.query(BookCommentsModel).filter(BookCommentsModel.user_id == user_id).offset(skip).limit(limit).all()
+
+    def bulk_create(self, rows: List[dict]) -> List[BookCommentsModel]:
+        """
+        Вставить несколько комментариев одним INSERT ... RETURNING (без commit).
+        Порядок результата совпадает с порядком rows.
+        """
+        if not rows:
+            return []
+        return list(self.db.scalars(
+            insert(BookCommentsModel).returning(BookCommentsModel, sort_by_parameter_order=True),
+            rows
+        ))
+
+    def get_book_comments_count(self, book_id: int) -> int:
+        return self.db.scalar(select(BooksModel.comments_count).where(BooksModel.id == book_id)) or 0
+
+    def delete_by_books(self, book_ids: Union[Iterable[int], Select], history_only: bool = False) -> None:
+        """
+        Удалить комментарии книг (список id или подзапрос), включая удаленные
+        и архивные, по одному DELETE на таблицу (без commit). Счетчики не меняются:
+        книги удаляются вместе с комментариями.
+        С history_only удаляются только удаленные комментарии (в архиве других нет):
+        они не мешают удалить книгу, но ссылаются на нее.
+        """
+        stmt = delete(BookCommentsModel).where(BookCommentsModel.book_id.in_(book_ids))
+        if history_only:
+            stmt = stmt.where(BookCommentsModel.deleted_at.is_not(None))
+        self.db.execute(stmt.execution_options(synchronize_session=False, include_deleted=True))
+        self.db.execute(delete(BookCommentArchiveModel).where(BookCommentArchiveModel.book_id.in_(book_ids)))
+
+    def delete_by_user(self, user_id: int, history_only: bool = False) -> List[int]:
+        """
+        Удалить комментарии пользователя из ленты и архива (без commit): один UPDATE
+        уменьшает счетчики затронутых книг на число их действующих комментариев,
+        по одному DELETE на таблицу удаляют строки.
+        С history_only удаляются только удаленные комментарии (действующих быть не должно,
+        это проверяет условие удаления пользователя).
+        Возвращает book_id удаленных действующих комментариев.
+        """
+        self.db.execute(
+            delete(BookCommentsModel)
+            .where(BookCommentsModel.user_id == user_id, BookCommentsModel.deleted_at.is_not(None))
+            .execution_options(synchronize_session=False, include_deleted=True)
+        )
+        # В архиве только удаленные комментарии: счетчики книг они не затрагивают
+        self.db.execute(delete(BookCommentArchiveModel).where(BookCommentArchiveModel.user_id == user_id))
+        if history_only:
+            return []
+
+        own_comments = select(func.count())\
+            .select_from(BookCommentsModel)\
+            .where(BookCommentsModel.book_id == BooksModel.id, BookCommentsModel.user_id == user_id)\
+            .scalar_subquery()
+        self.db.execute(
+            update(BooksModel)
+            .where(BooksModel.id.in_(select(BookCommentsModel.book_id).where(BookCommentsModel.user_id == user_id)))
+            .values(comments_count=BooksModel.comments_count - own_comments)
+            .execution_options(synchronize_session=False)
+        )
+        return list(self.db.scalars(
+            delete(BookCommentsModel)
+            .where(BookCommentsModel.user_id == user_id)
+            .returning(BookCommentsModel.book_id)
+            .execution_options(synchronize_session=False)
+        ))
+
+    def adjust_book_counter(self, book_id: int, delta: int) -> None:
+        """
+        Изменить счетчик комментариев книги (без commit).
+        """
+        self.db.execute(
+            update(BooksModel)
+            .where(BooksModel.id == book_id)
+            .values(comments_count=BooksModel.comments_count + delta)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,79 @@
+from typing import Iterable, List, Tuple, Union
+from sqlalchemy import Select, delete, func, insert, or_, select
+from sqlalchemy.orm import Session, aliased
+from app.models.book_similarities import BookSimilarityModel
+from app.models.shelf import ShelfModel
+from app.repositories.base import BaseRepository
+
+
+class BookSimilarityRepository(BaseRepository[BookSimilarityModel]):
+    def __init__(self, db: Session):
+        super().__init__(BookSimilarityModel, db)
+
+    def get_neighbors(self, book_id: int, limit: int) -> List[Tuple[int, float]]:
+        stmt = select(BookSimilarityModel.similar_book_id, BookSimilarityModel.score)\
+            .where(BookSimilarityModel.book_id == book_id)\
+            .order_by(BookSimilarityModel.score.desc(), BookSimilarityModel.similar_book_id)\
+            .limit(limit)
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def get_recommendations(self, book_ids: List[int], limit: int) -> List[Tuple[int, float]]:
+        """
+        Сумма сходств соседей по набору книг, без самих книг набора.
+        """
+        if not book_ids:
+            return []
+        total = func.sum(BookSimilarityModel.score).label("total")
+        stmt = select(BookSimilarityModel.similar_book_id, total)\
+            .where(
+                BookSimilarityModel.book_id.in_(book_ids),
+                BookSimilarityModel.similar_book_id.not_in(book_ids)
+            )\
+            .group_by(BookSimilarityModel.similar_book_id)\
+            .order_by(total.desc(), BookSimilarityModel.similar_book_id)\
+            .limit(limit)
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def get_cooccurrence(self, book_ids: List[int]) -> List[Tuple[int, int, int]]:
+        """
+        (book_id, other_book_id, число пользователей с обеими книгами) для книг из book_ids.
+        Считается одним самосоединением полки с группировкой в БД.
+        """
+        left = aliased(ShelfModel)
+        right = aliased(ShelfModel)
+        stmt = select(left.book_id, right.book_id, func.count())\
+            .join(right, (right.user_id == left.user_id) & (right.book_id != left.book_id))\
+            .where(left.book_id.in_(book_ids))\
+            .group_by(left.book_id, right.book_id)
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def replace_neighbors(self, book_ids: List[int], rows: List[dict]) -> None:
+        """
+        Заменить списки соседей книг book_ids (без commit).
+        """
+        self.db.execute(
+            delete(BookSimilarityModel)
+            .where(BookSimilarityModel.book_id.in_(book_ids))
+            .execution_options(synchronize_session=False)
+        )
+        if rows:
+            self.db.execute(insert(BookSimilarityModel), rows)
+
+    def delete_by_book(self, book_id: int) -> None:
+        """
+        Удалить книгу из всех списков соседей (без commit).
+        """
+        self.delete_by_books([book_id])
+
+    def delete_by_books(self, book_ids: Union[Iterable[int], Select]) -> None:
+        """
+        Удалить книги (список id или подзапрос) из всех списков соседей одним DELETE (без commit).
+        """
+        self.db.execute(
+            delete(BookSimilarityModel)
+            .where(or_(BookSimilarityModel.book_id.in_(book_ids), BookSimilarityModel.similar_book_id.in_(book_ids)))
+            .execution_options(synchronize_session=False)
+        )
+
+    def is_empty(self) -> bool:
+        return self.db.scalar(select(BookSimilarityModel.book_id).limit(1)) is None
@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Row, Select, String, and_, delete, func, insert, literal, null, or_, select, union_all, update
 from sqlalchemy.orm import Session, joinedload
 from app.models.books import BooksModel
 from app.models.authors import AuthorsModel
 from app.models.gengres import GengresModel
 from app.models.book_comments import BookCommentsModel
+from app.models.shelf import ShelfModel
 from app.repositories.base import BaseRepository
+from app.utils.text_search import title_key
 
 
 class BookRepository(BaseRepository[BooksModel]):
@@ -38,13 +41,108 @@ class BookRepository(BaseRepository[BooksModel]):
             .limit(limit)\
             .all()
     
-    def get_by_title_and_author(self, title: str, author_id: int) -> Optional[BooksModel]:
+    def get_catalog(self, limit: int = 100) -> List[BooksModel]:
         """
-        Получить книгу по названию и автору.
+        Книги для витрины каталога: с автором и жанром, без комментариев.
         """
         return self.db.query(BooksModel)\
-            .filter(BooksModel.title == title, BooksModel.author_id == author_id)\
-            .first()
+            .options(
+                joinedload(BooksModel.author),
+                joinedload(BooksModel.genre)
+            )\
+            .order_by(BooksModel.title, BooksModel.id)\
+            .limit(limit)\
+            .all()
+    
+    def delete_blockers(self, book_id: int) -> Dict[str, object]:
+        """
+        Условия, при которых книгу нельзя удалить, как EXISTS-подзапросы
+        (действующие комментарии и записи полок).
+        """
+        return {
+            "has_comments": select(BookCommentsModel.id).where(BookCommentsModel.book_id == book_id).exists(),
+            "in_shelf": select(ShelfModel.id).where(ShelfModel.book_id == book_id).exists(),
+        }
+
+    @staticmethod
+    def name_columns() -> Dict[str, object]:
+        """
+        Имя автора и название жанра книги как скалярные подзапросы (для RETURNING).
+        """
+        return {
+            "author_name": select(AuthorsModel.name).where(AuthorsModel.id == BooksModel.author_id).scalar_subquery(),
+            "genre_name": select(GengresModel.name).where(GengresModel.id == BooksModel.genre_id).scalar_subquery(),
+        }
+
+    @staticmethod
+    def names_by_id(author_id: int, genre_id: int) -> Dict[str, object]:
+        """
+        Имя автора и название жанра по известным id. SQLite не коррелирует подзапросы
+        в RETURNING у INSERT, поэтому для вставки id подставляются параметрами.
+        """
+        return {
+            "author_name": select(AuthorsModel.name).where(AuthorsModel.id == author_id).scalar_subquery(),
+            "genre_name": select(GengresModel.name).where(GengresModel.id == genre_id).scalar_subquery(),
+        }
+
+    def create_with_names(self, obj_in: dict) -> Row:
+        """
+        Вставить книгу одним INSERT ... RETURNING (без commit):
+        (книга, author_name, genre_name) без повторного чтения книги и связей.
+        """
+        # Core-вставка не вызывает @validates, ключи названия заполняются здесь
+        values = {**obj_in, **BooksModel.title_columns(obj_in["title"])}
+        columns = self.names_by_id(values["author_id"], values["genre_id"])
+        stmt = insert(BooksModel)\
+            .values(**values)\
+            .returning(BooksModel, *[column.label(name) for name, column in columns.items()])
+        return self.db.execute(stmt).one()
+
+    def update_with_names(self, book_id: int, obj_in: dict) -> Optional[Row]:
+        """
+        Обновить книгу одним условным UPDATE ... WHERE id = :id RETURNING (без commit):
+        (книга, author_name, genre_name) или None, если книги нет (обновлено 0 строк).
+        """
+        columns = [column.label(name) for name, column in self.name_columns().items()]
+        if not obj_in:
+            return self.db.execute(select(BooksModel, *columns).where(BooksModel.id == book_id)).first()
+        values = dict(obj_in)
+        if "title" in values:
+            values.update(BooksModel.title_columns(values["title"]))
+        stmt = update(BooksModel)\
+            .where(BooksModel.id == book_id)\
+            .values(**values)\
+            .returning(BooksModel, *columns)\
+            .execution_options(synchronize_session=False, populate_existing=True)
+        return self.db.execute(stmt).first()
+
+    @staticmethod
+    def ids_by_author(author_id: int) -> Select:
+        return select(BooksModel.id).where(BooksModel.author_id == author_id)
+
+    def delete_by_author(self, author_id: int) -> None:
+        """
+        Удалить все книги автора одним DELETE (без commit).
+        """
+        self.db.execute(
+            delete(BooksModel)
+            .where(BooksModel.author_id == author_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_by_title_and_author(
+        self, title: str, author_id: int, exclude_id: Optional[int] = None
+    ) -> Optional[BooksModel]:
+        """
+        Получить книгу по названию и автору: сравнивается ключ уникальности
+        названия (регистр, ё/е), поиск идет по уникальному индексу.
+        exclude_id - не считать саму обновляемую книгу.
+        """
+        query = self.db.query(BooksModel)\
+            .filter(BooksModel.title_key == title_key(title), BooksModel.author_id == author_id)
+        if exclude_id is not None:
+            query = query.filter(BooksModel.id != exclude_id)
+        return query.first()
     
     def get_by_author_with_relations(self, author_id: int, skip: int = 0, limit: int = 100) -> List[BooksModel]:
         """
@@ -76,6 +174,98 @@ class BookRepository(BaseRepository[BooksModel]):
             .limit(limit)\
             .all()
     
+    @staticmethod
+    def search_conditions(
+        book_ids: Optional[List[int]] = None,
+        genre_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        decade: Optional[int] = None
+    ) -> list:
+        """
+        Условия отбора книг для поиска и фасетов; book_ids - найденные по тексту книги.
+        """
+        conditions = []
+        if book_ids is not None:
+            conditions.append(BooksModel.id.in_(book_ids))
+        if genre_id is not None:
+            conditions.append(BooksModel.genre_id == genre_id)
+        if author_id is not None:
+            conditions.append(BooksModel.author_id == author_id)
+        if decade is not None:
+            conditions.append(and_(BooksModel.year >= decade, BooksModel.year < decade + 10))
+        return conditions
+
+    def get_search_documents(self) -> List[Tuple[int, str, int, Optional[str]]]:
+        """
+        (id, название, id автора, имя автора) всех книг для поисковых индексов.
+        """
+        return [
+            tuple(row) for row in self.db.query(BooksModel.id, BooksModel.title, BooksModel.author_id, AuthorsModel.name)
+            .outerjoin(AuthorsModel, AuthorsModel.id == BooksModel.author_id)
+        ]
+
+    def filter_ids(self, conditions: list) -> set:
+        return set(self.db.scalars(select(BooksModel.id).where(*conditions)))
+
+    def get_many_with_relations(self, book_ids: List[int]) -> List[BooksModel]:
+        """
+        Книги по списку id в порядке списка, с авторами, жанрами и комментариями.
+        """
+        if not book_ids:
+            return []
+        books = {
+            book.id: book for book in self.db.query(BooksModel)
+            .options(
+                joinedload(BooksModel.author),
+                joinedload(BooksModel.genre),
+                joinedload(BooksModel.book_comments)
+            )
+            .filter(BooksModel.id.in_(book_ids))
+        }
+        return [books[book_id] for book_id in book_ids if book_id in books]
+
+    def search_filtered(self, conditions: list, skip: int = 0, limit: int = 100) -> List[BooksModel]:
+        """
+        Поиск книг по готовым условиям с авторами, жанрами и комментариями.
+        """
+        return self.db.query(BooksModel)\
+            .options(
+                joinedload(BooksModel.author),
+                joinedload(BooksModel.genre),
+                joinedload(BooksModel.book_comments)
+            )\
+            .filter(*conditions)\
+            .order_by(BooksModel.id)\
+            .offset(skip)\
+            .limit(limit)\
+            .all()
+
+    def get_search_facets(self, conditions: list, limit: int) -> List[Tuple[str, Optional[int], Optional[str], int]]:
+        """
+        Фасеты найденного множества одним запросом: строки (фасет, ключ, название, количество)
+        для "total", "genre", "author" и "decade"; в каждом фасете не больше limit значений
+        с наибольшим количеством.
+        """
+        count = func.count().label("count")
+        decade = ((BooksModel.year // 10) * 10).label("key")
+
+        def capped(facet: str, key, name, *joins):
+            stmt = select(literal(facet).label("facet"), key.label("key"), name.label("name"), count)\
+                .select_from(BooksModel)
+            for model, on in joins:
+                stmt = stmt.join(model, on)
+            stmt = stmt.where(*conditions).group_by(key, name).order_by(count.desc(), key).limit(limit)
+            return select(stmt.subquery())
+
+        stmt = union_all(
+            select(literal("total"), null(), null().cast(String), func.count())
+            .select_from(BooksModel).where(*conditions),
+            capped("genre", GengresModel.id, GengresModel.name, (GengresModel, GengresModel.id == BooksModel.genre_id)),
+            capped("author", AuthorsModel.id, AuthorsModel.name, (AuthorsModel, AuthorsModel.id == BooksModel.author_id)),
+            capped("decade", decade, null().cast(String)),
+        )
+        return [tuple(row) for row in self.db.execute(stmt)]
+
     def search_with_relations(self, title: str, skip: int = 0, limit: int = 100) -> List[BooksModel]:
         """
         Поиск книг по названию с авторами, жанрами и комментариями.
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.models.analytics import AnalyticsStateModel
+from app.models.rankings import BookRankingEventModel, BookRankingTotalModel
+from app.repositories.base import BaseRepository
+
+# Источник в analytics_state: id последнего события, свернутого в book_ranking_totals
+COMPACTED_SOURCE = "book_ranking_events"
+
+
+class RankingRepository(BaseRepository[BookRankingEventModel]):
+    """
+    Журнал событий рейтингов книг и свернутые итоги. Методы записи не делают commit.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(BookRankingEventModel, db)
+
+    def add_events(self, rows: List[dict]) -> List[int]:
+        """
+        Вставить события одним INSERT ... RETURNING id (без commit). Порядок id совпадает с rows.
+        """
+        if not rows:
+            return []
+        return list(self.db.scalars(
+            insert(BookRankingEventModel).returning(BookRankingEventModel.id, sort_by_parameter_order=True),
+            rows
+        ))
+
+    def get_events(self, after_id: int, upto_id: Optional[int] = None) -> List[Tuple[int, int, int, datetime]]:
+        """
+        (id, book_id, delta, created_at) событий с id > after_id (и id <= upto_id) по возрастанию id.
+        """
+        stmt = select(
+            BookRankingEventModel.id,
+            BookRankingEventModel.book_id,
+            BookRankingEventModel.delta,
+            BookRankingEventModel.created_at
+        ).where(BookRankingEventModel.id > after_id).order_by(BookRankingEventModel.id)
+        if upto_id is not None:
+            stmt = stmt.where(BookRankingEventModel.id <= upto_id)
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def get_last_event_id(self) -> int:
+        return self.db.scalar(select(func.max(BookRankingEventModel.id))) or 0
+
+    def get_totals(self) -> List[Tuple[int, int]]:
+        return [
+            tuple(row) for row in self.db.execute(select(BookRankingTotalModel.book_id, BookRankingTotalModel.score))
+        ]
+
+    def get_compacted_id(self) -> int:
+        return self.db.scalar(
+            select(AnalyticsStateModel.last_id).where(AnalyticsStateModel.source == COMPACTED_SOURCE)
+        ) or 0
+
+    def compact(self, before: datetime) -> int:
+        """
+        Свернуть события старше before в book_ranking_totals и удалить их из журнала (без commit).
+        Возвращает id последнего свернутого события (0 - сворачивать нечего).
+        """
+        upto_id = self.db.scalar(
+            select(func.max(BookRankingEventModel.id)).where(BookRankingEventModel.created_at < before)
+        )
+        if not upto_id:
+            return 0
+        sums = select(BookRankingEventModel.book_id, func.sum(BookRankingEventModel.delta))\
+            .where(BookRankingEventModel.id <= upto_id)\
+            .group_by(BookRankingEventModel.book_id)
+        stmt = self._insert(BookRankingTotalModel).from_select(["book_id", "score"], sums)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["book_id"],
+            set_={"score": BookRankingTotalModel.score + stmt.excluded.score}
+        ))
+        self.db.execute(delete(BookRankingEventModel).where(BookRankingEventModel.id <= upto_id))
+        state = self._insert(AnalyticsStateModel).values(
+            source=COMPACTED_SOURCE, last_id=upto_id, refreshed_at=datetime.utcnow()
+        )
+        self.db.execute(state.on_conflict_do_update(
+            index_elements=["source"],
+            set_={"last_id": state.excluded.last_id, "refreshed_at": state.excluded.refreshed_at}
+        ))
+        return upto_id
@@ -1,6 +1,8 @@
 from typing import List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.roles import RoleModel
+from app.models.users import UserModel
 from app.repositories.base import BaseRepository
 
 class RoleRepository(BaseRepository[RoleModel]):
@@ -8,4 +10,7 @@ class RoleRepository(BaseRepository[RoleModel]):
         super().__init__(RoleModel, db)
 
     def get_by_name(self, name: str) -> Optional[RoleModel]:
-        return self.db.query(RoleModel).filter(RoleModel.name == name).first()
\ No newline at end of file
+        return self.db.query(RoleModel).filter(RoleModel.name == name).first()
+
+    def is_in_use(self, role_id: int) -> bool:
+        return self.db.scalar(select(select(UserModel.id).where(UserModel.role_id == role_id).exists()))
\ No newline at end of file
@@ -1,6 +1,13 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from sqlalchemy import Select, String, case, delete, func, literal, null, select, union_all, update
 from sqlalchemy.orm import Session
+from app.models.archive import ShelfArchiveModel
+from app.models.authors import AuthorsModel
+from app.models.books import BooksModel
+from app.models.gengres import GengresModel
 from app.models.shelf import ShelfModel
+from app.models.users import UserModel
 from app.repositories.base import BaseRepository
 
 
@@ -24,4 +31,206 @@ class ShelfRepository(BaseRepository[ShelfModel]):
         return self.db.query(ShelfModel).filter(
             ShelfModel.user_id == user_id,
             ShelfModel.status_read == True
-        ).offset(skip).limit(limit).all()
\ No newline at end of file
+        ).offset(skip).limit(limit).all()
+
+    def count_by_user(self, user_id: int) -> int:
+        return self.db.scalar(
+            select(func.count()).select_from(ShelfModel).where(ShelfModel.user_id == user_id)
+        )
+
+    def get_by_user_and_books(self, user_id: int, book_ids: Iterable[int]) -> Dict[int, ShelfModel]:
+        """
+        Получить записи полки пользователя для набора книг одним запросом.
+        """
+        entries = self.db.scalars(
+            select(ShelfModel).where(
+                ShelfModel.user_id == user_id,
+                ShelfModel.book_id.in_(list(book_ids))
+            )
+        ).all()
+        return {entry.book_id: entry for entry in entries}
+
+    def get_existing_book_ids(self, book_ids: Iterable[int]) -> set:
+        return set(self.db.scalars(select(BooksModel.id).where(BooksModel.id.in_(list(book_ids)))))
+
+    def add_if_absent(self, user_id: int, book_id: int, status_read: bool, max_books: int) -> Optional[ShelfModel]:
+        """
+        Добавить книгу на полку одним INSERT ... ON CONFLICT DO NOTHING (без commit).
+
+        Лимит полки проверяется в том же выражении. Возвращает None, если запись
+        уже существует или полка заполнена.
+        """
+        # Условие мягкого удаления к INSERT не добавляется автоматически
+        shelf_size = select(func.count()).select_from(ShelfModel)\
+            .where(ShelfModel.user_id == user_id, ShelfModel.deleted_at.is_(None))\
+            .scalar_subquery()
+        stmt = self._insert()\
+            .from_select(
+                ["user_id", "book_id", "status_read", "created_at"],
+                select(literal(user_id), literal(book_id), literal(status_read), literal(datetime.utcnow()))
+                .where(shelf_size < max_books)
+            )\
+            .on_conflict_do_nothing(index_elements=["user_id", "book_id"], index_where=ShelfModel.deleted_at.is_(None))\
+            .returning(ShelfModel)
+        return self.db.scalars(stmt).first()
+
+    def bulk_add(self, user_id: int, statuses: Dict[int, bool]) -> None:
+        """
+        Добавить несколько книг на полку одним INSERT (без commit).
+        Пары, уже существующие на полке, пропускаются.
+        """
+        if not statuses:
+            return
+        self.db.execute(
+            self._insert().on_conflict_do_nothing(
+                index_elements=["user_id", "book_id"], index_where=ShelfModel.deleted_at.is_(None)
+            ),
+            [
+                {"user_id": user_id, "book_id": book_id, "status_read": status_read}
+                for book_id, status_read in statuses.items()
+            ]
+        )
+
+    def bulk_set_status(self, user_id: int, book_ids: Iterable[int], status_read: bool) -> None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        self.db.execute(
+            update(ShelfModel)
+            .where(ShelfModel.user_id == user_id, ShelfModel.book_id.in_(book_ids))
+            .values(status_read=status_read)
+            .execution_options(synchronize_session=False)
+        )
+
+    def bulk_remove(self, user_id: int, book_ids: Iterable[int]) -> None:
+        """
+        Убрать книги с полки (мягкое удаление, без commit): записи остаются историей полки.
+        """
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        self.db.execute(
+            update(ShelfModel)
+            .where(ShelfModel.user_id == user_id, ShelfModel.book_id.in_(book_ids))
+            .values(deleted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_history(
+        self, user_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[ShelfModel]:
+        """
+        Убранные с полки записи пользователя, от последних к ранним. Архив
+        читается только с include_archived (строки ShelfArchiveModel с теми же полями).
+        """
+        def order(model):
+            return model.deleted_at.desc(), model.id.desc()
+
+        stmt = select(ShelfModel)\
+            .where(ShelfModel.user_id == user_id, ShelfModel.deleted_at.is_not(None))\
+            .order_by(*order(ShelfModel))\
+            .limit(skip + limit)\
+            .execution_options(include_deleted=True)
+        rows = list(self.db.scalars(stmt))
+        if include_archived:
+            rows += self.db.scalars(
+                select(ShelfArchiveModel)
+                .where(ShelfArchiveModel.user_id == user_id, ShelfArchiveModel.deleted_at.is_not(None))
+                .order_by(*order(ShelfArchiveModel))
+                .limit(skip + limit)
+            )
+            rows.sort(key=lambda row: (row.deleted_at, row.id), reverse=True)
+        return rows[skip:skip + limit]
+
+    def delete_by_books(self, book_ids: Union[Iterable[int], Select], history_only: bool = False) -> List[int]:
+        """
+        Удалить записи книг (список id или подзапрос), включая историю и архив,
+        по одному DELETE на таблицу (без commit). С history_only - только историю.
+        Возвращает id пользователей, у которых книги были на полке.
+        """
+        self.db.execute(
+            delete(ShelfModel)
+            .where(ShelfModel.book_id.in_(book_ids), ShelfModel.deleted_at.is_not(None))
+            .execution_options(synchronize_session=False, include_deleted=True)
+        )
+        self.db.execute(delete(ShelfArchiveModel).where(ShelfArchiveModel.book_id.in_(book_ids)))
+        if history_only:
+            return []
+        return list(set(self.db.scalars(
+            delete(ShelfModel)
+            .where(ShelfModel.book_id.in_(book_ids))
+            .returning(ShelfModel.user_id)
+            .execution_options(synchronize_session=False)
+        )))
+
+    def delete_by_user(self, user_id: int, history_only: bool = False) -> List[Tuple[int, bool]]:
+        """
+        Удалить полку пользователя вместе с историей и архивом, по одному DELETE
+        на таблицу (без commit). С history_only - только историю.
+        Возвращает (book_id, status_read) удаленных действующих записей.
+        """
+        self.db.execute(
+            delete(ShelfModel)
+            .where(ShelfModel.user_id == user_id, ShelfModel.deleted_at.is_not(None))
+            .execution_options(synchronize_session=False, include_deleted=True)
+        )
+        self.db.execute(delete(ShelfArchiveModel).where(ShelfArchiveModel.user_id == user_id))
+        if history_only:
+            return []
+        return [tuple(row) for row in self.db.execute(
+            delete(ShelfModel)
+            .where(ShelfModel.user_id == user_id)
+            .returning(ShelfModel.book_id, ShelfModel.status_read)
+            .execution_options(synchronize_session=False)
+        )]
+
+    def count_by_book(self, book_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, int, int]]:
+        """
+        Для каждой книги на полках: (book_id, сколько раз добавлена, сколько раз прочитана).
+        С book_ids - только для этих книг (по индексу book_id, без прохода по всей полке).
+        """
+        stmt = select(
+            ShelfModel.book_id,
+            func.count(),
+            func.coalesce(func.sum(case((ShelfModel.status_read.is_(True), 1), else_=0)), 0)
+        ).group_by(ShelfModel.book_id)
+        if book_ids is not None:
+            stmt = stmt.where(ShelfModel.book_id.in_(list(book_ids)))
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def get_user_stats(self, user_id: int) -> List[Tuple[str, Optional[int], Optional[str], int, int]]:
+        """
+        Статистика полки пользователя одним запросом (UNION ALL сгруппированных выборок):
+        строки (измерение, ключ, название, всего, прочитано) для измерений
+        "total", "genre", "author" и "decade". Для несуществующего пользователя строк нет.
+        """
+        total = func.count()
+        read = func.coalesce(func.sum(case((ShelfModel.status_read.is_(True), 1), else_=0)), 0)
+        decade = (BooksModel.year // 10) * 10
+
+        def grouped(dimension: str, key, label, *joins):
+            stmt = select(literal(dimension), key, label, total, read)\
+                .select_from(ShelfModel)\
+                .join(BooksModel, BooksModel.id == ShelfModel.book_id)
+            for model, on in joins:
+                stmt = stmt.join(model, on)
+            return stmt.where(ShelfModel.user_id == user_id)
+
+        stmt = union_all(
+            # Полка присоединяется к пользователю: пустая полка дает нули, нет пользователя - нет строки
+            select(literal("total"), null(), null().cast(String), func.count(ShelfModel.id), read)
+            .select_from(UserModel)
+            .outerjoin(ShelfModel, ShelfModel.user_id == UserModel.id)
+            .where(UserModel.id == user_id)
+            .group_by(UserModel.id),
+            grouped("genre", GengresModel.id, GengresModel.name, (GengresModel, GengresModel.id == BooksModel.genre_id))
+            .group_by(GengresModel.id, GengresModel.name),
+            grouped("author", AuthorsModel.id, AuthorsModel.name, (AuthorsModel, AuthorsModel.id == BooksModel.author_id))
+            .group_by(AuthorsModel.id, AuthorsModel.name),
+            grouped("decade", decade, null().cast(String)).group_by(decade),
+        )
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def get_book_ids_by_users(self, user_ids: Iterable[int]) -> List[int]:
+        stmt = select(ShelfModel.book_id.distinct()).where(ShelfModel.user_id.in_(list(user_ids)))
+        return list(self.db.scalars(stmt))
@@ -1,5 +1,8 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.models.book_comments import BookCommentsModel
+from app.models.shelf import ShelfModel
 from app.models.users import UserModel
 from app.repositories.base import BaseRepository
 
@@ -12,4 +15,10 @@ class UserRepository(BaseRepository[UserModel]):
         return self.db.query(UserModel).filter(UserModel.email == email).first()
 
     def get_by_role(self, role_id: int, skip: int = 0, limit: int = 100) -> List[UserModel]:
-        return self.db.query(UserModel).filter(UserModel.role_id == role_id).offset(skip).limit(limit).all()
\ No newline at end of file
+        return self.db.query(UserModel).filter(UserModel.role_id == role_id).offset(skip).limit(limit).all()
+
+    def delete_blockers(self, user_id: int) -> Dict[str, object]:
+        return {
+            "has_books": select(ShelfModel.id).where(ShelfModel.user_id == user_id).exists(),
+            "has_comments": select(BookCommentsModel.id).where(BookCommentsModel.user_id == user_id).exists(),
+        }
\ No newline at end of file
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class AnalyticsOverview(BaseModel):
+    refreshed_at: Optional[datetime] = None
+    high_water_marks: Dict[str, int] = {}
+
+
+class GenreStats(BaseModel):
+    genre_id: int
+    genre_name: str
+    books_count: int
+    shelved_count: int
+    read_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class AuthorStats(BaseModel):
+    author_id: int
+    author_name: str
+    books_count: int
+    shelved_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class DailyActivity(BaseModel):
+    day: date
+    comments_count: int
+    shelf_adds_count: int
+    active_users: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+from typing import Any, Dict, List, Literal
+from pydantic import BaseModel, Field
+
+
+class BatchSubRequest(BaseModel):
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., description="Путь с query-строкой, например /books/?limit=10")
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=20)
+
+
+class BatchSubResponse(BaseModel):
+    path: str
+    status: int
+    body: Any = None
+    headers: Dict[str, str] = Field(default_factory=dict)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -22,4 +22,16 @@ class BookComment(BookCommentBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BookCommentQueued(BaseModel):
+    provisional_id: str
+    status: str
+    comment_id: Optional[int] = None
+
+
+class BookCommentPage(BaseModel):
+    items: List[BookComment]
+    total: int
+    next_cursor: Optional[str] = None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional, List
 from datetime import datetime
 
 
@@ -32,6 +33,14 @@ class BookUpdate(BaseModel):
     genre_id: Optional[int] = Field(None, ge=1, description="ID жанра")
     year: Optional[int] = Field(None, ge=1000, le=2100, description="Год издания")
 
+    @field_validator("title", "author_id", "genre_id", "year")
+    @classmethod
+    def _not_null(cls, value):
+        # Поле можно не передавать, но явный null для обязательной колонки - ошибка (422)
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 
 class Book(BookBase):
     id: int
@@ -43,6 +52,72 @@ class Book(BookBase):
         from_attributes = True
 
 
+class FacetValue(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class BookSearchFacets(BaseModel):
+    genre: List[FacetValue] = Field(default_factory=list)
+    author: List[FacetValue] = Field(default_factory=list)
+    decade: List[FacetValue] = Field(default_factory=list, description="id - первый год десятилетия")
+
+
+class BookSearchResult(BaseModel):
+    items: List[Book]
+    total: int = Field(..., ge=0, description="Сколько книг найдено всего")
+    facets: BookSearchFacets
+
+
+class AutocompleteItem(BaseModel):
+    kind: Literal["book", "author"]
+    id: int
+    label: str
+
+
+class TrendingWindow(str, Enum):
+    DAY = "1d"
+    WEEK = "7d"
+    MONTH = "30d"
+
+
+class RankedBook(BaseModel):
+    id: int
+    title: str
+    author_id: int
+    genre_id: int
+    year: int
+    author_name: Optional[str] = None
+    genre_name: Optional[str] = None
+    comments_count: int = 0
+    score: int = Field(..., ge=0, description="Добавления на полку, прочтения и комментарии")
+
+
+class SimilarBook(BaseModel):
+    id: int
+    title: str
+    author_id: int
+    genre_id: int
+    year: int
+    author_name: Optional[str] = None
+    genre_name: Optional[str] = None
+    score: float = Field(..., ge=0, description="Сходство по полкам читателей")
+
+
+class NearDuplicate(BaseModel):
+    id: int
+    title: str
+    author_id: int
+    author_name: Optional[str] = None
+
+
+class BookCreated(Book):
+    near_duplicates: List[NearDuplicate] = Field(
+        default_factory=list, description="Книги с почти таким же названием (при check_similar=true)"
+    )
+
+
 class BookDetail(Book):
     shelf_count: int = Field(0, ge=0, description="Количество пользователей, добавивших книгу на полку")
     average_rating: Optional[float] = Field(None, ge=0, le=5, description="Средний рейтинг книги")
\ No newline at end of file
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class ShelfBase(BaseModel):
@@ -20,4 +22,41 @@ class Shelf(ShelfBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ShelfHistoryEntry(Shelf):
+    """
+    Запись, убранная с полки (из горячей таблицы или архива).
+    """
+    created_at: Optional[datetime] = None
+    deleted_at: datetime
+
+
+class ShelfBatchAction(str, Enum):
+    ADD = "add"
+    MARK_READ = "mark_read"
+    REMOVE = "remove"
+
+
+class ShelfBatchOperation(BaseModel):
+    action: ShelfBatchAction
+    book_id: int = Field(..., ge=1, description="ID книги")
+    status_read: bool = Field(False, description="Статус прочтения для операции add")
+
+
+class ShelfBatchRequest(BaseModel):
+    operations: List[ShelfBatchOperation] = Field(..., min_length=1, max_length=1000)
+
+
+class ShelfBatchItemResult(BaseModel):
+    action: ShelfBatchAction
+    book_id: int
+    success: bool
+    detail: Optional[str] = None
+    entry: Optional[Shelf] = None
+
+
+class ShelfBatchResult(BaseModel):
+    user_id: int
+    results: List[ShelfBatchItemResult]
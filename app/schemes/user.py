@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 
 class UserBase(BaseModel):
@@ -23,4 +23,26 @@ class User(UserBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserStatsGroup(BaseModel):
+    id: int
+    name: str
+    total: int
+    read: int
+
+
+class UserStatsDecade(BaseModel):
+    decade: int
+    total: int
+    read: int
+
+
+class UserStats(BaseModel):
+    user_id: int
+    total: int = 0
+    read: int = 0
+    unread: int = 0
+    by_genre: List[UserStatsGroup] = []
+    by_author: List[UserStatsGroup] = []
+    by_decade: List[UserStatsDecade] = []
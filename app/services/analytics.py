@@ -0,0 +1,80 @@
+# app/services/analytics.py
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+from app.models.analytics import AuthorStatsModel, DailyActivityModel, GenreStatsModel
+from app.repositories.analytics import AnalyticsRepository
+
+# Период пересчета витрин аналитики; 0 отключает фоновую задачу в этом процессе
+ANALYTICS_REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", "600"))
+
+# Источники, для которых хранится high-water mark по id
+_INCREMENTAL_SOURCES = ("book_comments", "shelf")
+
+
+class AnalyticsService:
+    """
+    Витрины аналитики для админки и дашбордов.
+
+    Запросы читают только таблицы analytics_*. refresh() пересчитывает их:
+    витрины по жанрам и авторам - целиком (строк столько, сколько жанров и авторов),
+    дневную активность - только за дни, в которых появились строки после
+    high-water mark (последний учтенный id комментариев и записей полки).
+    Все агрегаты считаются до первой записи: блокировка записи SQLite
+    держится только на время замены готовых строк.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = AnalyticsRepository(db)
+
+    def get_overview(self) -> dict:
+        states = self.repository.get_states()
+        return {
+            "refreshed_at": states["catalog"].refreshed_at if "catalog" in states else None,
+            "high_water_marks": {source: states[source].last_id for source in _INCREMENTAL_SOURCES if source in states},
+        }
+
+    def get_genre_stats(self) -> List[GenreStatsModel]:
+        return self.repository.get_genre_stats()
+
+    def get_author_stats(self, limit: int = 100) -> List[AuthorStatsModel]:
+        return self.repository.get_author_stats(limit)
+
+    def get_daily_activity(self, days: int = 30) -> List[DailyActivityModel]:
+        # Дни витрины - даты UTC (created_at хранится в UTC), а не локальные даты сервера
+        today = datetime.now(timezone.utc).date()
+        return self.repository.get_daily_activity(today - timedelta(days=days - 1))
+
+    def refresh(self) -> None:
+        now = datetime.utcnow()
+        states = self.repository.get_states()
+        marks = {source: states[source].last_id if source in states else 0 for source in _INCREMENTAL_SOURCES}
+        try:
+            # Верхняя граница фиксируется до чтения: строки, вставленные во время пересчета, войдут в следующий
+            upto = self.repository.get_max_ids()
+            genres, authors = self.repository.get_catalog_stats()
+            days = self.repository.get_touched_days(marks, upto)
+            daily = self.repository.get_daily_activity_rows(min(days), max(days)) if days else []
+
+            self.repository.replace_catalog_stats(genres, authors)
+            if days:
+                self.repository.replace_daily_activity(min(days), max(days), daily)
+            for source in _INCREMENTAL_SOURCES:
+                self.repository.save_state(source, max(marks[source], upto[source]), now)
+            self.repository.save_state("catalog", 0, now)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+
+def refresh_analytics(session_factory: Callable[[], Session]) -> None:
+    db = session_factory()
+    try:
+        AnalyticsService(db).refresh()
+    finally:
+        db.close()
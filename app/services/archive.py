@@ -0,0 +1,67 @@
+# app/services/archive.py
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.repositories.archive import ArchiveRepository
+
+# Период переноса в архив; 0 отключает фоновую задачу в этом процессе
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+# Через сколько дней после удаления комментарии и записи полок уходят в архив
+ARCHIVE_DELETED_AFTER_DAYS = int(os.getenv("ARCHIVE_DELETED_AFTER_DAYS", "7"))
+# Строк на транзакцию: короткие транзакции не блокируют запись в SQLite надолго
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """
+    Архивный уровень для комментариев и истории полок.
+
+    Горячие таблицы содержат действующие строки и недавно удаленные (мягкое удаление);
+    задача переносит давно удаленные строки в book_comments_archive и shelf_archive
+    пачками по ARCHIVE_BATCH_SIZE, каждая пачка - своя транзакция. В архиве только
+    история: действующие строки всегда в горячих таблицах. История полок читается
+    по запросу (include_archived в API).
+    """
+
+    def __init__(self, db: Session, batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.repository = ArchiveRepository(db)
+
+    def run(self) -> Dict[str, int]:
+        now = datetime.utcnow()
+        deleted_before = now - timedelta(days=ARCHIVE_DELETED_AFTER_DAYS)
+        return {
+            "book_comments": self._drain(lambda: self.repository.archive_comments(deleted_before, self.batch_size)),
+            "shelf": self._drain(lambda: self.repository.archive_shelf(deleted_before, self.batch_size)),
+        }
+
+    def _drain(self, move_batch: Callable[[], int]) -> int:
+        total = 0
+        while True:
+            try:
+                moved = move_batch()
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            total += moved
+            if moved < self.batch_size:
+                return total
+
+
+def archive_old_rows(session_factory: Callable[[], Session]) -> Dict[str, int]:
+    db = session_factory()
+    try:
+        moved = ArchiveService(db).run()
+        if any(moved.values()):
+            logger.info("Перенесено в архив: %s", moved)
+        return moved
+    finally:
+        db.close()
@@ -1,8 +1,17 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.exceptions.authors import AuthorHasBooksException, AuthorNotFoundException
 from app.repositories.authors import AuthorRepository
+from app.repositories.book_comments import BookCommentRepository
+from app.repositories.book_similarities import BookSimilarityRepository
+from app.repositories.books import BookRepository
+from app.repositories.shelf import ShelfRepository
 from app.schemes.authors import AuthorCreate, AuthorUpdate
 from app.models.authors import AuthorsModel
+from app.services.loaders import get_loaders
+from app.services.recommendations import similarity_tracker
+from app.services.user_stats import user_stats_cache
+from app.utils.cache import catalog_version, comments_version
 
 
 class AuthorService:
@@ -10,7 +19,7 @@ class AuthorService:
         self.repository = AuthorRepository(db)
 
     def get_author(self, author_id: int) -> Optional[AuthorsModel]:
-        return self.repository.get(author_id)
+        return get_loaders(self.repository.db).authors.get(author_id)
 
     def get_author_by_name(self, name: str) -> Optional[AuthorsModel]:
         return self.repository.get_by_name(name)
@@ -19,13 +28,47 @@ class AuthorService:
         return self.repository.get_all(skip, limit)
 
     def create_author(self, author: AuthorCreate) -> AuthorsModel:
-        return self.repository.create(author.dict())
+        db_author = self.repository.create(author.dict())
+        self.repository.db.commit()
+        catalog_version.bump()
+        return db_author
 
     def update_author(self, author_id: int, author: AuthorUpdate) -> Optional[AuthorsModel]:
-        db_author = self.repository.get(author_id)
+        db_author = self.get_author(author_id)
         if db_author:
-            return self.repository.update(db_author, author.dict())
+            db_author = self.repository.update(db_author, author.dict())
+            self.repository.db.commit()
+            catalog_version.bump()
+            return db_author
         return None
 
-    def delete_author(self, author_id: int) -> Optional[AuthorsModel]:
-        return self.repository.delete(author_id)
\ No newline at end of file
+    def delete_author(self, author_id: int, cascade: bool = False) -> AuthorsModel:
+        """
+        Удалить автора одним условным DELETE ... WHERE NOT EXISTS (книги автора).
+        С cascade сначала удаляются его книги с комментариями, записями на полках
+        и списками соседей - по одному DELETE на таблицу с подзапросом id книг.
+        """
+        db = self.repository.db
+        users = []
+        if cascade:
+            book_ids = BookRepository.ids_by_author(author_id)
+            BookCommentRepository(db).delete_by_books(book_ids)
+            users = ShelfRepository(db).delete_by_books(book_ids)
+            BookSimilarityRepository(db).delete_by_books(book_ids)
+            BookRepository(db).delete_by_author(author_id)
+        blockers = self.repository.delete_blockers(author_id)
+        deleted = self.repository.delete_unless(author_id, blockers.values())
+        if deleted is None:
+            found = self.repository.get_blockers(author_id, blockers)
+            db.rollback()
+            if found is None:
+                raise AuthorNotFoundException(author_id=author_id)
+            raise AuthorHasBooksException(author_name=found[0].name)
+        db.commit()
+        catalog_version.bump()
+        if cascade:
+            comments_version.bump()
+        for user_id in users:
+            similarity_tracker.mark(user_id, [])
+            user_stats_cache.invalidate(user_id)
+        return deleted[0]
\ No newline at end of file
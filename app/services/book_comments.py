@@ -1,8 +1,17 @@
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.repositories.book_comments import BookCommentRepository
-from app.schemes.book_comments import BookCommentCreate, BookCommentUpdate
+from app.schemes.book_comments import BookComment, BookCommentCreate, BookCommentUpdate
 from app.models.book_comments import BookCommentsModel
+from app.services.rankings import book_rankings
+from app.utils.cache import comments_version
+from app.utils.pubsub import events
+
+
+def comments_topic(book_id: int) -> str:
+    return f"book_comments:{book_id}"
 
 
 class BookCommentService:
@@ -18,17 +27,79 @@ class BookCommentService:
     def get_comments_by_book(self, book_id: int, skip: int = 0, limit: int = 100) -> List[BookCommentsModel]:
         return self.repository.get_by_book(book_id, skip, limit)
 
+    def get_comments_page(
+        self,
+        book_id: int,
+        limit: int = 20,
+        newest_first: bool = True,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[BookCommentsModel], int]:
+        """
+        Страница комментариев книги и общее количество по счетчику книги.
+        """
+        comments = self.repository.get_page_by_book(book_id, limit, newest_first, after)
+        return comments, self.repository.get_book_comments_count(book_id)
+
     def get_comments_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[BookCommentsModel]:
         return self.repository.get_by_user(user_id, skip, limit)
 
     def create_comment(self, comment: BookCommentCreate) -> BookCommentsModel:
-        return self.repository.create(comment.dict())
+        # Счетчик обновляется в той же транзакции, что и вставка комментария
+        self.repository.adjust_book_counter(comment.book_id, 1)
+        db_comment = self.repository.create(comment.dict())
+        book_rankings.record(self.repository.db, db_comment.book_id)
+        self.repository.db.commit()
+        self._publish("created", db_comment)
+        return db_comment
+
+    def create_comments(self, rows: List[dict]) -> List[BookCommentsModel]:
+        """
+        Сохранить пакет комментариев в одной транзакции (используется очередью отложенной записи).
+        """
+        db = self.repository.db
+        try:
+            comments = self.repository.bulk_create(rows)
+            for book_id, count in Counter(row["book_id"] for row in rows).items():
+                self.repository.adjust_book_counter(book_id, count)
+            book_rankings.record_many(db, [(comment.book_id, 1) for comment in comments])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for comment in comments:
+            self._publish("created", comment)
+        return comments
 
     def update_comment(self, comment_id: int, comment: BookCommentUpdate) -> Optional[BookCommentsModel]:
         db_comment = self.repository.get(comment_id)
         if db_comment:
-            return self.repository.update(db_comment, comment.dict(exclude_unset=True))
+            db_comment = self.repository.update(db_comment, comment.dict(exclude_unset=True))
+            self.repository.db.commit()
+            self._publish("updated", db_comment)
+            return db_comment
         return None
 
     def delete_comment(self, comment_id: int) -> Optional[BookCommentsModel]:
-        return self.repository.delete(comment_id)
\ No newline at end of file
+        # Мягкое удаление: строка уходит в архив фоновой задачей
+        db_comment = self.repository.soft_delete(comment_id)
+        if db_comment:
+            self.repository.adjust_book_counter(db_comment.book_id, -1)
+            book_rankings.record(self.repository.db, db_comment.book_id, -1)
+            self.repository.db.commit()
+            self._publish("deleted", db_comment)
+            return db_comment
+        return None
+
+    def _publish(self, event_type: str, comment: BookCommentsModel) -> None:
+        """
+        Отправить событие подписчикам ленты комментариев книги (после commit).
+        """
+        # Счетчики комментариев входят в кэшированную витрину каталога
+        comments_version.bump()
+        topic = comments_topic(comment.book_id)
+        if events.subscribers_count(topic) == 0:
+            return
+        events.publish(topic, {
+            "type": event_type,
+            "comment": BookComment.model_validate(comment).model_dump(mode="json")
+        })
@@ -1,9 +1,35 @@
 from typing import List, Optional
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.exceptions.books import (
+    BookAlreadyExistsException,
+    BookHasCommentsException,
+    BookInShelfException,
+    BookNotFoundException,
+)
+from app.repositories.book_comments import BookCommentRepository
+from app.repositories.book_similarities import BookSimilarityRepository
 from app.repositories.books import BookRepository
+from app.repositories.shelf import ShelfRepository
+from app.services.loaders import get_loaders
+from app.services.recommendations import similarity_tracker
+from app.services.search import book_search_index
 from app.schemes.books import BookCreate, BookUpdate
 from app.models.books import BooksModel
 from sqlalchemy.orm import joinedload
+from app.services.user_stats import user_stats_cache
+from app.utils.cache import catalog_version, comments_version
+from app.utils.text_search import edit_distance, normalize
+
+# Уникальный индекс ключа названия у автора (app/models/books.py): SQLite называет
+# колонки индекса, PostgreSQL - сам индекс
+_TITLE_CONFLICT_MARKERS = ("uq_books_title_key_author", "books.title_key")
+
+
+def _is_title_conflict(error: IntegrityError) -> bool:
+    message = str(error.orig)
+    return any(marker in message for marker in _TITLE_CONFLICT_MARKERS)
 
 
 class BookService:
@@ -53,25 +79,137 @@ class BookService:
             .all()
         return books
 
-    def search_books(self, title: str, skip: int = 0, limit: int = 100) -> List[BooksModel]:
-        books = self.db.query(BooksModel)\
-            .options(joinedload(BooksModel.author),
-                    joinedload(BooksModel.genre),
-                    joinedload(BooksModel.book_comments))\
-            .filter(BooksModel.title.ilike(f"%{title}%"))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-        return books
+    def search_books(
+        self,
+        title: str,
+        skip: int = 0,
+        limit: int = 100,
+        genre_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        decade: Optional[int] = None
+    ) -> List[BooksModel]:
+        """
+        Поиск по названию и автору с опечатками и в любой раскладке (кириллица/латиница),
+        от лучшего совпадения к худшему. Без title - все книги по id.
+        """
+        if not title.strip():
+            conditions = self.repository.search_conditions(None, genre_id, author_id, decade)
+            return self.repository.search_filtered(conditions, skip, limit)
+        ranked = [book_id for book_id, _ in book_search_index.search(self.db, title)]
+        if genre_id is not None or author_id is not None or decade is not None:
+            allowed = self.repository.filter_ids(
+                self.repository.search_conditions(ranked, genre_id, author_id, decade)
+            )
+            ranked = [book_id for book_id in ranked if book_id in allowed]
+        return self.repository.get_many_with_relations(ranked[skip:skip + limit])
+
+    def get_search_facets(
+        self,
+        title: str,
+        genre_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        decade: Optional[int] = None,
+        limit: int = 20
+    ) -> dict:
+        """
+        Количество найденных книг и фасеты по жанру, автору и десятилетию.
+        """
+        book_ids = None
+        if title.strip():
+            book_ids = [book_id for book_id, _ in book_search_index.search(self.db, title)]
+        conditions = self.repository.search_conditions(book_ids, genre_id, author_id, decade)
+        result = {"total": 0, "facets": {"genre": [], "author": [], "decade": []}}
+        for facet, key, name, count in self.repository.get_search_facets(conditions, limit):
+            if facet == "total":
+                result["total"] = count
+            else:
+                result["facets"][facet].append({"id": key, "name": name if name is not None else f"{key}-е", "count": count})
+        return result
+
+    def get_book_by_title_and_author(self, title: str, author_id: int) -> Optional[BooksModel]:
+        return self.repository.get_by_title_and_author(title, author_id)
+
+    def find_near_duplicates(self, title: str, exclude_id: Optional[int] = None, limit: int = 5) -> List[BooksModel]:
+        """
+        Книги с почти таким же названием (расстояние Левенштейна по нормализованному
+        ключу до 1, для ключей от 8 символов - до 2). Кандидаты берутся из поискового индекса.
+        """
+        key = normalize(title)
+        max_distance = 1 if len(key) < 8 else 2
+        candidates = [book_id for book_id, _ in book_search_index.search(self.db, title, limit=50) if book_id != exclude_id]
+        books = get_loaders(self.db).books_with_names(candidates)
+        return [
+            books[book_id] for book_id in candidates
+            if book_id in books and edit_distance(key, books[book_id].normalized_title, max_distance) <= max_distance
+        ][:limit]
+
+    def create_book(self, book: BookCreate) -> Row:
+        """
+        Создать книгу одним INSERT ... RETURNING. Дубликат отклоняет уникальный индекс.
+        Возвращает (книга, author_name, genre_name).
+        """
+        try:
+            created = self.repository.create_with_names(book.dict())
+            self.db.commit()
+        except IntegrityError as error:
+            self.db.rollback()
+            if _is_title_conflict(error):
+                self._raise_if_duplicate(book.title, book.author_id)
+            raise
+        catalog_version.bump()
+        return created
 
-    def create_book(self, book: BookCreate) -> BooksModel:
-        return self.repository.create(book.dict())
+    def update_book(self, book_id: int, book: BookUpdate) -> Optional[Row]:
+        """
+        Обновить книгу одним условным UPDATE ... RETURNING, без предварительного чтения.
+        Возвращает (книга, author_name, genre_name) или None, если книги нет.
+        """
+        try:
+            updated = self.repository.update_with_names(book_id, book.dict(exclude_unset=True))
+            self.db.commit()
+        except IntegrityError as error:
+            self.db.rollback()
+            # Ключ дубликата дополняется текущими значениями книги только при конфликте
+            current = self.repository.get(book_id) if _is_title_conflict(error) else None
+            if current is not None:
+                self._raise_if_duplicate(book.title or current.title, book.author_id or current.author_id, book_id)
+            raise
+        if updated is not None:
+            catalog_version.bump()
+        return updated
 
-    def update_book(self, book_id: int, book: BookUpdate) -> Optional[BooksModel]:
-        db_book = self.repository.get(book_id)
-        if db_book:
-            return self.repository.update(db_book, book.dict(exclude_unset=True))
-        return None
+    def _raise_if_duplicate(self, title: str, author_id: int, exclude_id: Optional[int] = None) -> None:
+        # Уникальный индекс отклонил запись: 409, если ключ занят другой книгой
+        if self.repository.get_by_title_and_author(title, author_id, exclude_id) is not None:
+            raise BookAlreadyExistsException(title=title, author_id=author_id)
 
-    def delete_book(self, book_id: int) -> Optional[BooksModel]:
-        return self.repository.delete(book_id)
\ No newline at end of file
+    def delete_book(self, book_id: int, cascade: bool = False) -> Row:
+        """
+        Удалить книгу одним условным DELETE ... WHERE NOT EXISTS: книгу с комментариями
+        или на полках удалить нельзя. С cascade комментарии и записи на полках
+        удаляются вместе с ней, по одному DELETE на таблицу.
+        Возвращает (книга, author_name, genre_name).
+        """
+        # Без cascade удаляется только история (удаленные и архивные строки)
+        BookCommentRepository(self.db).delete_by_books([book_id], history_only=not cascade)
+        users = ShelfRepository(self.db).delete_by_books([book_id], history_only=not cascade)
+        # Списки соседей ссылаются на книгу; удаляются в той же транзакции
+        BookSimilarityRepository(self.db).delete_by_book(book_id)
+        blockers = self.repository.delete_blockers(book_id)
+        deleted = self.repository.delete_unless(book_id, blockers.values(), **self.repository.name_columns())
+        if deleted is None:
+            found = self.repository.get_blockers(book_id, blockers)
+            self.db.rollback()
+            if found is None:
+                raise BookNotFoundException(book_id=book_id)
+            if found.has_comments:
+                raise BookHasCommentsException(book_id=book_id)
+            raise BookInShelfException(book_id=book_id)
+        self.db.commit()
+        catalog_version.bump()
+        if cascade:
+            comments_version.bump()
+        for user_id in users:
+            similarity_tracker.mark(user_id, [])
+            user_stats_cache.invalidate(user_id)
+        return deleted
\ No newline at end of file
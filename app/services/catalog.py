@@ -0,0 +1,50 @@
+from typing import List, Tuple
+from jinja2 import Environment
+from markupsafe import Markup
+from sqlalchemy.orm import Session
+from app.repositories.books import BookRepository
+from app.utils.cache import FragmentCache, catalog_version, comments_version
+
+# Сколько книг попадает в серверную витрину и сколько карточек на первой странице (как booksPerPage в app.js)
+CATALOG_BOOKS_LIMIT = 100
+CATALOG_FIRST_PAGE = 12
+
+_fragments = FragmentCache(ttl=60.0)
+
+
+class CatalogService:
+    """
+    Серверная витрина каталога: HTML первой страницы сетки книг и данные
+    для app.js, кэшируемые по версии каталога.
+    """
+
+    def __init__(self, db: Session, templates_env: Environment):
+        self.repository = BookRepository(db)
+        self.templates_env = templates_env
+
+    def get_page_context(self) -> Tuple[Markup, List[dict]]:
+        book_grid, books = _fragments.get_or_render(
+            "catalog", (catalog_version.value, comments_version.value), self._render
+        )
+        return Markup(book_grid), books
+
+    def _render(self) -> Tuple[str, List[dict]]:
+        books = [
+            {
+                "id": book.id,
+                "title": book.title,
+                "description": book.description,
+                "author_id": book.author_id,
+                "genre_id": book.genre_id,
+                "year": book.year,
+                "author_name": book.author.name if book.author else None,
+                "genre_name": book.genre.name if book.genre else None,
+                "comments_count": book.comments_count,
+                "comments": []
+            }
+            for book in self.repository.get_catalog(CATALOG_BOOKS_LIMIT)
+        ]
+        book_grid = self.templates_env.get_template("_book_grid.html").render(
+            books=books[:CATALOG_FIRST_PAGE]
+        )
+        return book_grid, books
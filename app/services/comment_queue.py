@@ -0,0 +1,184 @@
+# app/services/comment_queue.py
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal
+from app.schemes.book_comments import BookCommentCreate
+
+logger = logging.getLogger(__name__)
+
+# Режим записи комментариев:
+#   "sync"         - комментарий сохраняется в запросе (commit до ответа)
+#   "write_behind" - комментарий ставится в очередь и сохраняется пакетом в фоне.
+#                    Очередь и статусы временных id живут в памяти процесса, поэтому
+#                    режим требует одного воркера (serve.py --workers 1): другой воркер
+#                    на запрос статуса ответит 404
+COMMENT_INGEST_MODE = os.getenv("COMMENT_INGEST_MODE", "sync")
+COMMENT_INGEST_FLUSH_MS = int(os.getenv("COMMENT_INGEST_FLUSH_MS", "20"))
+COMMENT_INGEST_BATCH_SIZE = int(os.getenv("COMMENT_INGEST_BATCH_SIZE", "200"))
+COMMENT_INGEST_MAX_PENDING = int(os.getenv("COMMENT_INGEST_MAX_PENDING", "10000"))
+
+
+class CommentQueueFullError(Exception):
+    pass
+
+
+class CommentIngestQueue:
+    """
+    Очередь отложенной записи комментариев.
+
+    Комментарии принимаются без обращения к БД и получают временный id.
+    Фоновый поток сбрасывает их в БД одной транзакцией, как только набралось
+    batch_size записей или прошло flush_interval секунд с первой записи пакета.
+    Если пакет не записался, комментарии записываются по одному: статус "failed"
+    получают только те, что не записались и поодиночке.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = COMMENT_INGEST_FLUSH_MS / 1000,
+        batch_size: int = COMMENT_INGEST_BATCH_SIZE,
+        max_pending: int = COMMENT_INGEST_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Tuple[str, dict]]" = queue.Queue(maxsize=max_pending)
+        # Временные id, еще не записанные в БД
+        self._pending: Set[str] = set()
+        # provisional_id -> id сохраненного комментария (None, если запись не удалась)
+        self._results: "OrderedDict[str, Optional[int]]" = OrderedDict()
+        self._results_limit = max_pending
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, comment: BookCommentCreate) -> str:
+        """
+        Поставить комментарий в очередь. Возвращает временный id.
+        """
+        self._ensure_started()
+        provisional_id = uuid.uuid4().hex
+        row = comment.dict()
+        # Время принятия, а не время записи, чтобы порядок ленты не зависел от задержки сброса
+        row["created_at"] = datetime.utcnow()
+        with self._lock:
+            self._pending.add(provisional_id)
+        try:
+            self._queue.put_nowait((provisional_id, row))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(provisional_id)
+            raise CommentQueueFullError()
+        return provisional_id
+
+    def status(self, provisional_id: str) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Статус комментария по временному id: ("stored", id), ("failed", None) или ("pending", None).
+        None - id не выдавался этим процессом или его результат уже вытеснен.
+        """
+        with self._lock:
+            if provisional_id in self._pending:
+                return "pending", None
+            if provisional_id in self._results:
+                comment_id = self._results[provisional_id]
+                return ("stored" if comment_id is not None else "failed"), comment_id
+        return None
+
+    def drain(self) -> None:
+        """
+        Остановить фоновый поток, предварительно записав все принятые комментарии.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Сбрасываем то, что могло попасть в очередь после остановки потока
+        while not self._queue.empty():
+            self._flush(self._take_batch(block=False))
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopping.clear()
+                    self._thread = threading.Thread(
+                        target=self._run, name="comment-ingest", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._take_batch(block=True)
+            if batch:
+                self._flush(batch)
+
+    def _take_batch(self, block: bool) -> List[Tuple[str, dict]]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            else:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: List[Tuple[str, dict]]) -> None:
+        if not batch:
+            return
+        # Импорт здесь, чтобы избежать цикла service -> queue -> service
+        from app.services.book_comments import BookCommentService
+
+        # Без expire_on_commit id доступны после commit без повторного SELECT
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            service = BookCommentService(db)
+            try:
+                comments = service.create_comments([row for _, row in batch])
+                ids = [comment.id for comment in comments]
+            except Exception:
+                # Одна неверная строка не должна отменять весь пакет:
+                # повторяем по одной (create_comments делает rollback)
+                logger.warning("Failed to flush %d queued comments, retrying one by one", len(batch), exc_info=True)
+                ids = [self._store_one(service, provisional_id, row) for provisional_id, row in batch]
+        finally:
+            db.close()
+
+        with self._lock:
+            for (provisional_id, _), comment_id in zip(batch, ids):
+                self._pending.discard(provisional_id)
+                self._results[provisional_id] = comment_id
+            while len(self._results) > self._results_limit:
+                self._results.popitem(last=False)
+
+    @staticmethod
+    def _store_one(service, provisional_id: str, row: dict) -> Optional[int]:
+        try:
+            return service.create_comments([row])[0].id
+        except Exception:
+            logger.exception("Failed to store queued comment %s", provisional_id)
+            return None
+
+
+comment_queue = CommentIngestQueue(SessionLocal)
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from app.repositories.gengres import GenreRepository
 from app.schemes.gengres import GenreCreate, GenreUpdate
 from app.models.gengres import GengresModel
+from app.services.loaders import get_loaders
+from app.utils.cache import catalog_version
 
 
 class GenreService:
@@ -10,7 +12,7 @@ class GenreService:
         self.repository = GenreRepository(db)
 
     def get_genre(self, genre_id: int) -> Optional[GengresModel]:
-        return self.repository.get(genre_id)
+        return get_loaders(self.repository.db).genres.get(genre_id)
 
     def get_genre_by_name(self, name: str) -> Optional[GengresModel]:
         return self.repository.get_by_name(name)
@@ -19,13 +21,22 @@ class GenreService:
         return self.repository.get_all(skip, limit)
 
     def create_genre(self, genre: GenreCreate) -> GengresModel:
-        return self.repository.create(genre.dict())
+        db_genre = self.repository.create(genre.dict())
+        self.repository.db.commit()
+        catalog_version.bump()
+        return db_genre
 
     def update_genre(self, genre_id: int, genre: GenreUpdate) -> Optional[GengresModel]:
-        db_genre = self.repository.get(genre_id)
+        db_genre = self.get_genre(genre_id)
         if db_genre:
-            return self.repository.update(db_genre, genre.dict())
+            db_genre = self.repository.update(db_genre, genre.dict())
+            self.repository.db.commit()
+            catalog_version.bump()
+            return db_genre
         return None
 
     def delete_genre(self, genre_id: int) -> Optional[GengresModel]:
-        return self.repository.delete(genre_id)
\ No newline at end of file
+        db_genre = self.repository.delete(genre_id)
+        self.repository.db.commit()
+        catalog_version.bump()
+        return db_genre
\ No newline at end of file
@@ -0,0 +1,71 @@
+# app/services/loaders.py
+from typing import Dict, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.authors import AuthorsModel
+from app.models.books import BooksModel
+from app.models.gengres import GengresModel
+from app.models.users import UserModel
+from app.repositories.authors import AuthorRepository
+from app.repositories.books import BookRepository
+from app.repositories.gengres import GenreRepository
+from app.repositories.users import UserRepository
+from app.utils.loader import BatchLoader
+
+
+class RequestLoaders:
+    """
+    Загрузчики авторов, жанров, пользователей и книг по id на время одного запроса.
+
+    Живут в session.info: сессия создается на запрос (get_db), поэтому и кэш
+    загрузчиков - на запрос. Повторные get одного id запросов не делают,
+    а id, отложенные через load(), читаются одним IN-запросом на тип.
+    Объекты попадают в identity map сессии, поэтому ленивые связи
+    book.author / book.genre после with_names() берутся из нее без SQL.
+    """
+
+    def __init__(self, db: Session):
+        self.authors: BatchLoader[int, AuthorsModel] = BatchLoader(AuthorRepository(db).get_many)
+        self.genres: BatchLoader[int, GengresModel] = BatchLoader(GenreRepository(db).get_many)
+        self.users: BatchLoader[int, UserModel] = BatchLoader(UserRepository(db).get_many)
+        self.books: BatchLoader[int, BooksModel] = BatchLoader(BookRepository(db).get_many)
+
+    def books_with_names(self, book_ids: Iterable[int]) -> Dict[int, BooksModel]:
+        """
+        Книги по id с авторами и жанрами: три IN-запроса (книги, авторы, жанры)
+        вместо соединения, авторы и жанры повторно не читаются в пределах запроса.
+        """
+        books = {book.id: book for book in self.books.load_many(book_ids) if book is not None}
+        self.with_names(books.values())
+        return books
+
+    def with_names(self, books: Iterable[BooksModel]) -> None:
+        """
+        Загрузить авторов и жанры книг двумя IN-запросами (только тех, что еще не в кэше).
+        """
+        for book in books:
+            self.authors.load(book.author_id)
+            self.genres.load(book.genre_id)
+        self.authors.dispatch()
+        self.genres.dispatch()
+
+    def clear(self) -> None:
+        for loader in (self.authors, self.genres, self.users, self.books):
+            loader.clear()
+
+
+def get_loaders(db: Session) -> RequestLoaders:
+    loaders = db.info.get("loaders")
+    if loaders is None:
+        loaders = db.info["loaders"] = RequestLoaders(db)
+    return loaders
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_after_rollback(session: Session) -> None:
+    # После отката закэшированные объекты могут описывать строки, которых уже нет
+    loaders = session.info.get("loaders")
+    if loaders is not None:
+        loaders.clear()
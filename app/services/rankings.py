@@ -0,0 +1,229 @@
+# app/services/rankings.py
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories.books import BookRepository
+from app.repositories.rankings import RankingRepository
+from app.services.loaders import get_loaders
+from app.utils.leaderboard import RollingCounters, SortedScores
+
+# Окна трендов в часовых корзинах
+TRENDING_WINDOWS = {"1d": 24, "7d": 24 * 7, "30d": 24 * 30}
+# Как часто процесс дочитывает журнал рейтингов (события других воркеров)
+RANKINGS_REFRESH_SECONDS = int(os.getenv("RANKINGS_REFRESH_SECONDS", "10"))
+# Как часто события старше самого длинного окна трендов сворачиваются в итоги
+RANKINGS_COMPACT_SECONDS = int(os.getenv("RANKINGS_COMPACT_SECONDS", "3600"))
+
+
+def _timestamp(value: datetime) -> float:
+    # created_at хранится как naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BookRankings:
+    """
+    Таблицы лидеров книг в памяти процесса.
+
+    popular - все время: добавления на полку + прочтения + комментарии,
+    удаление с полки или комментария уменьшает счет.
+    trending - активность (добавления, прочтения, комментарии) за скользящие окна.
+
+    Источник - журнал book_ranking_events: сервисы полки и комментариев пишут
+    события в своих транзакциях (record), после commit событие сразу попадает
+    в таблицы процесса. load() собирает таблицы при старте, sync() дочитывает
+    журнал после последнего учтенного id - так приходят события других воркеров.
+    id событий растут в порядке commit (SQLite пишет в одну транзакцию за раз),
+    поэтому отметки по id достаточно.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._popular = SortedScores()
+        self._trending = RollingCounters(TRENDING_WINDOWS)
+        # id последнего события журнала, учтенного в таблицах
+        self._last_id = 0
+        # События этого процесса, примененные после commit, но еще не дочитанные sync():
+        # id -> (book_id, delta, created_at)
+        self._own: Dict[int, Tuple[int, int, datetime]] = {}
+
+    def record(self, db: Session, book_id: int, delta: int = 1) -> None:
+        """
+        Записать событие по книге: добавление на полку, прочтение или комментарий (delta > 0)
+        либо их отмену (delta < 0, только для popular). Пишется в транзакции db (без commit),
+        в таблицы процесса попадает после ее commit.
+        """
+        self.record_many(db, [(book_id, delta)])
+
+    def record_many(self, db: Session, changes: Iterable[Tuple[int, int]]) -> None:
+        """
+        Записать события (book_id, delta) одним INSERT (без commit).
+        """
+        created_at = datetime.utcnow()
+        changes = [(book_id, delta) for book_id, delta in changes if delta != 0]
+        ids = RankingRepository(db).add_events([
+            {"book_id": book_id, "delta": delta, "created_at": created_at} for book_id, delta in changes
+        ])
+        db.info.setdefault("ranking_events", []).extend(
+            (event_id, (book_id, delta, created_at)) for event_id, (book_id, delta) in zip(ids, changes)
+        )
+
+    def _apply_committed(self, recorded: List[Tuple[int, Tuple[int, int, datetime]]]) -> None:
+        now = time.time()
+        with self._lock:
+            for event_id, change in recorded:
+                # Уже дочитано sync() из журнала и учтено им
+                if event_id <= self._last_id:
+                    continue
+                self._own[event_id] = change
+                self._add(self._popular, self._trending, change, now)
+
+    @staticmethod
+    def _add(popular: SortedScores, trending: RollingCounters, change: Tuple[int, int, datetime], now: float) -> None:
+        book_id, delta, created_at = change
+        popular.add(book_id, delta)
+        if delta > 0:
+            trending.add(book_id, _timestamp(created_at), now, delta)
+
+    def popular(self, limit: int) -> List[tuple]:
+        with self._lock:
+            return self._popular.top(limit)
+
+    def trending(self, window: str, limit: int) -> List[tuple]:
+        with self._lock:
+            return self._trending.top(window, limit, time.time())
+
+    def load(self, db: Session) -> None:
+        """
+        Собрать таблицы из свернутых итогов и журнала (он хранит только самое длинное окно трендов).
+        События процесса, закоммиченные после снимка, переносятся в новые таблицы.
+        """
+        repository = RankingRepository(db)
+        while True:
+            compacted_id = repository.get_compacted_id()
+            last_id = repository.get_last_event_id()
+            scores = dict(repository.get_totals())
+            events = repository.get_events(compacted_id, last_id)
+            # Сжатие журнала между чтениями дало бы несогласованный снимок - читаем заново
+            if repository.get_compacted_id() == compacted_id:
+                break
+
+        now = time.time()
+        trending = RollingCounters(TRENDING_WINDOWS)
+        trending.advance(now)
+        for _, book_id, delta, created_at in events:
+            scores[book_id] = scores.get(book_id, 0) + delta
+        popular = SortedScores(scores)
+        for _, book_id, delta, created_at in events:
+            if delta > 0:
+                trending.add(book_id, _timestamp(created_at), now, delta)
+
+        with self._lock:
+            self._own = {event_id: change for event_id, change in self._own.items() if event_id > last_id}
+            for change in self._own.values():
+                self._add(popular, trending, change, now)
+            self._popular = popular
+            self._trending = trending
+            self._last_id = last_id
+
+    def sync(self, db: Session) -> None:
+        """
+        Дочитать журнал после последнего учтенного события. Свои события уже в таблицах
+        и только снимаются с учета.
+        """
+        events = RankingRepository(db).get_events(self._last_id)
+        now = time.time()
+        with self._lock:
+            for event_id, book_id, delta, created_at in events:
+                if event_id <= self._last_id:
+                    continue
+                if self._own.pop(event_id, None) is None:
+                    self._add(self._popular, self._trending, (book_id, delta, created_at), now)
+                self._last_id = event_id
+
+
+book_rankings = BookRankings()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    recorded = session.info.pop("ranking_events", None)
+    if recorded:
+        book_rankings._apply_committed(recorded)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_rollback(session: Session) -> None:
+    # Откаченные события не попали в журнал
+    session.info.pop("ranking_events", None)
+
+
+class RankingService:
+    def __init__(self, db: Session):
+        self.repository = BookRepository(db)
+
+    def get_popular(self, limit: int = 20) -> List[dict]:
+        return self._with_books(book_rankings.popular(limit))
+
+    def get_trending(self, window: str = "7d", limit: int = 20) -> List[dict]:
+        return self._with_books(book_rankings.trending(window, limit))
+
+    def _with_books(self, ranking: List[tuple]) -> List[dict]:
+        """
+        Дополнить (book_id, score) данными книг одним запросом, сохранив порядок рейтинга.
+        """
+        books = get_loaders(self.repository.db).books_with_names([book_id for book_id, _ in ranking])
+        result = []
+        for book_id, score in ranking:
+            book = books.get(book_id)
+            if book is None:
+                continue
+            result.append({
+                "id": book.id,
+                "title": book.title,
+                "author_id": book.author_id,
+                "genre_id": book.genre_id,
+                "year": book.year,
+                "author_name": book.author.name if book.author else None,
+                "genre_name": book.genre.name if book.genre else None,
+                "comments_count": book.comments_count,
+                "score": score
+            })
+        return result
+
+
+def load_rankings(session_factory: Callable[[], Session]) -> None:
+    db = session_factory()
+    try:
+        book_rankings.load(db)
+    finally:
+        db.close()
+
+
+def refresh_rankings(session_factory: Callable[[], Session]) -> None:
+    db = session_factory()
+    try:
+        book_rankings.sync(db)
+    finally:
+        db.close()
+
+
+def compact_rankings(session_factory: Callable[[], Session]) -> None:
+    """
+    Свернуть события журнала, вышедшие из самого длинного окна трендов, в итоги по книгам.
+    """
+    db = session_factory()
+    try:
+        before = datetime.utcnow() - timedelta(hours=max(TRENDING_WINDOWS.values()))
+        if RankingRepository(db).compact(before):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,178 @@
+# app/services/recommendations.py
+import heapq
+import math
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.book_similarities import BookSimilarityRepository
+from app.repositories.books import BookRepository
+from app.repositories.shelf import ShelfRepository
+from app.services.loaders import get_loaders
+
+# Сколько соседей хранится на книгу
+SIMILAR_BOOKS_TOP_K = int(os.getenv("SIMILAR_BOOKS_TOP_K", "20"))
+# Как часто пересчитываются соседи книг, затронутых записями в полку
+SIMILARITY_REBUILD_SECONDS = int(os.getenv("SIMILARITY_REBUILD_SECONDS", "60"))
+# Сколько книг пересчитывается одним запросом
+_REBUILD_CHUNK = 200
+
+
+class SimilarityTracker:
+    """
+    Книги и пользователи, чьи записи на полке изменились с последнего пересчета.
+    Каждый процесс помечает только свои записи и сам их пересчитывает.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Set[int] = set()
+        self._books: Set[int] = set()
+        # Процесс уже проверил, что таблица соседей заполнена (или заполнил ее сам)
+        self.initial_build_done = False
+
+    def mark(self, user_id: int, book_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._users.add(user_id)
+            self._books.update(book_ids)
+
+    def restore(self, user_ids: Iterable[int], book_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._users.update(user_ids)
+            self._books.update(book_ids)
+
+    def take(self) -> Tuple[Set[int], Set[int]]:
+        with self._lock:
+            users, books = self._users, self._books
+            self._users, self._books = set(), set()
+            return users, books
+
+
+similarity_tracker = SimilarityTracker()
+
+
+class RecommendationService:
+    """
+    Рекомендации "читатели также добавили".
+
+    Сходство книг A и B - косинус по полкам: together(A, B) / sqrt(n(A) * n(B)),
+    где together - число пользователей с обеими книгами, n - с книгой вообще.
+    Для каждой книги хранится SIMILAR_BOOKS_TOP_K соседей в book_similarities,
+    поэтому выдача читает не больше K строк на книгу.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = BookSimilarityRepository(db)
+        self.shelf_repository = ShelfRepository(db)
+        self.book_repository = BookRepository(db)
+
+    def get_similar_books(self, book_id: int, limit: int = 10) -> List[dict]:
+        return self._with_books(self.repository.get_neighbors(book_id, limit))
+
+    def get_user_recommendations(self, user_id: int, limit: int = 10) -> List[dict]:
+        book_ids = self.shelf_repository.get_book_ids_by_users([user_id])
+        return self._with_books(self.repository.get_recommendations(book_ids, limit))
+
+    def rebuild(self, book_ids: Iterable[int]) -> int:
+        """
+        Пересчитать соседей для book_ids. Возвращает число пересчитанных книг.
+
+        Пары и их количества агрегирует БД (самосоединение полки с GROUP BY),
+        в Python остается только выбрать top-K по каждой книге. Число полок
+        читается только для книг пачки и их соседей.
+        """
+        book_ids = sorted(set(book_ids))
+        if not book_ids:
+            return 0
+        shelved: Dict[int, int] = {}
+        try:
+            for start in range(0, len(book_ids), _REBUILD_CHUNK):
+                chunk = book_ids[start:start + _REBUILD_CHUNK]
+                pairs = self.repository.get_cooccurrence(chunk)
+                missing = {book_id for pair in pairs for book_id in pair[:2]} - shelved.keys()
+                if missing:
+                    shelved.update(
+                        (book_id, count) for book_id, count, _ in self.shelf_repository.count_by_book(missing)
+                    )
+                candidates: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+                for book_id, other_id, together in pairs:
+                    score = together / math.sqrt(shelved[book_id] * shelved[other_id])
+                    candidates[book_id].append((score, -other_id))
+                rows = [
+                    {"book_id": book_id, "similar_book_id": -negative_id, "score": score}
+                    for book_id, scored in candidates.items()
+                    for score, negative_id in heapq.nlargest(SIMILAR_BOOKS_TOP_K, scored)
+                ]
+                self.repository.replace_neighbors(chunk, rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(book_ids)
+
+    def rebuild_dirty(self, full: bool = False) -> int:
+        """
+        Пересчитать книги, затронутые записями с прошлого раза: измененные книги
+        и все книги на полках изменивших их пользователей (их пары с измененными книгами).
+
+        У остальных соседей измененной книги сходство с ней обновится при их
+        следующем пересчете (знаменатель отличается на одну запись).
+        При full пересчитываются все книги на полках.
+        """
+        users, books = similarity_tracker.take()
+        try:
+            if full:
+                books.update(book_id for book_id, _, _ in self.shelf_repository.count_by_book())
+            elif users:
+                books.update(self.shelf_repository.get_book_ids_by_users(users))
+            return self.rebuild(books)
+        except Exception:
+            # Вернуть отметки, чтобы пересчитать при следующем запуске
+            similarity_tracker.restore(users, books)
+            raise
+
+    def _with_books(self, ranking: List[Tuple[int, float]]) -> List[dict]:
+        books = get_loaders(self.db).books_with_names([book_id for book_id, _ in ranking])
+        result = []
+        for book_id, score in ranking:
+            book = books.get(book_id)
+            if book is None:
+                continue
+            result.append({
+                "id": book.id,
+                "title": book.title,
+                "author_id": book.author_id,
+                "genre_id": book.genre_id,
+                "year": book.year,
+                "author_name": book.author.name if book.author else None,
+                "genre_name": book.genre.name if book.genre else None,
+                "score": round(score, 4)
+            })
+        return result
+
+
+def rebuild_similarities(
+    session_factory: Callable[[], Session], full: bool = False, initial_build: bool = True
+) -> int:
+    """
+    Пересчитать книги, отмеченные этим процессом. С initial_build (процесс фоновых
+    задач) при пустой таблице соседей сначала выполняется полный пересчет.
+    """
+    db = session_factory()
+    try:
+        service = RecommendationService(db)
+        # Полный пересчет при пустой таблице - только первый раз: если полки
+        # пусты, таблица останется пустой, и проверка не должна повторяться каждый проход
+        check_empty = initial_build and not similarity_tracker.initial_build_done
+        if check_empty:
+            full = full or service.repository.is_empty()
+        rebuilt = service.rebuild_dirty(full=full)
+        if check_empty:
+            similarity_tracker.initial_build_done = True
+        return rebuilt
+    finally:
+        db.close()
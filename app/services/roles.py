@@ -27,5 +27,8 @@ class RoleService:
             return self.repository.update(db_role, role.dict(exclude_unset=True))
         return None
 
+    def is_role_in_use(self, role_id: int) -> bool:
+        return self.repository.is_in_use(role_id)
+
     def delete_role(self, role_id: int) -> Optional[RoleModel]:
         return self.repository.delete(role_id)
\ No newline at end of file
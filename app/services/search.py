@@ -0,0 +1,88 @@
+# app/services/search.py
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.books import BookRepository
+from app.utils.cache import catalog_version
+from app.utils.text_search import PrefixIndex, TrigramIndex, normalize
+
+# Сколько найденных книг возвращает нечеткий поиск (дальше - фильтры и пагинация)
+SEARCH_MAX_MATCHES = 1000
+# Через сколько секунд индекс перестраивается, даже если версия каталога не менялась
+# (изменения, сделанные другим процессом)
+SEARCH_INDEX_TTL = 60.0
+
+
+class BookSearchIndex:
+    """
+    Индексы названий книг и имен авторов в памяти процесса: триграммный для
+    поиска и отсортированный массив префиксов для подсказок. Оба перестраиваются
+    одним запросом при изменении версии каталога или по TTL.
+    """
+
+    def __init__(self, ttl: float = SEARCH_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (версия каталога, время сборки, триграммы, префиксы, нормализованные названия и авторы)
+        self._state: Optional[Tuple[int, float, TrigramIndex, PrefixIndex, Dict[int, str], Dict[int, str]]] = None
+
+    def _is_fresh(self, version: int) -> bool:
+        state = self._state
+        return state is not None and state[0] == version and time.monotonic() - state[1] < self.ttl
+
+    def _current(self, db: Session) -> Tuple[TrigramIndex, PrefixIndex, Dict[int, str], Dict[int, str]]:
+        version = catalog_version.value
+        if not self._is_fresh(version):
+            with self._lock:
+                if not self._is_fresh(version):
+                    rows = BookRepository(db).get_search_documents()
+                    titles = {book_id: normalize(title) for book_id, title, _, _ in rows}
+                    authors = {book_id: normalize(author or "") for book_id, _, _, author in rows}
+                    index = TrigramIndex((book_id, f"{title} {author or ''}") for book_id, title, _, author in rows)
+                    author_names = {author_id: author for _, _, author_id, author in rows if author}
+                    prefixes = PrefixIndex(
+                        [(title, ("book", book_id, title)) for book_id, title, _, _ in rows]
+                        + [(name, ("author", author_id, name)) for author_id, name in author_names.items()]
+                    )
+                    self._state = (version, time.monotonic(), index, prefixes, titles, authors)
+        return self._state[2:]
+
+    def autocomplete(self, db: Session, query: str, limit: int = 10) -> List[Tuple[str, int, str]]:
+        """
+        Подсказки по началу названия книги или имени автора (или любого их слова):
+        (тип "book"/"author", id, подпись).
+        """
+        return self._current(db)[1].search(query, limit)
+
+    def search(self, db: Session, query: str, limit: int = SEARCH_MAX_MATCHES) -> List[Tuple[int, float]]:
+        """
+        Книги по названию и автору, от лучшего совпадения к худшему: (book_id, оценка).
+
+        Оценка - доля совпавших триграмм запроса плюс бонус, если нормализованный
+        запрос целиком входит в название (больше) или в имя автора.
+        """
+        index, _, titles, authors = self._current(db)
+        key = normalize(query)
+        if not key:
+            return []
+        if len(key) < 3:
+            # Из одной-двух букв не набрать триграмм: ищем подстроку в нормализованных строках
+            matches = [(book_id, 0.0) for book_id, title in titles.items() if key in title or key in authors[book_id]]
+        else:
+            matches = index.search(query)
+        ranked = []
+        for book_id, similarity in matches:
+            score = similarity
+            if key in titles[book_id]:
+                score += 1.0 if titles[book_id].startswith(key) else 0.75
+            elif key in authors[book_id]:
+                score += 0.5
+            ranked.append((book_id, score))
+        ranked.sort(key=lambda item: (-item[1], len(titles[item[0]]), item[0]))
+        return ranked[:limit]
+
+
+book_search_index = BookSearchIndex()
@@ -1,8 +1,27 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from app.repositories.shelf import ShelfRepository
-from app.schemes.shelf import ShelfCreate, ShelfUpdate
+from app.schemes.shelf import (
+    ShelfBatchAction,
+    ShelfBatchItemResult,
+    ShelfBatchOperation,
+    Shelf,
+    ShelfCreate,
+    ShelfUpdate,
+)
 from app.models.shelf import ShelfModel
+from app.exceptions.shelf import (
+    BookAlreadyInShelfException,
+    BookNotInShelfException,
+    ShelfLimitExceededException,
+)
+from app.exceptions.books import BookNotFoundException
+from app.services.rankings import book_rankings
+from app.services.recommendations import similarity_tracker
+from app.services.user_stats import user_stats_cache
+
+# Максимальное количество книг на полке одного пользователя
+MAX_SHELF_BOOKS = 100
 
 
 class ShelfService:
@@ -27,22 +46,144 @@ class ShelfService:
     def get_read_books(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ShelfModel]:
         return self.repository.get_read_books(user_id, skip, limit)
 
-    def add_to_shelf(self, shelf_data: ShelfCreate) -> ShelfModel:
-        return self.repository.create(shelf_data.dict())
+    def add_to_shelf(self, shelf_data: ShelfCreate) -> Optional[ShelfModel]:
+        """
+        Добавить книгу на полку. Возвращает None, если книга уже на полке
+        или достигнут лимит MAX_SHELF_BOOKS.
+        """
+        entry = self.repository.add_if_absent(
+            shelf_data.user_id, shelf_data.book_id, shelf_data.status_read, MAX_SHELF_BOOKS
+        )
+        if entry is not None:
+            book_rankings.record(self.repository.db, entry.book_id, 1 + entry.status_read)
+        self.repository.db.commit()
+        if entry is not None:
+            similarity_tracker.mark(entry.user_id, [entry.book_id])
+            user_stats_cache.invalidate(entry.user_id)
+        return entry
 
     def update_shelf_entry(self, shelf_id: int, shelf_data: ShelfUpdate) -> Optional[ShelfModel]:
         db_shelf = self.repository.get(shelf_id)
         if db_shelf:
-            return self.repository.update(db_shelf, shelf_data.dict(exclude_unset=True))
+            was_read = db_shelf.status_read
+            db_shelf = self.repository.update(db_shelf, shelf_data.dict(exclude_unset=True))
+            book_rankings.record(self.repository.db, db_shelf.book_id, db_shelf.status_read - was_read)
+            self.repository.db.commit()
+            user_stats_cache.invalidate(db_shelf.user_id)
+            return db_shelf
         return None
 
+    def get_shelf_history(
+        self, user_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[ShelfModel]:
+        return self.repository.get_history(user_id, skip, limit, include_archived)
+
     def remove_from_shelf(self, shelf_id: int) -> Optional[ShelfModel]:
-        return self.repository.delete(shelf_id)
+        # Мягкое удаление: запись остается историей полки
+        db_shelf = self.repository.soft_delete(shelf_id)
+        if db_shelf:
+            book_rankings.record(self.repository.db, db_shelf.book_id, -(1 + db_shelf.status_read))
+            self.repository.db.commit()
+            similarity_tracker.mark(db_shelf.user_id, [db_shelf.book_id])
+            user_stats_cache.invalidate(db_shelf.user_id)
+        return db_shelf
 
     def mark_as_read(self, shelf_id: int) -> Optional[ShelfModel]:
         db_shelf = self.repository.get(shelf_id)
         if db_shelf:
+            was_read = db_shelf.status_read
             db_shelf.status_read = True
+            book_rankings.record(self.repository.db, db_shelf.book_id, 1 - was_read)
             self.repository.db.commit()
-            self.repository.db.refresh(db_shelf)
-        return db_shelf
\ No newline at end of file
+            user_stats_cache.invalidate(db_shelf.user_id)
+        return db_shelf
+
+    def apply_batch(self, user_id: int, operations: List[ShelfBatchOperation]) -> List[ShelfBatchItemResult]:
+        """
+        Применить пакет операций add/mark_read/remove к полке пользователя.
+
+        Операции проверяются по порядку на снимке полки, загруженном одним запросом,
+        после чего итоговые изменения записываются набором INSERT/UPDATE/DELETE
+        в одной транзакции. Лимит полки проверяется один раз по текущему количеству книг.
+        """
+        book_ids = {operation.book_id for operation in operations}
+        db = self.repository.db
+        try:
+            existing = self.repository.get_by_user_and_books(user_id, book_ids)
+            known_books = self.repository.get_existing_book_ids(book_ids)
+            shelf_size = self.repository.count_by_user(user_id)
+
+            # book_id -> status_read (None, если книги нет на полке)
+            original: Dict[int, Optional[bool]] = {
+                book_id: (existing[book_id].status_read if book_id in existing else None)
+                for book_id in book_ids
+            }
+            state = dict(original)
+            results = []
+
+            for operation in operations:
+                book_id = operation.book_id
+                error = None
+                if operation.action == ShelfBatchAction.ADD:
+                    if state[book_id] is not None:
+                        error = BookAlreadyInShelfException(user_id=user_id, book_id=book_id)
+                    elif book_id not in known_books:
+                        error = BookNotFoundException(book_id=book_id)
+                    elif shelf_size >= MAX_SHELF_BOOKS:
+                        error = ShelfLimitExceededException(max_books=MAX_SHELF_BOOKS)
+                    else:
+                        state[book_id] = operation.status_read
+                        shelf_size += 1
+                elif state[book_id] is None:
+                    error = BookNotInShelfException(user_id=user_id, book_id=book_id)
+                elif operation.action == ShelfBatchAction.MARK_READ:
+                    state[book_id] = True
+                else:
+                    state[book_id] = None
+                    shelf_size -= 1
+
+                results.append(ShelfBatchItemResult(
+                    action=operation.action,
+                    book_id=book_id,
+                    success=error is None,
+                    detail=error.detail if error is not None else None,
+                ))
+
+            to_add = {}
+            to_remove = []
+            to_status = {True: [], False: []}
+            for book_id in book_ids:
+                before, after = original[book_id], state[book_id]
+                if before is None and after is not None:
+                    to_add[book_id] = after
+                elif before is not None and after is None:
+                    to_remove.append(book_id)
+                elif before is not None and before != after:
+                    to_status[after].append(book_id)
+
+            self.repository.bulk_remove(user_id, to_remove)
+            self.repository.bulk_add(user_id, to_add)
+            for status_read, ids in to_status.items():
+                self.repository.bulk_set_status(user_id, ids, status_read)
+            # Вклад записи в популярность: 1 за наличие на полке и 1 за прочтение
+            book_rankings.record_many(db, [
+                (book_id, (state[book_id] is not None) + bool(state[book_id])
+                 - (original[book_id] is not None) - bool(original[book_id]))
+                for book_id in book_ids
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if to_add or to_remove:
+            similarity_tracker.mark(user_id, list(to_add) + to_remove)
+        user_stats_cache.invalidate(user_id)
+
+        entries = self.repository.get_by_user_and_books(
+            user_id, [book_id for book_id, status in state.items() if status is not None]
+        )
+        for result in results:
+            if result.success and result.book_id in entries:
+                result.entry = Shelf.model_validate(entries[result.book_id])
+        return results
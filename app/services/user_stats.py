@@ -0,0 +1,44 @@
+# app/services/user_stats.py
+import os
+
+from sqlalchemy.orm import Session
+from app.exceptions.users import UserNotFoundException
+from app.repositories.shelf import ShelfRepository
+from app.schemes.user import UserStats, UserStatsDecade, UserStatsGroup
+from app.utils.cache import FragmentCache, catalog_version
+
+# Статистика пользователя сбрасывается сервисом полки при записи;
+# ttl ограничивает устаревание при записи через другой процесс
+USER_STATS_CACHE_SIZE = int(os.getenv("USER_STATS_CACHE_SIZE", "10000"))
+user_stats_cache = FragmentCache(ttl=30.0, max_entries=USER_STATS_CACHE_SIZE)
+
+
+class UserStatsService:
+    def __init__(self, db: Session):
+        self.repository = ShelfRepository(db)
+
+    def get_stats(self, user_id: int) -> UserStats:
+        # Версия каталога учитывает переименование жанров и авторов
+        return user_stats_cache.get_or_render(
+            user_id, catalog_version.value, lambda: self._compute(user_id)
+        )
+
+    def _compute(self, user_id: int) -> UserStats:
+        rows = self.repository.get_user_stats(user_id)
+        # Строки "total" нет только у несуществующего пользователя: ошибка не кэшируется
+        if not rows:
+            raise UserNotFoundException(user_id=user_id)
+        stats = UserStats(user_id=user_id)
+        for dimension, key, name, total, read in rows:
+            if dimension == "total":
+                stats.total, stats.read, stats.unread = total, read, total - read
+            elif dimension == "genre":
+                stats.by_genre.append(UserStatsGroup(id=key, name=name, total=total, read=read))
+            elif dimension == "author":
+                stats.by_author.append(UserStatsGroup(id=key, name=name, total=total, read=read))
+            else:
+                stats.by_decade.append(UserStatsDecade(decade=key, total=total, read=read))
+        stats.by_genre.sort(key=lambda group: (-group.total, group.name))
+        stats.by_author.sort(key=lambda group: (-group.total, group.name))
+        stats.by_decade.sort(key=lambda group: group.decade)
+        return stats
@@ -1,7 +1,16 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
+from app.exceptions.users import UserHasBooksException, UserHasCommentsException, UserNotFoundException
 from app.models.users import UserModel
+from app.repositories.book_comments import BookCommentRepository
+from app.repositories.shelf import ShelfRepository
+from app.repositories.users import UserRepository
 from app.schemes.user import UserCreate, UserUpdate
+from app.services.loaders import get_loaders
+from app.services.rankings import book_rankings
+from app.services.recommendations import similarity_tracker
+from app.services.user_stats import user_stats_cache
+from app.utils.cache import comments_version
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,7 +23,7 @@ class UserService:
         return self.db.query(UserModel).offset(skip).limit(limit).all()
     
     def get_user(self, user_id: int):
-        return self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        return get_loaders(self.db).users.get(user_id)
     
     def get_user_by_email(self, email: str):
         return self.db.query(UserModel).filter(UserModel.email == email).first()
@@ -34,7 +43,6 @@ class UserService:
         
         self.db.add(db_user)
         self.db.commit()
-        self.db.refresh(db_user)
         return db_user
     
     def authenticate_user(self, email: str, password: str):
@@ -61,13 +69,38 @@ class UserService:
                 setattr(db_user, key, value)
             
             self.db.commit()
-            self.db.refresh(db_user)
         
         return db_user
     
-    def delete_user(self, user_id: int):
-        db_user = self.get_user(user_id)
-        if db_user:
-            self.db.delete(db_user)
-            self.db.commit()
-        return db_user
\ No newline at end of file
+    def delete_user(self, user_id: int, cascade: bool = False) -> UserModel:
+        """
+        Удалить пользователя одним условным DELETE ... WHERE NOT EXISTS (полка, комментарии).
+        С cascade сначала удаляются его полка и комментарии, по одному DELETE
+        на таблицу; счетчики комментариев книг уменьшаются одним UPDATE.
+        """
+        repository = UserRepository(self.db)
+        # Без cascade удаляется только история (удаленные и архивные строки)
+        comment_book_ids = BookCommentRepository(self.db).delete_by_user(user_id, history_only=not cascade)
+        shelf_rows = ShelfRepository(self.db).delete_by_user(user_id, history_only=not cascade)
+        blockers = repository.delete_blockers(user_id)
+        deleted = repository.delete_unless(user_id, blockers.values())
+        if deleted is None:
+            found = repository.get_blockers(user_id, blockers)
+            self.db.rollback()
+            if found is None:
+                raise UserNotFoundException(user_id=user_id)
+            if found.has_books:
+                raise UserHasBooksException()
+            raise UserHasCommentsException()
+        book_rankings.record_many(
+            self.db,
+            [(book_id, -1) for book_id in comment_book_ids]
+            + [(book_id, -(1 + status_read)) for book_id, status_read in shelf_rows]
+        )
+        self.db.commit()
+        if comment_book_ids:
+            comments_version.bump()
+        if shelf_rows:
+            similarity_tracker.mark(user_id, [book_id for book_id, _ in shelf_rows])
+            user_stats_cache.invalidate(user_id)
+        return deleted[0]
\ No newline at end of file
@@ -12,6 +12,8 @@ let currentFilters = {
     yearTo: null
 };
 let currentModalBook = null; // Текущая открытая книга в модальном окне
+let modalComments = []; // Комментарии, показанные в модальном окне
+let commentsStream = null; // SSE-подписка на комментарии открытой книги
 
 // DOM элементы
 const elements = {};
@@ -150,54 +152,62 @@ async function loadData() {
     console.log('Начинаем загрузку данных...');
     
     try {
+        // Каталог уже отрендерен сервером (/catalog): используем встроенные данные без запросов
+        if (window.__INITIAL_BOOKS__) {
+            books = window.__INITIAL_BOOKS__;
+            window.__INITIAL_BOOKS__ = null;
+            console.log(`Используем ${books.length} книг из серверного рендера`);
+            filteredBooks = [...books];
+            applySorting();
+            return;
+        }
+        
         // Показываем сообщение о загрузке
         showLoadingMessage();
         
-        // Загружаем книги
-        console.log('Загружаем книги с API...');
-        const booksResponse = await fetch('/books/');
-        
-        console.log('Ответ от /books/:', {
-            status: booksResponse.status,
-            statusText: booksResponse.statusText,
-            ok: booksResponse.ok
+        // Загружаем книги, авторов и жанры одним запросом
+        console.log('Загружаем книги, авторов и жанры с API...');
+        const batchResponse = await fetch('/batch/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                requests: [
+                    { path: '/books/' },
+                    { path: '/authors/' },
+                    { path: '/genres/' }
+                ]
+            })
         });
         
-        if (!booksResponse.ok) {
-            throw new Error(`Ошибка загрузки книг: ${booksResponse.status} ${booksResponse.statusText}`);
+        if (!batchResponse.ok) {
+            throw new Error(`Ошибка загрузки данных: ${batchResponse.status} ${batchResponse.statusText}`);
+        }
+        
+        const [booksResult, authorsResult, genresResult] = await batchResponse.json();
+        
+        if (booksResult.status !== 200) {
+            throw new Error(`Ошибка загрузки книг: ${booksResult.status}`);
         }
         
-        books = await booksResponse.json();
+        books = booksResult.body;
         console.log(`Загружено ${books.length} книг:`, books);
         
-        // Загружаем авторов
-        console.log('Загружаем авторов...');
         let authors = [];
-        try {
-            const authorsResponse = await fetch('/authors/');
-            if (authorsResponse.ok) {
-                authors = await authorsResponse.json();
-                console.log(`Загружено ${authors.length} авторов`);
-            } else {
-                console.warn('Не удалось загрузить авторов');
-            }
-        } catch (error) {
-            console.warn('Ошибка загрузки авторов:', error);
+        if (authorsResult.status === 200) {
+            authors = authorsResult.body;
+            console.log(`Загружено ${authors.length} авторов`);
+        } else {
+            console.warn('Не удалось загрузить авторов');
         }
         
-        // Загружаем жанры
-        console.log('Загружаем жанры...');
         let genres = [];
-        try {
-            const genresResponse = await fetch('/genres/');
-            if (genresResponse.ok) {
-                genres = await genresResponse.json();
-                console.log(`Загружено ${genres.length} жанров`);
-            } else {
-                console.warn('Не удалось загрузить жанры');
-            }
-        } catch (error) {
-            console.warn('Ошибка загрузки жанров:', error);
+        if (genresResult.status === 200) {
+            genres = genresResult.body;
+            console.log(`Загружено ${genres.length} жанров`);
+        } else {
+            console.warn('Не удалось загрузить жанры');
         }
         
         // Обогащаем книги данными авторов и жанров
@@ -502,20 +512,22 @@ function showRegister() {
     }
 }
 
-// ✅ ФУНКЦИЯ: Загрузка комментариев для книги
+// ✅ ФУНКЦИЯ: Загрузка комментариев для книги (первая страница, сначала новые)
 async function loadCommentsForBook(bookId) {
     try {
         console.log(`Загружаем комментарии для книги ${bookId}...`);
         
-        const response = await fetch(`/book-comments/by-book/${bookId}`);
+        const response = await fetch(`/book-comments/by-book/${bookId}/page?order=newest&limit=50`);
         
         if (!response.ok) {
             console.warn(`Ошибка загрузки комментариев: ${response.status}`);
             return [];
         }
         
-        const comments = await response.json();
-        console.log(`Загружено ${comments.length} комментариев для книги ${bookId}:`, comments);
+        const page = await response.json();
+        const comments = page.items;
+        comments.total = page.total;
+        console.log(`Загружено ${comments.length} из ${page.total} комментариев для книги ${bookId}:`, comments);
         
         return comments;
     } catch (error) {
@@ -581,9 +593,11 @@ async function submitModalComment() {
             elements.modalCommentInput.value = '';
         }
         
-        // Перезагружаем комментарии
-        const comments = await loadCommentsForBook(currentModalBook.id);
-        renderModalComments(comments);
+        // Новый комментарий придет через SSE; без подписки перезагружаем список
+        if (!commentsStream) {
+            modalComments = await loadCommentsForBook(currentModalBook.id);
+            renderModalComments(modalComments);
+        }
         
         if (window.showNotification) {
             window.showNotification('Комментарий добавлен!', 'success');
@@ -606,7 +620,7 @@ function renderModalComments(comments) {
     if (!elements.modalCommentsList) return;
     
     if (elements.modalCommentsCount) {
-        elements.modalCommentsCount.textContent = comments.length;
+        elements.modalCommentsCount.textContent = comments.total ?? comments.length;
     }
     
     if (!comments || comments.length === 0) {
@@ -628,6 +642,50 @@ function renderModalComments(comments) {
     `).join('');
 }
 
+// ✅ ФУНКЦИЯ: Подписка на новые комментарии книги через SSE
+function subscribeToComments(bookId) {
+    unsubscribeFromComments();
+    if (!window.EventSource) return;
+    
+    commentsStream = new EventSource(`/book-comments/by-book/${bookId}/stream`);
+    
+    commentsStream.addEventListener('created', (event) => {
+        const comment = JSON.parse(event.data);
+        if (modalComments.some(c => c.id === comment.id)) return;
+        modalComments.unshift(comment);
+        modalComments.total = (modalComments.total ?? modalComments.length - 1) + 1;
+        renderModalComments(modalComments);
+    });
+    
+    commentsStream.addEventListener('updated', (event) => {
+        const comment = JSON.parse(event.data);
+        const index = modalComments.findIndex(c => c.id === comment.id);
+        if (index !== -1) {
+            modalComments[index] = comment;
+            renderModalComments(modalComments);
+        }
+    });
+    
+    commentsStream.addEventListener('deleted', (event) => {
+        const comment = JSON.parse(event.data);
+        const index = modalComments.findIndex(c => c.id === comment.id);
+        if (index !== -1) {
+            modalComments.splice(index, 1);
+        }
+        if (modalComments.total) {
+            modalComments.total -= 1;
+        }
+        renderModalComments(modalComments);
+    });
+}
+
+function unsubscribeFromComments() {
+    if (commentsStream) {
+        commentsStream.close();
+        commentsStream = null;
+    }
+}
+
 // ✅ ВСПОМОГАТЕЛЬНАЯ ФУНКЦИЯ: Экранирование HTML
 function escapeHtml(text) {
     const map = {
@@ -670,9 +728,10 @@ async function openBookModal(book) {
         }
     }
     
-    // Загружаем и показываем комментарии
-    const comments = await loadCommentsForBook(book.id);
-    renderModalComments(comments);
+    // Загружаем и показываем комментарии, затем подписываемся на новые
+    modalComments = await loadCommentsForBook(book.id);
+    renderModalComments(modalComments);
+    subscribeToComments(book.id);
     
     // Настраиваем кнопку "Прочитано"
     if (elements.modalReadToggle && window.authSystem && window.authSystem.isAuthenticated()) {
@@ -699,6 +758,7 @@ function closeBookModal() {
     elements.bookModal.setAttribute('aria-hidden', 'true');
     document.body.style.overflow = 'auto';
     currentModalBook = null;
+    unsubscribeFromComments();
 }
 
 // ✅ ФУНКЦИЯ: Проверка статуса "Прочитано" для модального окна
@@ -865,7 +925,7 @@ function createBookElement(book) {
     genre.textContent = `Жанр: ${book.genre_name || 'Неизвестен'}`;
     
     // Бейдж с количеством комментариев
-    const commentCount = book.book_comments ? book.book_comments.length : 0;
+    const commentCount = book.comments_count ?? (book.comments ? book.comments.length : 0);
     badge.textContent = commentCount > 0 ? `💬 ${commentCount}` : '💬 0';
     
     // Настройка обработчиков событий
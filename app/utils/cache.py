@@ -0,0 +1,81 @@
+# app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+
+class DataVersion:
+    """
+    Счетчик версии данных. Сервисы увеличивают его при записи,
+    кэши используют текущее значение как часть ключа.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class FragmentCache:
+    """
+    Кэш отрендеренных фрагментов: на каждый ключ хранится одно значение
+    для последней версии данных. ttl ограничивает устаревание, когда данные
+    меняет другой процесс (версия у каждого процесса своя).
+
+    Не больше max_entries ключей: при вставке вытесняются давно не читанные
+    (LRU) и уже устаревшие по ttl записи из начала очереди.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (version, время рендера, значение), от давно не читанных к недавним
+        self._entries: OrderedDict[Hashable, Tuple[Hashable, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, version: Hashable, render: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version and now - entry[1] < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                del self._entries[key]
+        value = render()
+        with self._lock:
+            self._entries[key] = (version, now, value)
+            self._entries.move_to_end(key)
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if len(self._entries) <= self.max_entries and now - oldest[1] < self.ttl:
+                    break
+                self._entries.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Версия каталога: книги, авторы и жанры
+catalog_version = DataVersion()
+# Версия комментариев: меняется часто, поэтому отдельно от каталога
+# (поисковый индекс и статистика пользователей от нее не зависят)
+comments_version = DataVersion()
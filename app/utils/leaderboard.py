@@ -0,0 +1,93 @@
+# app/utils/leaderboard.py
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class SortedScores:
+    """
+    Таблица лидеров: счет по ключу и список (-счет, ключ), отсортированный по убыванию счета.
+    Изменение счета — два бинарных поиска, верхние N — срез списка.
+    """
+
+    def __init__(self, scores: Optional[Dict[Hashable, int]] = None):
+        self._scores: Dict[Hashable, int] = {}
+        self._order: List[Tuple[int, Hashable]] = []
+        if scores:
+            self._scores = {key: score for key, score in scores.items() if score > 0}
+            self._order = sorted((-score, key) for key, score in self._scores.items())
+
+    def add(self, key: Hashable, delta: int) -> None:
+        old = self._scores.get(key, 0)
+        new = old + delta
+        if old > 0:
+            del self._order[bisect_left(self._order, (-old, key))]
+        if new > 0:
+            self._scores[key] = new
+            insort(self._order, (-new, key))
+        else:
+            self._scores.pop(key, None)
+
+    def score(self, key: Hashable) -> int:
+        return self._scores.get(key, 0)
+
+    def top(self, limit: int) -> List[Tuple[Hashable, int]]:
+        return [(key, -negative) for negative, key in self._order[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class RollingCounters:
+    """
+    Счетчики событий по временным корзинам (по умолчанию часовым) и таблица лидеров
+    на каждое окно. Окна сдвигаются инкрементально: при переходе в новую корзину
+    из счетов окна вычитается только выпавшая корзина.
+    """
+
+    def __init__(self, windows: Dict[str, int], bucket_seconds: int = 3600):
+        # windows: имя окна -> длина окна в корзинах
+        self.windows = dict(windows)
+        self.bucket_seconds = bucket_seconds
+        self._span = max(self.windows.values())
+        self._buckets: Dict[int, Counter] = {}
+        self._boards = {name: SortedScores() for name in self.windows}
+        self._current: Optional[int] = None
+
+    def bucket_of(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def add(self, key: Hashable, timestamp: float, now: float, delta: int = 1) -> None:
+        self.advance(now)
+        bucket = self.bucket_of(timestamp)
+        age = self._current - bucket
+        if age < 0 or age >= self._span:
+            return
+        self._buckets.setdefault(bucket, Counter())[key] += delta
+        for name, length in self.windows.items():
+            if age < length:
+                self._boards[name].add(key, delta)
+
+    def advance(self, now: float) -> None:
+        """
+        Сдвинуть окна к корзине момента now, вычитая корзины, вышедшие за их границу.
+        """
+        current = self.bucket_of(now)
+        if self._current is None:
+            self._current = current
+            return
+        if current <= self._current:
+            return
+        for name, length in self.windows.items():
+            board = self._boards[name]
+            # Корзины (старое начало окна .. новое начало окна) выпадают из окна
+            for bucket in range(self._current - length + 1, min(current - length + 1, self._current + 1)):
+                for key, count in self._buckets.get(bucket, {}).items():
+                    board.add(key, -count)
+        self._current = current
+        for bucket in [bucket for bucket in self._buckets if bucket <= current - self._span]:
+            del self._buckets[bucket]
+
+    def top(self, window: str, limit: int, now: float) -> List[Tuple[Hashable, int]]:
+        self.advance(now)
+        return self._boards[window].top(limit)
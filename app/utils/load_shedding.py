@@ -0,0 +1,98 @@
+# app/utils/load_shedding.py
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class WindowedPercentile:
+    """
+    Процентиль измерений за последние window секунд (не больше max_samples последних).
+
+    Одиночный выброс не поднимает значение: пока измерений меньше min_samples,
+    значение 0, а процентиль ниже максимума требует нескольких высоких измерений.
+    Окно нужно, чтобы сигнал перегрузки снимался сам: пока запросы
+    отбрасываются, новых измерений ожидания пула может не быть вовсе.
+    """
+
+    def __init__(
+        self,
+        window: float = 5.0,
+        percentile: float = 0.75,
+        min_samples: int = 5,
+        max_samples: int = 200
+    ):
+        self.window = window
+        self.percentile = percentile
+        self.min_samples = min_samples
+        # (время, значение) от старых к новым
+        self._samples = deque(maxlen=max_samples)
+        # Вычисленное значение до следующего измерения или выхода измерения из окна
+        self._cached = None
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+            self._cached = None
+
+    def observe(self, value: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._samples.append((now, value))
+            self._cached = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._cached = None
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            self._expire(time.monotonic())
+            if self._cached is None:
+                if len(self._samples) < self.min_samples:
+                    self._cached = 0.0
+                else:
+                    values = sorted(value for _, value in self._samples)
+                    self._cached = values[math.ceil(self.percentile * len(values)) - 1]
+            return self._cached
+
+
+# Задержка цикла событий и ожидание соединения из пула, секунды
+loop_lag = WindowedPercentile()
+pool_wait = WindowedPercentile()
+
+
+async def monitor_loop_lag(interval: float = 0.1) -> None:
+    """
+    Фоновая задача: насколько позже запланированного просыпается sleep(interval).
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(0.0, loop.time() - started - interval))
+
+
+class _TimedPoolMixin:
+    # Время получения соединения (ожидание свободного или подключение нового) попадает в pool_wait
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(time.monotonic() - started)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
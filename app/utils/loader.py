@@ -0,0 +1,78 @@
+# app/utils/loader.py
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Deferred(Generic[K, V]):
+    """
+    Отложенный результат BatchLoader.load: значение читается при первом get().
+    """
+
+    __slots__ = ("_loader", "_key")
+
+    def __init__(self, loader: "BatchLoader[K, V]", key: K):
+        self._loader = loader
+        self._key = key
+
+    def get(self) -> Optional[V]:
+        return self._loader.get(self._key)
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Загрузчик в стиле DataLoader для синхронного кода.
+
+    load(key) только запоминает ключ; все ключи, накопленные до первого
+    обращения к любому результату, читаются одним вызовом batch_fn
+    (один запрос WHERE id IN (...)). Результаты, в том числе отсутствие
+    строки (None), кэшируются до clear(), поэтому повторный get того же
+    ключа запросов не делает.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[K]], Dict[K, V]]):
+        self._batch_fn = batch_fn
+        self._pending: Dict[K, None] = {}
+        self._cache: Dict[K, Optional[V]] = {}
+
+    def load(self, key: K) -> Deferred[K, V]:
+        if key not in self._cache:
+            self._pending[key] = None
+        return Deferred(self, key)
+
+    def get(self, key: K) -> Optional[V]:
+        if key not in self._cache:
+            self.load(key)
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        keys = list(keys)
+        for key in keys:
+            self.load(key)
+        self.dispatch()
+        return [self._cache[key] for key in keys]
+
+    def prime(self, key: K, value: V) -> None:
+        """
+        Положить в кэш значение, уже прочитанное другим запросом.
+        """
+        self._cache[key] = value
+        self._pending.pop(key, None)
+
+    def dispatch(self) -> None:
+        """
+        Прочитать все отложенные ключи одним вызовом batch_fn.
+        """
+        if not self._pending:
+            return
+        keys = list(self._pending)
+        self._pending.clear()
+        found = self._batch_fn(keys)
+        for key in keys:
+            self._cache[key] = found.get(key)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._cache.clear()
@@ -0,0 +1,23 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Закодировать позицию (created_at, id) в непрозрачный курсор.
+    """
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Раскодировать курсор, полученный из encode_cursor. Бросает ValueError для некорректного курсора.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (UnicodeDecodeError, ValueError) as ex:
+        raise ValueError(f"Invalid cursor: {cursor}") from ex
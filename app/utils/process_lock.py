@@ -0,0 +1,42 @@
+# app/utils/process_lock.py
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: один процесс, блокировка не нужна
+    fcntl = None
+
+
+class ProcessLock:
+    """
+    Блокировка на файле (fcntl.flock), которую держит один процесс машины.
+
+    acquire() не ждет: возвращает True, если блокировка уже у этого процесса
+    или только что взята. Держатель не отпускает ее до завершения; после его
+    падения блокировку возьмет следующий процесс, вызвавший acquire().
+    Файл открывается после fork, поэтому блокировка главного процесса
+    воркерам не наследуется.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        if fcntl is None:
+            return True
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                return True
+            lock_file = open(self.path, "a")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._file, self._pid = lock_file, os.getpid()
+            return True
@@ -0,0 +1,90 @@
+# app/utils/pubsub.py
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+
+class Subscription:
+    """
+    Подписка на тему с ограниченным буфером.
+
+    Если подписчик не успевает читать и буфер заполнен, подписка вытесняется:
+    буфер очищается, а читатель получает None и должен переподключиться.
+    """
+
+    def __init__(self, broker: "PubSub", topic: str, maxsize: int):
+        self.broker = broker
+        self.topic = topic
+        self.evicted = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Следующее событие; None при вытеснении. При таймауте бросает asyncio.TimeoutError.
+        """
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    def _offer(self, event: Any) -> None:
+        # Выполняется в цикле событий подписчика
+        if self.evicted:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.evicted = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            self.broker.unsubscribe(self)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class PubSub:
+    """
+    Внутрипроцессная шина событий. publish можно вызывать из любого потока.
+    """
+
+    def __init__(self, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, buffer_size: Optional[int] = None) -> Subscription:
+        """
+        Подписаться на тему. Вызывается из цикла событий.
+        """
+        subscription = Subscription(self, topic, buffer_size or self.buffer_size)
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def publish(self, topic: str, event: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+    def subscribers_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+
+events = PubSub()
@@ -0,0 +1,123 @@
+# app/utils/rate_limit.py
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryTokenBuckets:
+    """
+    Ведра токенов в памяти процесса: у каждого воркера свои, поэтому
+    при N воркерах клиент фактически получает до N-кратного лимита.
+
+    take() списывает cost токенов с ведра ключа и возвращает 0, если их хватило,
+    иначе - через сколько секунд они накопятся (ведро не меняется).
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (токены, время последнего пополнения)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        cost = min(cost, burst)
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = _refill(tokens, updated, now, rate, burst)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / rate
+            self._buckets[key] = (tokens - cost, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now, rate, burst)
+            return 0.0
+
+    def _prune(self, now: float, rate: float, burst: float) -> None:
+        # Полные ведра ничем не отличаются от отсутствующих
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if _refill(tokens, updated, now, rate, burst) < burst
+        }
+
+
+class SqliteTokenBuckets:
+    """
+    Ведра токенов в локальном файле SQLite, общие для всех воркеров одной машины.
+
+    Соединение открывается в каждом процессе при первом обращении (воркеры
+    создаются fork после импорта приложения). Если файл занят дольше
+    busy_timeout, запрос пропускается: ограничитель не должен сам становиться
+    причиной отказов.
+    """
+
+    # Раз в сколько списаний удалять строки полных ведер
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, busy_timeout: float = 0.05):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._connection = None
+        self._pid = None
+        self._takes = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        # Время стены, а не monotonic: значения сравниваются между процессами
+        now = time.time()
+        cost = min(cost, burst)
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    row = connection.execute(
+                        "SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)
+                    ).fetchone()
+                    tokens = _refill(*row, now, rate, burst) if row else burst
+                    retry_after = (cost - tokens) / rate if tokens < cost else 0.0
+                    connection.execute(
+                        "INSERT INTO token_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                        (key, tokens if retry_after else tokens - cost, now)
+                    )
+                    self._takes += 1
+                    if self._takes % self.PRUNE_EVERY == 0:
+                        # Ведро, не тронутое дольше burst / rate секунд, уже полное
+                        connection.execute("DELETE FROM token_buckets WHERE updated < ?", (now - burst / rate,))
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                logger.warning("Хранилище ограничителя запросов %s недоступно, запрос пропущен", self.path, exc_info=True)
+                return 0.0
+        return retry_after
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
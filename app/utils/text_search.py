@@ -0,0 +1,168 @@
+# app/utils/text_search.py
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+    "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+    "і": "i", "ї": "i", "є": "e", "ґ": "g",
+}
+_TRANSLATION = str.maketrans(_CYRILLIC_TO_LATIN)
+# Латинские варианты одного звука приводятся к тому, что дает транслитерация кириллицы
+_LATIN_VARIANTS = [("kh", "h"), ("ph", "f"), ("w", "v"), ("x", "ks"), ("j", "i"), ("y", "i")]
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Ключ для поиска: Unicode casefold, ё -> е, кириллица в латиницу и
+    выравнивание латинских вариантов, так что "Лев Толстой", "лев толстои"
+    и "Lev Tolstoy" дают одну строку "lev tolstoi".
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    text = text.translate(_TRANSLATION)
+    # Остальные диакритики (é, ü) - к базовой букве
+    text = "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+    for variant, canonical in _LATIN_VARIANTS:
+        text = text.replace(variant, canonical)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def title_key(text: str) -> str:
+    """
+    Ключ уникальности названия: только Unicode casefold, ё -> е и схлопнутые
+    пробелы. В отличие от normalize() не теряет букв ("Мать" и "Мат" различаются).
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    return " ".join(text.split())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """
+    Триграммы слов как в pg_trgm: слово дополняется двумя пробелами слева и одним справа.
+    """
+    result = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def edit_distance(left: str, right: str, limit: int) -> int:
+    """
+    Расстояние Левенштейна, если оно не больше limit, иначе limit + 1.
+    Считается только полоса шириной 2 * limit + 1 вокруг диагонали.
+    """
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    if len(left) > len(right):
+        left, right = right, left
+    over = limit + 1
+    previous = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, 1):
+        current = [over] * (len(right) + 1)
+        current[0] = i
+        for j in range(max(1, i - limit), min(len(right), i + limit) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (left_char != right[j - 1]),
+            )
+        if min(current) > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс триграмм: триграмма -> id документов.
+
+    Поиск считает долю триграмм запроса, найденных в документе (как word_similarity
+    в pg_trgm), поэтому опечатка в одной-двух буквах или часть слова все еще находит документ.
+    Обходятся только списки документов триграмм запроса, а не весь каталог.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[int, str]]):
+        self._size = 0
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, text in documents:
+            self._size += 1
+            for trigram in trigrams(normalize(text)):
+                self._postings[trigram].append(doc_id)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(self, query: str, threshold: float = 0.45) -> List[Tuple[int, float]]:
+        """
+        (doc_id, сходство 0..1) для документов с долей совпавших триграмм не ниже threshold.
+        Для коротких запросов нужно не меньше трех совпавших триграмм, иначе одно
+        общее начало слова уже дает половину совпадения.
+        """
+        query_trigrams = trigrams(normalize(query))
+        if not query_trigrams:
+            return []
+        hits = Counter()
+        for trigram in query_trigrams:
+            hits.update(self._postings.get(trigram, ()))
+        total = len(query_trigrams)
+        min_hits = max(math.ceil(threshold * total), min(total, 3))
+        return [(doc_id, count / total) for doc_id, count in hits.items() if count >= min_hits]
+
+
+class PrefixIndex:
+    """
+    Отсортированный массив нормализованных ключей для подсказок по префиксу.
+
+    Для каждой строки хранится ключ с начала и с каждого следующего слова
+    ("voina i mir", "i mir", "mir"), поэтому "мир" находит "Война и мир".
+    Поиск - бинарный поиск начала диапазона и просмотр не больше scan_limit ключей.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Hashable]], scan_limit: int = 200):
+        self.scan_limit = scan_limit
+        keys = []
+        for label, payload in entries:
+            words = normalize(label).split()
+            for position in range(len(words)):
+                keys.append((" ".join(words[position:]), position > 0, payload))
+        keys.sort(key=lambda item: item[0])
+        self._keys = [key for key, _, _ in keys]
+        self._entries = [(inner, payload) for _, inner, payload in keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Hashable]:
+        """
+        До limit значений, у которых ключ начинается с prefix: сначала совпадения
+        с начала строки, затем более короткие ключи.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        start = bisect_left(self._keys, key)
+        candidates = []
+        for position in range(start, min(start + self.scan_limit, len(self._keys))):
+            if not self._keys[position].startswith(key):
+                break
+            inner, payload = self._entries[position]
+            candidates.append((inner, len(self._keys[position]), position, payload))
+        candidates.sort()
+        result, seen = [], set()
+        for _, _, _, payload in candidates:
+            if payload not in seen:
+                seen.add(payload)
+                result.append(payload)
+                if len(result) == limit:
+                    break
+        return result
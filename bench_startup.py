@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Замер времени холодного старта: импорт main и время до первого ответа /health.
+
+    python bench_startup.py [--runs 5] [--api-only]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_response(env: dict, timeout: float = 30.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR, env=env
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("Сервер не ответил за отведенное время")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--api-only", action="store_true", help="Запуск с APP_API_ONLY=1")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.api_only:
+        env["APP_API_ONLY"] = "1"
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first_responses = [measure_first_response(env) for _ in range(args.runs)]
+
+    mode = "API only" if args.api_only else "полный"
+    print(f"Режим: {mode}, запусков: {args.runs}")
+    print(f"  import main:          медиана {statistics.median(imports) * 1000:.0f} мс")
+    print(f"  до первого ответа:    медиана {statistics.median(first_responses) * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
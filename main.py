@@ -1,10 +1,14 @@
+import asyncio
+import logging
 import os
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
-import uvicorn
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+# Роутеры и движки создаются при импорте: serve.py импортирует приложение в мастере
+# до fork, и воркеры получают готовые модули; соединения открывает только lifespan
 from app.api import (
     roles_router,
     users_router,
@@ -12,46 +16,162 @@ from app.api import (
     genres_router,
     authors_router,
     book_comments_router,
-    shelf_router
+    shelf_router,
+    batch_router,
+    analytics_router
 )
-from fastapi.middleware.cors import CORSMiddleware
-from app.admin import setup_admin
-from app.database.database import engine
+from app.database.database import SessionLocal, engine
+from app.database.async_db import async_engine
+from app.middleware import LoadSheddingMiddleware, RateLimitMiddleware
+from app.services.analytics import ANALYTICS_REFRESH_SECONDS, refresh_analytics
+from app.services.archive import ARCHIVE_INTERVAL_SECONDS, archive_old_rows
+from app.services.comment_queue import comment_queue
+from app.services.rankings import (
+    RANKINGS_COMPACT_SECONDS,
+    RANKINGS_REFRESH_SECONDS,
+    compact_rankings,
+    load_rankings,
+    refresh_rankings,
+)
+from app.services.recommendations import SIMILARITY_REBUILD_SECONDS, rebuild_similarities
+from app.utils.load_shedding import monitor_loop_lag
+from app.utils.process_lock import ProcessLock
+
+# Режим только API: без админ-панели, шаблонов и статики (SQLAdmin и Jinja2 не импортируются)
+API_ONLY = os.getenv("APP_API_ONLY", "").lower() in ("1", "true", "yes")
+
+# Источники, которым разрешены запросы из браузера (CORS), через запятую
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+    if origin.strip()
+]
+
+# Тяжелые общие задачи (аналитика, архив, первичный расчет соседей книг) выполняет
+# один процесс машины - тот, что держит блокировку на этом файле
+BACKGROUND_JOBS_LOCK = os.getenv("BACKGROUND_JOBS_LOCK", "./background-jobs.lock")
+
+BASE_DIR = Path(__file__).resolve().parent
+TEMPLATES_DIR = os.path.join(BASE_DIR, "app", "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "app", "static")
+
+logger = logging.getLogger(__name__)
+
+job_runner = ProcessLock(BACKGROUND_JOBS_LOCK)
+
+
+def _warm_sync_pool():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _run_periodically(interval: float, job, *args, delay_first: bool = True, shared: bool = False):
+    # Задачи воркера (shared=False) обслуживают его собственные структуры: рейтинги в памяти
+    # и соседей книг, затронутых его записями. Общие задачи (shared=True) выполняются только
+    # в процессе, взявшем job_runner; если он упадет, блокировку возьмет другой воркер
+    if delay_first:
+        await asyncio.sleep(interval)
+    while True:
+        if not shared or job_runner.acquire():
+            try:
+                await run_in_threadpool(job, *args)
+            except Exception:
+                logger.exception("Фоновая задача %s завершилась с ошибкой", job.__name__)
+        await asyncio.sleep(interval)
+
+
+def _rebuild_similarities():
+    # Первичный полный пересчет соседей (пустая таблица) - только в процессе общих задач
+    return rebuild_similarities(SessionLocal, initial_build=job_runner.acquire())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Открываем соединения заранее, чтобы первый запрос не платил за подключение
+    await run_in_threadpool(_warm_sync_pool)
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    await run_in_threadpool(load_rankings, SessionLocal)
+    background_tasks = [
+        asyncio.create_task(monitor_loop_lag()),
+        asyncio.create_task(_run_periodically(RANKINGS_REFRESH_SECONDS, refresh_rankings, SessionLocal)),
+        asyncio.create_task(_run_periodically(SIMILARITY_REBUILD_SECONDS, _rebuild_similarities, delay_first=False)),
+        asyncio.create_task(_run_periodically(RANKINGS_COMPACT_SECONDS, compact_rankings, SessionLocal, shared=True)),
+    ]
+    if ANALYTICS_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            _run_periodically(ANALYTICS_REFRESH_SECONDS, refresh_analytics, SessionLocal, delay_first=False, shared=True)
+        ))
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            _run_periodically(ARCHIVE_INTERVAL_SECONDS, archive_old_rows, SessionLocal, shared=True)
+        ))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+
+    # Дописываем принятые, но еще не сохраненные комментарии перед остановкой
+    await run_in_threadpool(comment_queue.drain)
+    await async_engine.dispose()
+    engine.dispose()
+
 
 app = FastAPI(
     title="Library Management API",
     description="API для управления библиотекой книг",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Ограничение запросов и сброс нагрузки; CORS добавляется последним (внешним),
+# чтобы ответы 429 и 503 тоже получали CORS-заголовки
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+
 # Добавляем CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Разрешаем все origins для разработки
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-BASE_DIR = Path(__file__).resolve().parent
-TEMPLATES_DIR = os.path.join(BASE_DIR, "app", "templates")
-STATIC_DIR = os.path.join(BASE_DIR, "app", "static")
+templates = None
+if not API_ONLY:
+    from fastapi.responses import HTMLResponse
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.templating import Jinja2Templates
+    from sqlalchemy.orm import Session
+    from fastapi import Depends
+    from app.admin import setup_admin
+    from app.database.database import get_db
+    from app.services.catalog import CatalogService
 
-# СОЗДАЕМ ПАПКИ, ЕСЛИ ОНИ НЕ СУЩЕСТВУЮТ
-os.makedirs(TEMPLATES_DIR, exist_ok=True)
-os.makedirs(STATIC_DIR, exist_ok=True)
+    # Монтируем статические файлы по пути /app/static
+    app.mount("/app/static", StaticFiles(directory=STATIC_DIR), name="static")
+    templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
-# Монтируем статические файлы по пути /app/static
-app.mount("/app/static", StaticFiles(directory=STATIC_DIR), name="static")
-templates = Jinja2Templates(directory=TEMPLATES_DIR)
+    # ========== Инициализация SQLAdmin ==========
+    setup_admin(app, async_engine)
+    # ============================================
 
-# ========== Инициализация SQLAdmin ==========
-setup_admin(app, engine)
-# ============================================
+    @app.get("/", response_class=HTMLResponse)
+    async def read_root(request: Request):
+        return templates.TemplateResponse("index.html", {"request": request})
 
-@app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    @app.get("/catalog", response_class=HTMLResponse)
+    def read_catalog(request: Request, db: Session = Depends(get_db)):
+        """
+        Каталог, отрендеренный на сервере: первая страница сетки и данные для app.js в одном ответе.
+        """
+        book_grid, initial_books = CatalogService(db, templates.env).get_page_context()
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "book_grid": book_grid, "initial_books": initial_books}
+        )
 
 # Подключаем роутеры
 app.include_router(roles_router)
@@ -61,6 +181,8 @@ app.include_router(genres_router)
 app.include_router(authors_router)
 app.include_router(book_comments_router)
 app.include_router(shelf_router)
+app.include_router(batch_router)
+app.include_router(analytics_router)
 
 
 @app.get("/health")
@@ -68,4 +190,5 @@ def health_check():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", reload=True)
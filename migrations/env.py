@@ -12,10 +12,19 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Импортируем модели из вашего проекта
 from app.database.database import Base
+from app.models.analytics import (
+    AnalyticsStateModel,
+    AuthorStatsModel,
+    DailyActivityModel,
+    GenreStatsModel,
+)
+from app.models.archive import BookCommentArchiveModel, ShelfArchiveModel
 from app.models.authors import AuthorsModel
 from app.models.book_comments import BookCommentsModel
+from app.models.book_similarities import BookSimilarityModel
 from app.models.books import BooksModel
 from app.models.gengres import GengresModel
+from app.models.rankings import BookRankingEventModel, BookRankingTotalModel
 from app.models.roles import RoleModel
 from app.models.shelf import ShelfModel
 from app.models.users import UserModel
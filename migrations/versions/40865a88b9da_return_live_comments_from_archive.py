@@ -0,0 +1,36 @@
+"""Return live comments from archive
+
+Revision ID: 40865a88b9da
+Revises: d8bf6eae79fc
+Create Date: 2026-10-19 17:56:32.858501
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40865a88b9da'
+down_revision: Union[str, Sequence[str], None] = 'd8bf6eae79fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Архив хранит только удаленные комментарии: действующие, перенесенные туда
+    # раньше по возрасту, возвращаются в ленту (в comments_count книг они уже учтены)
+    op.execute(
+        "INSERT INTO book_comments (id, book_id, user_id, comment_text, created_at, deleted_at) "
+        "SELECT id, book_id, user_id, comment_text, created_at, deleted_at "
+        "FROM book_comments_archive WHERE deleted_at IS NULL"
+    )
+    op.execute("DELETE FROM book_comments_archive WHERE deleted_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Комментарии остаются в ленте: возраст больше не причина для архивации
+    pass
@@ -0,0 +1,66 @@
+"""Books strict title key
+
+Revision ID: 428855a66942
+Revises: b1ba5896eead
+Create Date: 2026-10-19 18:03:23.572419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text_search import normalize, title_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = '428855a66942'
+down_revision: Union[str, Sequence[str], None] = 'b1ba5896eead'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_books = sa.table(
+    'books',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('author_id', sa.Integer),
+    sa.column('normalized_title', sa.Text),
+    sa.column('title_key', sa.Text),
+)
+
+
+def _fill(column: str, make_key, unique: bool) -> None:
+    connection = op.get_bind()
+    seen = set()
+    for book_id, title, author_id in connection.execute(
+        sa.select(_books.c.id, _books.c.title, _books.c.author_id).order_by(_books.c.id)
+    ):
+        key = make_key(title or "")
+        if unique and (key, author_id) in seen:
+            # Уже существующие дубликаты не удаляются: ключ делается уникальным по id
+            key = f"{key} #{book_id}"
+        seen.add((key, author_id))
+        connection.execute(_books.update().where(_books.c.id == book_id).values({column: key}))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('uq_books_normalized_title_author', table_name='books')
+    op.add_column('books', sa.Column('title_key', sa.Text(), nullable=True))
+    _fill('title_key', title_key, unique=True)
+    # Нечеткий ключ больше не уникален: убираем суффиксы " #id", добавленные для дубликатов
+    _fill('normalized_title', normalize, unique=False)
+
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.alter_column('title_key', existing_type=sa.Text(), nullable=False)
+    op.create_index('uq_books_title_key_author', 'books', ['title_key', 'author_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_books_title_key_author', table_name='books')
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.drop_column('title_key')
+    _fill('normalized_title', normalize, unique=True)
+    op.create_index('uq_books_normalized_title_author', 'books', ['normalized_title', 'author_id'], unique=True)
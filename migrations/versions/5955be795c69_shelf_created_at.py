@@ -0,0 +1,31 @@
+"""Shelf entry creation time for trending rankings
+
+Revision ID: 5955be795c69
+Revises: e27a8c4d1f60
+Create Date: 2026-10-19 17:15:48.332984
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5955be795c69'
+down_revision: Union[str, Sequence[str], None] = 'e27a8c4d1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shelf', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_shelf_created_at'), 'shelf', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_shelf_created_at'), table_name='shelf')
+    with op.batch_alter_table('shelf') as batch_op:
+        batch_op.drop_column('created_at')
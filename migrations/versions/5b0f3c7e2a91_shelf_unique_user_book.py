@@ -0,0 +1,33 @@
+"""Shelf unique (user_id, book_id)
+
+Revision ID: 5b0f3c7e2a91
+Revises: c862deac3d20
+Create Date: 2026-10-19 10:12:31.482117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0f3c7e2a91'
+down_revision: Union[str, Sequence[str], None] = 'c862deac3d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Удаляем дубликаты, оставляя самую раннюю запись для каждой пары
+    op.execute(
+        "DELETE FROM shelf WHERE id NOT IN "
+        "(SELECT MIN(id) FROM shelf GROUP BY user_id, book_id)"
+    )
+    op.create_index('uq_shelf_user_book', 'shelf', ['user_id', 'book_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_shelf_user_book', table_name='shelf')
@@ -0,0 +1,50 @@
+"""Autoincrement ids for archived tables
+
+Revision ID: 71bbb014d3d7
+Revises: 4656f353fd70
+Create Date: 2026-10-19 17:59:00.120802
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71bbb014d3d7'
+down_revision: Union[str, Sequence[str], None] = '4656f353fd70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Горячие таблицы, строки которых переносятся в архив под теми же id
+_TABLES = [("book_comments", "book_comments_archive"), ("shelf", "shelf_archive")]
+
+
+def _rebuild(autoincrement: bool) -> None:
+    for table, _ in _TABLES:
+        with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL не переиспользует значения последовательностей, менять нечего
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild(True)
+    # Счетчик начинается после максимального id, в том числе уже перенесенного в архив
+    for table, archive in _TABLES:
+        op.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = :table").bindparams(table=table))
+        op.execute(sa.text(
+            "INSERT INTO sqlite_sequence (name, seq) "
+            f"SELECT :table, COALESCE(MAX(id), 0) FROM (SELECT id FROM {table} UNION ALL SELECT id FROM {archive})"
+        ).bindparams(table=table))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild(False)
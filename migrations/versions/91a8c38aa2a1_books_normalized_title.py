@@ -0,0 +1,55 @@
+"""Normalized book title key with a unique index per author
+
+Revision ID: 91a8c38aa2a1
+Revises: 32b08e736d35
+Create Date: 2026-10-19 17:26:30.451920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text_search import normalize
+
+
+# revision identifiers, used by Alembic.
+revision: str = '91a8c38aa2a1'
+down_revision: Union[str, Sequence[str], None] = '32b08e736d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('normalized_title', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    books = sa.table(
+        'books',
+        sa.column('id', sa.Integer),
+        sa.column('title', sa.String),
+        sa.column('author_id', sa.Integer),
+        sa.column('normalized_title', sa.Text),
+    )
+    seen = set()
+    for book_id, title, author_id in connection.execute(
+        sa.select(books.c.id, books.c.title, books.c.author_id).order_by(books.c.id)
+    ):
+        key = normalize(title or "")
+        if (key, author_id) in seen:
+            # Уже существующие дубликаты не удаляются: ключ делается уникальным по id
+            key = f"{key} #{book_id}"
+        seen.add((key, author_id))
+        connection.execute(books.update().where(books.c.id == book_id).values(normalized_title=key))
+
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.alter_column('normalized_title', existing_type=sa.Text(), nullable=False)
+    op.create_index('uq_books_normalized_title_author', 'books', ['normalized_title', 'author_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_books_normalized_title_author', table_name='books')
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.drop_column('normalized_title')
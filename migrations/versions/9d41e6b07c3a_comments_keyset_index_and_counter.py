@@ -0,0 +1,37 @@
+"""Comments keyset index and books.comments_count
+
+Revision ID: 9d41e6b07c3a
+Revises: 5b0f3c7e2a91
+Create Date: 2026-10-19 11:03:54.217690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41e6b07c3a'
+down_revision: Union[str, Sequence[str], None] = '5b0f3c7e2a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE books SET comments_count = "
+        "(SELECT COUNT(*) FROM book_comments WHERE book_comments.book_id = books.id)"
+    )
+    op.create_index(
+        'ix_book_comments_book_created', 'book_comments', ['book_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_comments_book_created', table_name='book_comments')
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.drop_column('comments_count')
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Production-запуск: несколько процессов uvicorn на одном сокете.
+
+Приложение импортируется в главном процессе до fork, поэтому воркеры стартуют
+без повторного импорта. Пулы соединений сбрасываются в каждом воркере после fork
+(см. app/database). По SIGTERM/SIGINT воркеры перестают принимать соединения,
+дожидаются завершения текущих запросов и выполняют lifespan shutdown
+(в том числе дописывают очередь комментариев). Упавший воркер перезапускается
+с растущей задержкой, если воркеры падают сразу после старта; после --max-restarts
+таких падений подряд сервер останавливается с кодом 1.
+
+    python serve.py --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+# Перезапуск упавших воркеров: пока воркеры падают раньше чем через RESTART_MIN_UPTIME
+# секунд после старта, задержка перед перезапуском удваивается (до RESTART_BACKOFF_MAX);
+# после воркера, проработавшего дольше, перезапуск снова немедленный
+RESTART_MIN_UPTIME = 10.0
+RESTART_BACKOFF_INITIAL = 0.5
+RESTART_BACKOFF_MAX = 30.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Production-запуск Library Management API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+        help="Количество воркеров (по умолчанию - число ядер)"
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=30,
+        help="Сколько секунд ждать завершения текущих запросов при остановке"
+    )
+    parser.add_argument(
+        "--max-restarts", type=int, default=int(os.getenv("MAX_WORKER_RESTARTS", "10")),
+        help="Сколько раз подряд перезапускать воркеры, падающие сразу после старта (0 - без ограничения)"
+    )
+    # auto выбирает uvloop и httptools, если они установлены
+    parser.add_argument("--loop", default="auto", choices=["auto", "asyncio", "uvloop"])
+    parser.add_argument("--http", default="auto", choices=["auto", "h11", "httptools"])
+    args = parser.parse_args()
+    if args.workers <= 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args) -> None:
+    config = uvicorn.Config(
+        app,
+        loop=args.loop,
+        http=args.http,
+        lifespan="on",
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def spawn(app, sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        # Воркер: обработчики сигналов главного процесса не нужны, uvicorn ставит свои
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            run_worker(app, sock, args)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def restart_delay(fast_crashes: int) -> float:
+    if fast_crashes == 0:
+        return 0.0
+    return min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_INITIAL * 2 ** (fast_crashes - 1))
+
+
+def main():
+    args = parse_args()
+
+    # Предзагрузка приложения до fork
+    from main import app
+    from app.services.comment_queue import COMMENT_INGEST_MODE
+
+    if COMMENT_INGEST_MODE == "write_behind" and args.workers > 1:
+        # Очередь и статусы временных id живут в памяти воркера, принявшего комментарий
+        print(
+            "COMMENT_INGEST_MODE=write_behind работает только с одним воркером (--workers 1)",
+            file=sys.stderr
+        )
+        sys.exit(2)
+
+    sock = bind_socket(args.host, args.port)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # pid -> время запуска
+    workers = {spawn(app, sock, args): time.monotonic() for _ in range(args.workers)}
+    print(f"Запущено {len(workers)} воркеров на http://{args.host}:{args.port} (pid {os.getpid()})")
+
+    # Моменты запланированных перезапусков и число падений подряд сразу после старта
+    restarts = []
+    fast_crashes = 0
+    exit_code = 0
+    while not stopping:
+        now = time.monotonic()
+        while restarts and restarts[0] <= now:
+            restarts.pop(0)
+            workers[spawn(app, sock, args)] = time.monotonic()
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            if not restarts:
+                break
+            pid = 0
+        if pid == 0:
+            time.sleep(0.5)
+            continue
+        started = workers.pop(pid, now)
+        if stopping:
+            break
+        fast_crashes = fast_crashes + 1 if now - started < RESTART_MIN_UPTIME else 0
+        if args.max_restarts and fast_crashes > args.max_restarts:
+            print(
+                f"Воркеры падают сразу после старта (падений подряд: {fast_crashes}), остановка",
+                file=sys.stderr
+            )
+            exit_code = 1
+            break
+        delay = restart_delay(fast_crashes)
+        print(f"Воркер {pid} завершился (status {status}), перезапуск через {delay:.1f} с", file=sys.stderr)
+        restarts.append(now + delay)
+        restarts.sort()
+
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in workers:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
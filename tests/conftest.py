@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Приложение читает настройки при импорте: тесты работают с копией foliant.db,
+# фоновые задачи (lifespan) не запускаются - TestClient создается без with
+_DB_DIR = tempfile.mkdtemp(prefix="foliant-tests-")
+_DB_PATH = Path(_DB_DIR) / "foliant.db"
+shutil.copy(Path(__file__).resolve().parent.parent / "foliant.db", _DB_PATH)
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("ARCHIVE_INTERVAL_SECONDS", "0")
+# Ограничитель запросов проверяется отдельно (tests/test_rate_limit.py)
+os.environ.setdefault("RATE_LIMIT_RATE", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database.database import engine
+from main import app
+
+
+class StatementLog:
+    """
+    SQL-запросы и commit, выполненные синхронным движком внутри блока with.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        self.statements.clear()
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+        event.remove(engine, "commit", self._on_commit)
+
+    def count(self, verb: str) -> int:
+        return sum(1 for statement in self.statements if statement.lstrip().upper().startswith(verb))
+
+
+@pytest.fixture(scope="session")
+def client():
+    yield TestClient(app)
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def sql():
+    return StatementLog()
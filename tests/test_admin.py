@@ -0,0 +1,69 @@
+"""
+Админка: удаление мягкое и идет через сервисы, как в API.
+"""
+import re
+
+from sqlalchemy import select
+
+from app import admin
+from app.database.database import SessionLocal
+from app.models.book_comments import BookCommentsModel
+from app.models.shelf import ShelfModel
+
+
+def _deleted_at(model, id: int):
+    db = SessionLocal()
+    try:
+        return db.scalar(select(model.deleted_at).where(model.id == id).execution_options(include_deleted=True))
+    finally:
+        db.close()
+
+
+def test_admin_delete_comment_is_soft(client):
+    total = client.get("/book-comments/by-book/2/page").json()["total"]
+    comment = client.post("/book-comments/", json={"book_id": 2, "user_id": 1, "comment_text": "из админки"}).json()
+
+    response = client.delete(f"/admin/book-comments-model/delete?pks={comment['id']}")
+
+    assert response.status_code == 200
+    assert _deleted_at(BookCommentsModel, comment["id"]) is not None
+    assert client.get("/book-comments/by-book/2/page").json()["total"] == total
+
+
+def test_admin_delete_shelf_entry_is_soft(client):
+    entry = client.post("/shelf/", json={"user_id": 2, "book_id": 3}).json()
+
+    response = client.delete(f"/admin/shelf-model/delete?pks={entry['id']}")
+
+    assert response.status_code == 200
+    assert _deleted_at(ShelfModel, entry["id"]) is not None
+    assert client.get(f"/shelf/{entry['id']}").status_code == 404
+
+
+def test_admin_cannot_move_comment_between_books(client):
+    comment = client.post("/book-comments/", json={"book_id": 2, "user_id": 1, "comment_text": "правка"}).json()
+
+    assert client.get("/admin/book-comments-model/create").status_code == 403
+    response = client.post(
+        f"/admin/book-comments-model/edit/{comment['id']}",
+        data={"comment_text": "исправлено", "book_id": "1"},
+        follow_redirects=False
+    )
+
+    assert response.status_code == 302
+    updated = client.get(f"/book-comments/{comment['id']}").json()
+    assert (updated["book_id"], updated["comment_text"]) == (2, "исправлено")
+
+
+def _admin_total(client, path: str) -> int:
+    admin._count_cache.clear()
+    return int(re.search(r"of <span>(\d+)", client.get(f"/admin/{path}/list").text).group(1))
+
+
+def test_admin_count_excludes_soft_deleted_rows(client):
+    before = _admin_total(client, "shelf-model")
+    entry = client.post("/shelf/", json={"user_id": 2, "book_id": 4}).json()
+    assert _admin_total(client, "shelf-model") == before + 1
+
+    client.delete(f"/shelf/{entry['id']}")
+    assert _admin_total(client, "shelf-model") == before
@@ -0,0 +1,69 @@
+"""
+Дневная активность: удаленные и перенесенные в архив строки остаются в истории дня.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text, update
+
+from app.database.database import SessionLocal
+from app.models.book_comments import BookCommentsModel
+from app.repositories.analytics import AnalyticsRepository
+from app.services.analytics import AnalyticsService
+from app.services.archive import ArchiveService
+
+
+def _comments_today() -> int:
+    today = datetime.now(timezone.utc).date()
+    db = SessionLocal()
+    try:
+        repository = AnalyticsRepository(db)
+        repository.replace_daily_activity(today, today, repository.get_daily_activity_rows(today, today))
+        db.commit()
+        days = {row.day: row.comments_count for row in AnalyticsService(db).get_daily_activity(days=1)}
+        return days.get(today, 0)
+    finally:
+        db.close()
+
+
+def test_deleted_and_archived_comments_stay_counted(client):
+    before = _comments_today()
+    kept, deleted, archived = [
+        client.post("/book-comments/", json={"book_id": 1, "user_id": 1, "comment_text": text}).json()["id"]
+        for text in ("остается", "удален", "в архиве")
+    ]
+    client.delete(f"/book-comments/{deleted}")
+    client.delete(f"/book-comments/{archived}")
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(BookCommentsModel)
+            .where(BookCommentsModel.id == archived)
+            .values(deleted_at=datetime.utcnow() - timedelta(days=30))
+            .execution_options(include_deleted=True)
+        )
+        db.commit()
+        ArchiveService(db).run()
+    finally:
+        db.close()
+
+    assert _comments_today() == before + 3
+
+
+def test_refresh_reads_before_writing(client, sql):
+    client.post("/shelf/", json={"user_id": 1, "book_id": 2})
+    db = SessionLocal()
+    try:
+        with sql:
+            AnalyticsService(db).refresh()
+        verbs = [statement.lstrip().split()[0].upper() for statement in sql.statements]
+        first_write = min(verbs.index(verb) for verb in ("DELETE", "INSERT") if verb in verbs)
+        assert "SELECT" not in verbs[first_write:]
+
+        stats = {row.genre_id: row for row in AnalyticsService(db).get_genre_stats()}
+        genre_id, shelved = db.execute(text(
+            "SELECT b.genre_id, COUNT(*) FROM shelf s JOIN books b ON b.id = s.book_id "
+            "WHERE s.deleted_at IS NULL AND b.id = 2 GROUP BY b.genre_id"
+        )).one()
+        assert stats[genre_id].shelved_count >= shelved
+    finally:
+        db.close()
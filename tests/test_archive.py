@@ -0,0 +1,87 @@
+"""
+Архивация: в архив уходят только давно удаленные строки.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.database.database import SessionLocal
+from app.models.archive import BookCommentArchiveModel
+from app.models.book_comments import BookCommentsModel
+from app.services.archive import ArchiveService
+
+
+def _age_comment(comment_id: int, **columns) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(BookCommentsModel)
+            .where(BookCommentsModel.id == comment_id)
+            .values(**columns)
+            .execution_options(include_deleted=True)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _archive() -> None:
+    db = SessionLocal()
+    try:
+        ArchiveService(db).run()
+    finally:
+        db.close()
+
+
+def _archived_ids() -> set:
+    db = SessionLocal()
+    try:
+        return set(db.scalars(select(BookCommentArchiveModel.id)))
+    finally:
+        db.close()
+
+
+def test_old_live_comment_stays_editable(client):
+    comment = client.post("/book-comments/", json={"book_id": 1, "user_id": 1, "comment_text": "старый"}).json()
+    _age_comment(comment["id"], created_at=datetime.utcnow() - timedelta(days=3 * 365))
+    count_before = client.get("/book-comments/by-book/1/page").json()["total"]
+
+    _archive()
+
+    assert comment["id"] not in _archived_ids()
+    assert client.put(f"/book-comments/{comment['id']}", json={"comment_text": "новый"}).status_code == 200
+    assert client.delete(f"/book-comments/{comment['id']}").status_code == 200
+    assert client.get("/book-comments/by-book/1/page").json()["total"] == count_before - 1
+
+
+def test_deleted_comment_is_archived(client):
+    comment = client.post("/book-comments/", json={"book_id": 1, "user_id": 1, "comment_text": "удаленный"}).json()
+    client.delete(f"/book-comments/{comment['id']}")
+    _age_comment(comment["id"], deleted_at=datetime.utcnow() - timedelta(days=30))
+
+    _archive()
+
+    assert comment["id"] in _archived_ids()
+
+
+def test_archive_skips_rows_moved_by_another_worker(client):
+    comment = client.post("/book-comments/", json={"book_id": 1, "user_id": 1, "comment_text": "дважды"}).json()
+    client.delete(f"/book-comments/{comment['id']}")
+    _age_comment(comment["id"], deleted_at=datetime.utcnow() - timedelta(days=30))
+    # Другой воркер успел вставить строку в архив, но еще не удалил ее из горячей таблицы
+    db = SessionLocal()
+    try:
+        row = db.get(BookCommentsModel, comment["id"], execution_options={"include_deleted": True})
+        db.add(BookCommentArchiveModel(
+            id=row.id, book_id=row.book_id, user_id=row.user_id, comment_text=row.comment_text,
+            created_at=row.created_at, deleted_at=row.deleted_at, archived_at=datetime.utcnow()
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    _archive()
+
+    assert comment["id"] in _archived_ids()
+    next_comment = client.post("/book-comments/", json={"book_id": 1, "user_id": 1, "comment_text": "новый id"}).json()
+    assert next_comment["id"] > comment["id"]
@@ -0,0 +1,17 @@
+"""
+Пакетные GET-запросы: ошибка одного подзапроса не влияет на остальные.
+"""
+from app.services.gengres import GenreService
+
+
+def test_failing_sub_request_is_isolated(client, monkeypatch):
+    def fail(self, genre_id):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(GenreService, "get_genre", fail)
+    response = client.post("/batch/", json={"requests": [{"path": "/genres/1"}, {"path": "/books/1"}]})
+
+    assert response.status_code == 200
+    failed, book = response.json()
+    assert failed["status"] == 500
+    assert book["status"] == 200 and book["body"]["id"] == 1
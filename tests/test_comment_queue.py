@@ -0,0 +1,30 @@
+"""
+Очередь отложенной записи комментариев: статусы временных id и запись пакета.
+"""
+from datetime import datetime
+
+from app.database.database import SessionLocal
+from app.services.comment_queue import CommentIngestQueue
+
+
+def _row(comment_text):
+    return {"book_id": 1, "user_id": 1, "comment_text": comment_text, "created_at": datetime.utcnow()}
+
+
+def test_unknown_queued_comment_is_404(client):
+    assert client.get("/book-comments/queued/unknown").status_code == 404
+
+
+def test_bad_row_fails_alone():
+    queue = CommentIngestQueue(SessionLocal)
+    batch = [("good-1", _row("первый")), ("bad", _row(None)), ("good-2", _row("второй"))]
+    queue._pending.update(provisional_id for provisional_id, _ in batch)
+    assert queue.status("bad") == ("pending", None)
+
+    queue._flush(batch)
+
+    assert queue.status("bad") == ("failed", None)
+    for provisional_id in ("good-1", "good-2"):
+        queued_status, comment_id = queue.status(provisional_id)
+        assert queued_status == "stored" and comment_id is not None
+    assert queue.status("unknown") is None
@@ -0,0 +1,49 @@
+"""
+Загрузчики на время запроса: один IN-запрос на тип, повторные get без SQL.
+"""
+from app.database.database import SessionLocal
+from app.services.loaders import get_loaders
+from app.utils.loader import BatchLoader
+
+
+def test_batch_loader_coalesces_keys():
+    calls = []
+
+    def batch(keys):
+        calls.append(sorted(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(batch)
+    first, second, missing = loader.load(1), loader.load(2), loader.load(3)
+    assert calls == []
+    assert (first.get(), second.get(), missing.get()) == (10, 20, None)
+    assert loader.load_many([2, 1, 3]) == [20, 10, None]
+    assert calls == [[1, 2, 3]]
+
+
+def test_books_with_names(sql):
+    db = SessionLocal()
+    try:
+        loaders = get_loaders(db)
+        assert get_loaders(db) is loaders
+        with sql:
+            books = loaders.books_with_names([1, 2, 3])
+            names = [(book.author.name, book.genre.name) for book in books.values()]
+        # Книги, авторы, жанры; связи берутся из identity map без запросов на книгу
+        assert len(sql.statements) == 3
+        assert all(statement.count(" IN (") == 1 for statement in sql.statements)
+        assert len(names) == 3
+        with sql:
+            loaders.authors.get(books[1].author_id)
+            loaders.books_with_names([1, 2])
+        assert sql.statements == []
+    finally:
+        db.close()
+
+
+def test_get_author_repeated(client, sql):
+    author_id = client.post("/authors/", json={"name": "Автор загрузчика"}).json()["id"]
+    with sql:
+        response = client.get(f"/authors/{author_id}")
+    assert response.status_code == 200
+    assert len(sql.statements) == 1
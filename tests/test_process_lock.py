@@ -0,0 +1,29 @@
+"""
+Блокировка процесса фоновых задач: держит один процесс, после его выхода - следующий.
+"""
+import multiprocessing
+
+from app.utils.process_lock import ProcessLock
+
+
+def _try_acquire(path, result):
+    result.put(ProcessLock(path).acquire())
+
+
+def _acquire_in_child(path) -> bool:
+    context = multiprocessing.get_context("fork")
+    result = context.Queue()
+    process = context.Process(target=_try_acquire, args=(path, result))
+    process.start()
+    process.join()
+    return result.get()
+
+
+def test_single_holder(tmp_path):
+    path = str(tmp_path / "jobs.lock")
+    # Пока блокировку держит другой процесс, этот ее не получает
+    assert _acquire_in_child(path) is True
+    lock = ProcessLock(path)
+    assert lock.acquire() is True
+    assert lock.acquire() is True
+    assert _acquire_in_child(path) is False
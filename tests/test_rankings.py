@@ -0,0 +1,90 @@
+"""
+Рейтинги книг: журнал событий пишется в транзакциях записей, воркеры дочитывают его по id.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from app.database.database import SessionLocal
+from app.repositories.rankings import RankingRepository
+from app.services.rankings import book_rankings, compact_rankings, load_rankings, refresh_rankings
+
+
+def _create_book(client) -> int:
+    author_id = client.post("/authors/", json={"name": f"Автор {uuid.uuid4().hex[:8]}"}).json()["id"]
+    book = {"title": f"Книга {uuid.uuid4().hex[:8]}", "description": "", "author_id": author_id, "genre_id": 1, "year": 2001}
+    return client.post("/books/", json=book).json()["id"]
+
+
+def _comment(client, book_id: int) -> None:
+    response = client.post("/book-comments/", json={"book_id": book_id, "user_id": 1, "comment_text": "текст"})
+    assert response.status_code == 200
+
+
+def _score(book_id: int) -> int:
+    return dict(book_rankings.popular(10 ** 6)).get(book_id, 0)
+
+
+def _add_foreign_event(book_id: int, delta: int, created_at: datetime = None) -> None:
+    # Событие другого воркера: в журнале, но не в памяти этого процесса
+    db = SessionLocal()
+    try:
+        RankingRepository(db).add_events([
+            {"book_id": book_id, "delta": delta, "created_at": created_at or datetime.utcnow()}
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_own_events_counted_once(client):
+    book_id = _create_book(client)
+    load_rankings(SessionLocal)
+    _comment(client, book_id)
+    assert _score(book_id) == 1
+    refresh_rankings(SessionLocal)
+    assert _score(book_id) == 1
+
+
+def test_sync_reads_only_new_events(client, sql):
+    book_id = _create_book(client)
+    load_rankings(SessionLocal)
+    _add_foreign_event(book_id, 2)
+    assert _score(book_id) == 0
+    with sql:
+        refresh_rankings(SessionLocal)
+    assert _score(book_id) == 2
+    assert len(sql.statements) == 1
+    assert "book_ranking_events.id >" in sql.statements[0]
+
+
+def test_events_committed_during_load_are_kept(client, monkeypatch):
+    book_id = _create_book(client)
+    get_totals = RankingRepository.get_totals
+
+    def commit_during_load(self):
+        # Запись этого процесса между снимком журнала и заменой таблиц
+        monkeypatch.setattr(RankingRepository, "get_totals", get_totals)
+        _comment(client, book_id)
+        return get_totals(self)
+
+    monkeypatch.setattr(RankingRepository, "get_totals", commit_during_load)
+    load_rankings(SessionLocal)
+    assert _score(book_id) == 1
+    refresh_rankings(SessionLocal)
+    assert _score(book_id) == 1
+
+
+def test_compaction_keeps_scores(client):
+    book_id = _create_book(client)
+    _add_foreign_event(book_id, 3, datetime.utcnow() - timedelta(days=40))
+    load_rankings(SessionLocal)
+    assert _score(book_id) == 3
+
+    compact_rankings(SessionLocal)
+    db = SessionLocal()
+    try:
+        assert all(event_book_id != book_id for _, event_book_id, _, _ in RankingRepository(db).get_events(0))
+    finally:
+        db.close()
+    load_rankings(SessionLocal)
+    assert _score(book_id) == 3
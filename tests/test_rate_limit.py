@@ -0,0 +1,99 @@
+"""
+Ограничение запросов ведром токенов, сброс нагрузки и CORS.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import LoadSheddingMiddleware, RateLimitMiddleware, route_cost
+from app.utils import load_shedding
+from app.utils.load_shedding import pool_wait
+from app.utils.rate_limit import MemoryTokenBuckets, SqliteTokenBuckets
+
+
+def _app(middleware, **options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/")
+    def items():
+        return []
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(middleware, **options)
+    return TestClient(app)
+
+
+def test_route_cost():
+    assert route_cost("GET", "/books/", b"") == 1
+    assert route_cost("GET", "/books/", b"limit=1000") == 10
+    assert route_cost("POST", "/users/login", b"email=a&password=b") == 10
+    assert route_cost("GET", "/books/search/", b"title=x") == 5
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    client = _app(RateLimitMiddleware, buckets=MemoryTokenBuckets(), rate=1, burst=3)
+    assert [client.get("/items/").status_code for _ in range(3)] == [200, 200, 200]
+    response = client.get("/items/")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Служебные пути не ограничиваются
+    assert client.get("/health").status_code == 200
+
+
+def test_sqlite_buckets_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SqliteTokenBuckets(path), SqliteTokenBuckets(path)
+    assert first.take("ip:1", 2, rate=1, burst=3) == 0
+    assert second.take("ip:1", 2, rate=1, burst=3) > 0
+    assert second.take("ip:2", 2, rate=1, burst=3) == 0
+
+
+def test_load_shedding_returns_503_while_pool_wait_is_high():
+    client = _app(LoadSheddingMiddleware, loop_lag_ms=0, pool_wait_ms=100, retry_after=3)
+    assert client.get("/items/").status_code == 200
+    pool_wait.reset()
+    for _ in range(5):
+        pool_wait.observe(1.0)
+    try:
+        response = client.get("/items/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert client.get("/health").status_code == 200
+    finally:
+        pool_wait.reset()
+
+
+def test_load_shedding_ignores_single_spike():
+    client = _app(LoadSheddingMiddleware, loop_lag_ms=0, pool_wait_ms=100, retry_after=3)
+    pool_wait.reset()
+    try:
+        for _ in range(10):
+            pool_wait.observe(0.001)
+        pool_wait.observe(5.0)
+        assert client.get("/items/").status_code == 200
+        # Выброс без других измерений тоже не сбрасывает нагрузку
+        pool_wait.reset()
+        pool_wait.observe(5.0)
+        assert client.get("/items/").status_code == 200
+    finally:
+        pool_wait.reset()
+
+
+def test_windowed_percentile_expires_samples(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(load_shedding.time, "monotonic", lambda: now[0])
+    gauge = load_shedding.WindowedPercentile(window=5.0)
+    for _ in range(5):
+        gauge.observe(1.0)
+    assert gauge.value == 1.0
+    now[0] += 6
+    assert gauge.value == 0.0
+
+
+def test_cors_does_not_allow_any_origin(client):
+    response = client.get("/health", headers={"Origin": "https://evil.example"})
+    assert "access-control-allow-origin" not in response.headers
+    response = client.get("/health", headers={"Origin": "http://localhost:8000"})
+    assert response.headers["access-control-allow-origin"] == "http://localhost:8000"
@@ -0,0 +1,43 @@
+"""
+Пересчет соседей книг: полный пересчет один раз на процесс, счетчики полок - только нужных книг.
+"""
+import math
+
+from app.database.database import SessionLocal
+from app.repositories.book_similarities import BookSimilarityRepository
+from app.repositories.shelf import ShelfRepository
+from app.services import recommendations
+from app.services.recommendations import RecommendationService, rebuild_similarities
+
+
+def test_rebuild_counts_only_chunk_and_neighbours(client, sql):
+    user_id = client.get("/users/").json()[0]["id"]
+    for book_id in (1, 2):
+        client.post("/shelf/", json={"user_id": user_id, "book_id": book_id})
+    db = SessionLocal()
+    try:
+        with sql:
+            RecommendationService(db).rebuild([1])
+        counts = [statement for statement in sql.statements if "GROUP BY shelf.book_id" in statement]
+        assert counts and all(" IN (" in statement for statement in counts)
+
+        shelved = {book_id: count for book_id, count, _ in ShelfRepository(db).count_by_book()}
+        pairs = BookSimilarityRepository(db).get_cooccurrence([1])
+        expected = {other_id: round(together / math.sqrt(shelved[1] * shelved[other_id]), 6) for _, other_id, together in pairs}
+        stored = BookSimilarityRepository(db).get_neighbors(1, len(expected))
+        assert {other_id: round(score, 6) for other_id, score in stored}.items() <= expected.items()
+        assert stored
+    finally:
+        db.close()
+
+
+def test_full_rebuild_only_until_first_pass(monkeypatch):
+    calls = []
+    monkeypatch.setattr(recommendations.similarity_tracker, "initial_build_done", False)
+    monkeypatch.setattr(BookSimilarityRepository, "is_empty", lambda self: True)
+    monkeypatch.setattr(RecommendationService, "rebuild_dirty", lambda self, full=False: calls.append(full) or 0)
+
+    rebuild_similarities(SessionLocal)
+    rebuild_similarities(SessionLocal)
+
+    assert calls == [True, False]
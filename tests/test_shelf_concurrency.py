@@ -0,0 +1,46 @@
+"""
+Параллельные добавления на полку: уникальность пары и лимит полки
+держатся на одном INSERT ... ON CONFLICT DO NOTHING, без гонки проверки и вставки.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import app.services.shelf as shelf_service
+
+PARALLEL_REQUESTS = 8
+
+
+def _new_user(client) -> int:
+    response = client.post("/users/", json={
+        "name": "Читатель", "email": f"reader-{uuid4().hex[:8]}@example.com", "role_id": 1, "password": "secret"
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _post_parallel(client, payloads):
+    with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        return list(pool.map(lambda payload: client.post("/shelf/", json=payload), payloads))
+
+
+def test_parallel_add_same_book(client):
+    user_id = _new_user(client)
+
+    responses = _post_parallel(client, [{"user_id": user_id, "book_id": 1}] * PARALLEL_REQUESTS)
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200] + [409] * (PARALLEL_REQUESTS - 1)
+    assert [entry["book_id"] for entry in client.get(f"/shelf/user/{user_id}").json()] == [1]
+
+
+def test_parallel_add_respects_limit(client, monkeypatch):
+    monkeypatch.setattr(shelf_service, "MAX_SHELF_BOOKS", 3)
+    user_id = _new_user(client)
+
+    responses = _post_parallel(client, [
+        {"user_id": user_id, "book_id": book_id} for book_id in range(1, PARALLEL_REQUESTS + 1)
+    ])
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200] * 3 + [400] * (PARALLEL_REQUESTS - 3)
+    assert len(client.get(f"/shelf/user/{user_id}").json()) == 3
@@ -0,0 +1,47 @@
+"""
+Статистика пользователя: 404 для неизвестного пользователя и ограниченный кэш фрагментов.
+"""
+import uuid
+
+from app.services.user_stats import user_stats_cache
+from app.utils import cache
+from app.utils.cache import FragmentCache
+
+
+def test_unknown_user_is_not_found_and_not_cached(client):
+    user_stats_cache.clear()
+    response = client.get("/users/999999/stats")
+    assert response.status_code == 404
+    assert len(user_stats_cache) == 0
+
+
+def test_user_without_shelf_has_zero_stats(client):
+    user_id = client.post("/users/", json={
+        "email": f"stats-{uuid.uuid4().hex[:8]}@example.com", "name": "Читатель", "password": "secret123", "role_id": 1
+    }).json()["id"]
+    response = client.get(f"/users/{user_id}/stats")
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    fragments = FragmentCache(ttl=60.0, max_entries=2)
+    fragments.get_or_render("a", 0, lambda: "a")
+    fragments.get_or_render("b", 0, lambda: "b")
+    # Чтение "a" делает вытесняемым "b"
+    assert fragments.get_or_render("a", 0, lambda: "a2") == "a"
+    fragments.get_or_render("c", 0, lambda: "c")
+    assert len(fragments) == 2
+    assert fragments.get_or_render("a", 0, lambda: "a2") == "a"
+    assert fragments.get_or_render("b", 0, lambda: "b2") == "b2"
+
+
+def test_fragment_cache_drops_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    fragments = FragmentCache(ttl=30.0, max_entries=100)
+    for key in range(10):
+        fragments.get_or_render(key, 0, lambda: key)
+    now[0] += 31
+    fragments.get_or_render("fresh", 0, lambda: "fresh")
+    assert len(fragments) == 1
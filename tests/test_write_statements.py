@@ -0,0 +1,140 @@
+"""
+Количество SQL-запросов и commit на маршрутах записи: репозитории делают только
+flush, сервис фиксирует транзакцию один раз, ответ строится без повторного SELECT.
+"""
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.database.database import SessionLocal
+from app.schemes.books import BookUpdate
+from app.services.books import BookService
+
+
+def _name(prefix: str) -> str:
+    return f"{prefix} {uuid.uuid4().hex[:8]}"
+
+
+def test_create_author(client, sql):
+    with sql:
+        response = client.post("/authors/", json={"name": _name("Автор")})
+    assert response.status_code == 200
+    # Проверка имени и INSERT; после commit автор не перечитывается
+    assert sql.count("SELECT") == 1
+    assert sql.count("INSERT") == 1
+    assert len(sql.statements) == 2
+    assert sql.commits == 1
+
+
+def test_update_author(client, sql):
+    author_id = client.post("/authors/", json={"name": _name("Автор")}).json()["id"]
+    with sql:
+        response = client.put(f"/authors/{author_id}", json={"name": _name("Автор")})
+    assert response.status_code == 200
+    assert sql.count("SELECT") == 1
+    assert sql.count("UPDATE") == 1
+    assert len(sql.statements) == 2
+    assert sql.commits == 1
+
+
+def test_create_genre(client, sql):
+    with sql:
+        response = client.post("/genres/", json={"name": _name("Жанр")})
+    assert response.status_code == 200
+    assert len(sql.statements) == 2
+    assert sql.commits == 1
+
+
+def _create_book(client, **fields) -> dict:
+    author_id = client.post("/authors/", json={"name": _name("Автор")}).json()["id"]
+    book = {"title": _name("Книга"), "description": "", "author_id": author_id, "genre_id": 1, "year": 2001, **fields}
+    return client.post("/books/", json=book).json()
+
+
+def test_create_book(client, sql):
+    author = client.post("/authors/", json={"name": _name("Автор")}).json()
+    book = {"title": _name("Книга"), "description": "", "author_id": author["id"], "genre_id": 1, "year": 2001}
+    with sql:
+        response = client.post("/books/", json=book)
+    assert response.status_code == 200
+    assert response.json()["author_name"] == author["name"]
+    # Один INSERT ... RETURNING с именами автора и жанра
+    assert len(sql.statements) == 1
+    assert sql.count("INSERT") == 1
+    assert sql.commits == 1
+
+
+def test_create_duplicate_book(client):
+    book = _create_book(client)
+    duplicate = {**book, "title": book["title"].upper()}
+    assert client.post("/books/", json=duplicate).status_code == 409
+
+
+def test_duplicate_title_key_is_strict(client):
+    book = _create_book(client, title=f"Мать {uuid.uuid4().hex[:8]}")
+    # Нечеткий ключ поиска у "Мат" тот же, но это другая книга
+    similar = {**book, "title": book["title"].replace("Мать", "Мат")}
+    assert client.post("/books/", json=similar).status_code == 200
+    upper = {**book, "title": book["title"].replace("Мать", "МАТЬ")}
+    assert client.post("/books/", json=upper).status_code == 409
+    hedgehog = client.post("/books/", json={**book, "title": f"Ёж {uuid.uuid4().hex[:8]}"}).json()
+    assert client.post("/books/", json={**book, "title": hedgehog["title"].replace("Ё", "Е")}).status_code == 409
+
+
+def test_update_book(client, sql):
+    book = _create_book(client)
+    with sql:
+        response = client.put(f"/books/{book['id']}", json={"year": 1999})
+    assert response.status_code == 200
+    assert response.json()["year"] == 1999
+    assert response.json()["author_name"] == book["author_name"]
+    # Без предварительного чтения книги и комментариев: один UPDATE ... RETURNING
+    assert len(sql.statements) == 1
+    assert sql.count("UPDATE") == 1
+    assert sql.commits == 1
+
+
+def test_update_missing_book(client, sql):
+    with sql:
+        response = client.put("/books/999999", json={"year": 1999})
+    assert response.status_code == 404
+    assert len(sql.statements) == 1
+
+
+def test_update_book_to_duplicate_title(client):
+    book = _create_book(client)
+    other = client.post("/books/", json={**book, "title": _name("Книга")}).json()
+    response = client.put(f"/books/{other['id']}", json={"title": book["title"]})
+    assert response.status_code == 409
+
+
+def test_update_book_explicit_null(client):
+    book = _create_book(client)
+    for field in ("title", "author_id", "genre_id", "year"):
+        assert client.put(f"/books/{book['id']}", json={field: None}).status_code == 422
+    # description в БД необязателен
+    assert client.put(f"/books/{book['id']}", json={"description": None}).status_code == 200
+
+
+def test_update_book_other_integrity_error_is_not_duplicate(client):
+    book = _create_book(client)
+    db = SessionLocal()
+    try:
+        # Обход схемы: NOT NULL нарушен, но это не дубликат названия
+        with pytest.raises(IntegrityError):
+            BookService(db).update_book(book["id"], BookUpdate.model_construct(title=None))
+    finally:
+        db.close()
+
+
+def test_update_shelf_entry(client, sql):
+    book_id = _create_book(client)["id"]
+    entry = client.post("/shelf/", json={"user_id": 1, "book_id": book_id}).json()
+    with sql:
+        response = client.put(f"/shelf/{entry['id']}", json={"status_read": True})
+    assert response.status_code == 200
+    assert response.json()["status_read"] is True
+    assert sql.count("SELECT") == 1
+    assert sql.count("UPDATE") == 1
+    assert sql.commits == 1